@@ -40,6 +40,12 @@ else:
     cubicasa_dataset_path = global_config['cubicasa_dataset_path']
 cubicasa_dataset_path = os.path.expanduser(cubicasa_dataset_path)
 
+if 'GIBSON_CACHE_PATH' in os.environ:
+    cache_path = os.environ['GIBSON_CACHE_PATH']
+else:
+    cache_path = global_config.get('cache_path', 'data/cache')
+cache_path = os.path.expanduser(cache_path)
+
 root_path = os.path.dirname(os.path.realpath(__file__))
 
 if not os.path.isabs(assets_path):
@@ -52,6 +58,8 @@ if not os.path.isabs(threedfront_dataset_path):
     threedfront_dataset_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), threedfront_dataset_path)
 if not os.path.isabs(cubicasa_dataset_path):
     cubicasa_dataset_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), cubicasa_dataset_path)
+if not os.path.isabs(cache_path):
+    cache_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), cache_path)
 
 logging.info('Importing iGibson (gibson2 module)')
 logging.info('Assets path: {}'.format(assets_path))
@@ -59,6 +67,7 @@ logging.info('Gibson Dataset path: {}'.format(g_dataset_path))
 logging.info('iG Dataset path: {}'.format(ig_dataset_path))
 logging.info('3D-FRONT Dataset path: {}'.format(threedfront_dataset_path))
 logging.info('CubiCasa5K Dataset path: {}'.format(cubicasa_dataset_path))
+logging.info('Cache path: {}'.format(cache_path))
 
 example_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'examples')
 example_config_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), 'examples', 'configs')
@@ -13,8 +13,10 @@ from gibson2.scenes.stadium_scene import StadiumScene
 from gibson2.scenes.gibson_indoor_scene import StaticIndoorScene
 from gibson2.scenes.igibson_indoor_scene import InteractiveIndoorScene
 from gibson2.utils.utils import parse_config
+from gibson2.utils.scene_prefetcher import ScenePrefetcher
 from gibson2.render.mesh_renderer.mesh_renderer_settings import MeshRendererSettings
 import gym
+import time
 
 
 class BaseEnv(gym.Env):
@@ -53,6 +55,11 @@ class BaseEnv(gym.Env):
             'object_randomization_freq', None)
         self.object_randomization_idx = 0
         self.num_object_randomization_idx = 10
+        scene_prefetch_queue_depth = self.config.get(
+            'scene_prefetch_queue_depth', 0)
+        self.scene_prefetcher = ScenePrefetcher(
+            self.create_scene, queue_depth=scene_prefetch_queue_depth) \
+            if scene_prefetch_queue_depth > 0 else None
 
         enable_shadow = self.config.get('enable_shadow', False)
         enable_pbr = self.config.get('enable_pbr', True)
@@ -96,8 +103,25 @@ class BaseEnv(gym.Env):
         :param scene_id: new scene_id
         """
         self.config['scene_id'] = scene_id
+        if self.scene_prefetcher is None:
+            self.simulator.reload()
+            self.load()
+            return
+        scene = self.scene_prefetcher.get(scene_id)
+        start = time.time()
         self.simulator.reload()
-        self.load()
+        self.load(scene)
+        self.scene_prefetcher.add_exposed_time(time.time() - start)
+
+    def prefetch_model(self, scene_id):
+        """
+        Start preparing another scene model in the background (if scene_prefetch_queue_depth is set),
+        so that the next reload_model to it only loads it into pybullet and the renderer
+
+        :param scene_id: scene_id of a future reload_model
+        """
+        if self.scene_prefetcher is not None:
+            self.scene_prefetcher.prefetch(scene_id)
 
     def reload_model_object_randomization(self):
         """
@@ -107,8 +131,14 @@ class BaseEnv(gym.Env):
             return
         self.object_randomization_idx = (self.object_randomization_idx + 1) % \
             (self.num_object_randomization_idx)
-        self.simulator.reload()
-        self.load()
+        if isinstance(self.scene, InteractiveIndoorScene) and self.simulator.can_remove_objects():
+            # only swap the objects that change, and keep the robots, the task and the renderer
+            scene = self.create_ig_scene()
+            self.simulator.reload_ig_scene(scene)
+            self.scene = scene
+        else:
+            self.simulator.reload()
+            self.load()
 
     def get_next_scene_random_seed(self):
         """
@@ -118,21 +148,22 @@ class BaseEnv(gym.Env):
             return None
         return self.scene_random_seeds[self.scene_random_seed_idx]
 
-    def load(self):
+    def create_scene(self, scene_id=None):
         """
-        Load the scene and robot
+        Create (but do not load) the scene of the config
+
+        :param scene_id: override scene_id in config
+        :return: Scene instance
         """
+        if scene_id is None:
+            scene_id = self.config['scene_id']
         if self.config['scene'] == 'empty':
             scene = EmptyScene()
-            self.simulator.import_scene(
-                scene, load_texture=self.config.get('load_texture', True))
         elif self.config['scene'] == 'stadium':
             scene = StadiumScene()
-            self.simulator.import_scene(
-                scene, load_texture=self.config.get('load_texture', True))
         elif self.config['scene'] == 'gibson':
             scene = StaticIndoorScene(
-                self.config['scene_id'],
+                scene_id,
                 waypoint_resolution=self.config.get(
                     'waypoint_resolution', 0.2),
                 num_waypoints=self.config.get('num_waypoints', 10),
@@ -143,37 +174,73 @@ class BaseEnv(gym.Env):
                 pybullet_load_texture=self.config.get(
                     'pybullet_load_texture', False),
             )
-            self.simulator.import_scene(
-                scene, load_texture=self.config.get('load_texture', True))
         elif self.config['scene'] == 'igibson':
-            scene = InteractiveIndoorScene(
-                self.config['scene_id'],
-                waypoint_resolution=self.config.get(
-                    'waypoint_resolution', 0.2),
-                num_waypoints=self.config.get('num_waypoints', 10),
-                build_graph=self.config.get('build_graph', False),
-                trav_map_resolution=self.config.get(
-                    'trav_map_resolution', 0.1),
-                trav_map_erosion=self.config.get('trav_map_erosion', 2),
-                trav_map_type=self.config.get('trav_map_type', 'with_obj'),
-                pybullet_load_texture=self.config.get(
-                    'pybullet_load_texture', False),
-                texture_randomization=self.texture_randomization_freq is not None,
-                object_randomization=self.object_randomization_freq is not None,
-                object_randomization_idx=self.object_randomization_idx,
-                should_open_all_doors=self.config.get(
-                    'should_open_all_doors', False),
-                load_object_categories=self.config.get(
-                    'load_object_categories', None),
-                load_room_types=self.config.get('load_room_types', None),
-                load_room_instances=self.config.get(
-                    'load_room_instances', None),
-            )
-            # TODO: Unify the function import_scene and take out of the if-else clauses
-            first_n = self.config.get('_set_first_n_objects', -1)
-            if first_n != -1:
-                scene._set_first_n_objects(first_n)
+            scene = self.create_ig_scene(scene_id)
+        else:
+            raise Exception(
+                'unknown scene type: {}'.format(self.config['scene']))
+        return scene
+
+    def create_ig_scene(self, scene_id=None):
+        """
+        Create (but do not load) the interactive scene of the config, with the current object randomization index
+
+        :param scene_id: override scene_id in config
+        :return: InteractiveIndoorScene instance
+        """
+        if scene_id is None:
+            scene_id = self.config['scene_id']
+        scene = InteractiveIndoorScene(
+            scene_id,
+            waypoint_resolution=self.config.get(
+                'waypoint_resolution', 0.2),
+            num_waypoints=self.config.get('num_waypoints', 10),
+            build_graph=self.config.get('build_graph', False),
+            trav_map_resolution=self.config.get(
+                'trav_map_resolution', 0.1),
+            trav_map_erosion=self.config.get('trav_map_erosion', 2),
+            trav_map_type=self.config.get('trav_map_type', 'with_obj'),
+            pybullet_load_texture=self.config.get(
+                'pybullet_load_texture', False),
+            texture_randomization=self.texture_randomization_freq is not None,
+            object_randomization=self.object_randomization_freq is not None,
+            object_randomization_idx=self.object_randomization_idx,
+            should_open_all_doors=self.config.get(
+                'should_open_all_doors', False),
+            load_object_categories=self.config.get(
+                'load_object_categories', None),
+            load_room_types=self.config.get('load_room_types', None),
+            load_room_instances=self.config.get(
+                'load_room_instances', None),
+            scene_quality_check=self.config.get(
+                'scene_quality_check', 'cached'),
+        )
+        # TODO: Unify the function import_scene and take out of the if-else clauses
+        if self.config.get('room_streaming', False):
+            scene.enable_room_streaming(
+                load_distance=self.config.get(
+                    'room_streaming_load_distance', 3.0),
+                unload_distance=self.config.get(
+                    'room_streaming_unload_distance', 5.0),
+                max_bodies=self.config.get('room_streaming_max_bodies', None))
+        first_n = self.config.get('_set_first_n_objects', -1)
+        if first_n != -1:
+            scene._set_first_n_objects(first_n)
+        return scene
+
+    def load(self, scene=None):
+        """
+        Load the scene and robot
+
+        :param scene: scene to load instead of the scene of the config, e.g. a prefetched one
+        """
+        if scene is None:
+            scene = self.create_scene()
+        if isinstance(scene, InteractiveIndoorScene):
             self.simulator.import_ig_scene(scene)
+        else:
+            self.simulator.import_scene(
+                scene, load_texture=self.config.get('load_texture', True))
 
         if self.config['robot'] == 'Turtlebot':
             robot = Turtlebot(self.config)
@@ -206,6 +273,9 @@ class BaseEnv(gym.Env):
         """
         Clean up
         """
+        if self.scene_prefetcher is not None:
+            self.scene_prefetcher.close()
+            self.scene_prefetcher = None
         if self.simulator is not None:
             self.simulator.disconnect()
 
@@ -110,6 +110,17 @@ class iGibsonEnv(BaseEnv):
             shape=shape,
             dtype=np.float32)
 
+    def get_image_size(self, modality):
+        """
+        Get the image size of a vision modality. It defaults to image_width and image_height,
+        and can be overridden per modality, e.g. with depth_image_width and depth_image_height
+
+        :param modality: vision modality, e.g. rgb or depth
+        :return: image width and height
+        """
+        return (self.config.get('{}_image_width'.format(modality), self.image_width),
+                self.config.get('{}_image_height'.format(modality), self.image_height))
+
     def load_observation_space(self):
         """
         Load observation space
@@ -126,43 +137,51 @@ class iGibsonEnv(BaseEnv):
             observation_space['task_obs'] = self.build_obs_space(
                 shape=(self.task.task_obs_dim,), low=-np.inf, high=-np.inf)
         if 'rgb' in self.output:
+            width, height = self.get_image_size('rgb')
             observation_space['rgb'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 3),
+                shape=(height, width, 3),
                 low=0.0, high=1.0)
             vision_modalities.append('rgb')
         if 'depth' in self.output:
+            width, height = self.get_image_size('depth')
             observation_space['depth'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 1),
+                shape=(height, width, 1),
                 low=0.0, high=1.0)
             vision_modalities.append('depth')
         if 'pc' in self.output:
+            width, height = self.get_image_size('pc')
             observation_space['pc'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 3),
+                shape=(height, width, 3),
                 low=-np.inf, high=np.inf)
             vision_modalities.append('pc')
         if 'optical_flow' in self.output:
+            width, height = self.get_image_size('optical_flow')
             observation_space['optical_flow'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 2),
+                shape=(height, width, 2),
                 low=-np.inf, high=np.inf)
             vision_modalities.append('optical_flow')
         if 'scene_flow' in self.output:
+            width, height = self.get_image_size('scene_flow')
             observation_space['scene_flow'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 3),
+                shape=(height, width, 3),
                 low=-np.inf, high=np.inf)
             vision_modalities.append('scene_flow')
         if 'normal' in self.output:
+            width, height = self.get_image_size('normal')
             observation_space['normal'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 3),
+                shape=(height, width, 3),
                 low=-np.inf, high=np.inf)
             vision_modalities.append('normal')
         if 'seg' in self.output:
+            width, height = self.get_image_size('seg')
             observation_space['seg'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 1),
+                shape=(height, width, 1),
                 low=0.0, high=1.0)
             vision_modalities.append('seg')
         if 'rgb_filled' in self.output:  # use filler
+            width, height = self.get_image_size('rgb_filled')
             observation_space['rgb_filled'] = self.build_obs_space(
-                shape=(self.image_height, self.image_width, 3),
+                shape=(height, width, 3),
                 low=0.0, high=1.0)
             vision_modalities.append('rgb_filled')
         if 'scan' in self.output:
@@ -212,11 +231,13 @@ class iGibsonEnv(BaseEnv):
         self.current_episode = 0
         self.collision_links = []
 
-    def load(self):
+    def load(self, scene=None):
         """
         Load environment
+
+        :param scene: scene to load instead of the scene of the config, e.g. a prefetched one
         """
-        super(iGibsonEnv, self).load()
+        super(iGibsonEnv, self).load(scene)
         self.load_task_setup()
         self.load_observation_space()
         self.load_action_space()
@@ -301,6 +322,7 @@ class iGibsonEnv(BaseEnv):
         self.current_step += 1
         if action is not None:
             self.robots[0].apply_action(action)
+        self.stream_scene()
         collision_links = self.run_simulation()
         self.collision_links = collision_links
         self.collision_step += int(len(collision_links) > 0)
@@ -320,6 +342,36 @@ class iGibsonEnv(BaseEnv):
 
         return state, reward, done, info
 
+    def stream_scene(self, xy=None):
+        """
+        Load the rooms of the scene around the robot and unload the far ones, if room streaming is enabled
+
+        :param xy: 2D location, or array of 2D locations, around which to load the rooms, the position of the
+            robot by default
+        :return: pybullet body ids of the objects that were loaded, and of the objects that were unloaded
+        """
+        if xy is None:
+            xy = self.robots[0].get_position()[:2]
+        return self.simulator.stream_ig_scene(xy)
+
+    def stream_and_save_state(self, positions, state_id=None):
+        """
+        Load the rooms around positions that are about to be tested with test_valid_position, then save the
+        pybullet state to restore after the tests. The rooms must be loaded before the state is saved, since
+        p.restoreState fails once bodies are added or removed.
+
+        :param positions: positions to test
+        :param state_id: pybullet state saved for earlier tests, None if there is none
+        :return: pybullet state to restore after the tests, state_id if no body was loaded or unloaded
+        """
+        loaded, unloaded = self.stream_scene(np.array(positions)[:, :2])
+        if state_id is not None and len(loaded) + len(unloaded) > 0:
+            p.removeState(state_id)
+            state_id = None
+        if state_id is None:
+            state_id = p.saveState()
+        return state_id
+
     def check_collision(self, body_id):
         """
         Check with the given body_id has any collision after one simulator step
@@ -364,7 +416,8 @@ class iGibsonEnv(BaseEnv):
 
     def test_valid_position(self, obj, pos, orn=None):
         """
-        Test if the robot or the object can be placed with no collision
+        Test if the robot or the object can be placed with no collision.
+        With room streaming, the rooms around pos must be loaded first (see stream_and_save_state)
 
         :param obj: an instance of robot or object
         :param pos: position
@@ -393,6 +446,9 @@ class iGibsonEnv(BaseEnv):
         """
         is_robot = isinstance(obj, BaseRobot)
 
+        if obj is self.robots[0]:
+            # load the rooms around the robot first, so that it lands on their objects
+            self.stream_scene(pos[:2])
         self.set_pos_orn_with_z_offset(obj, pos, orn)
 
         if is_robot:
@@ -448,6 +504,7 @@ class iGibsonEnv(BaseEnv):
         self.robots[0].set_position([100.0, 100.0, 100.0])
         self.task.reset_scene(self)
         self.task.reset_agent(self)
+        self.stream_scene()
         self.simulator.sync()
         state = self.get_state()
         self.reset_variables()
@@ -0,0 +1,96 @@
+import os
+import tempfile
+import numpy as np
+import gym
+
+
+class ObservationBuffer(object):
+    """
+    Observations of a batch of environments in memory shared between processes, laid out from the
+    observation space. Every observation key gets an array of shape (num_slots, num_envs) + shape, backed by a
+    file in /dev/shm and mapped with mmap in every process. Environment processes write their observations
+    into a slot, and the main process reads the whole batch of a slot as stacked views without any copy.
+    Slots are used as a ring, so the views of a slot stay valid while the next num_slots - 1 slots are written.
+    """
+
+    def __init__(self, observation_space, num_envs, num_slots=2, path=None):
+        """
+        :param observation_space: gym Dict space of Box spaces, or a Box space
+        :param num_envs: number of environments
+        :param num_slots: number of slots of the ring
+        :param path: file of an existing buffer to attach to, None to create a new buffer
+        """
+        self.observation_space = observation_space
+        self.num_envs = num_envs
+        self.num_slots = num_slots
+        if isinstance(observation_space, gym.spaces.Dict):
+            spaces = list(observation_space.spaces.items())
+        elif isinstance(observation_space, gym.spaces.Box):
+            spaces = [(None, observation_space)]
+        else:
+            raise ValueError(
+                'Unsupported observation space: {}'.format(observation_space))
+
+        # align every array to 64 bytes
+        layout = []
+        size = 0
+        for key, space in spaces:
+            shape = (num_slots, num_envs) + tuple(space.shape)
+            dtype = np.dtype(space.dtype)
+            layout.append((key, shape, dtype, size))
+            size += int(np.prod(shape)) * dtype.itemsize
+            size = (size + 63) // 64 * 64
+
+        self.owner = path is None
+        if self.owner:
+            shm_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+            fd, path = tempfile.mkstemp(
+                prefix='gibson_observations_', dir=shm_dir)
+            os.ftruncate(fd, max(size, 1))
+            os.close(fd)
+        self.path = path
+        self.memory = np.memmap(path, dtype=np.uint8, mode='r+', shape=(max(size, 1),))
+        self.arrays = {key: np.ndarray(shape, dtype=dtype, buffer=self.memory, offset=offset)
+                       for key, shape, dtype, offset in layout}
+
+    def write(self, slot, env_idx, observation):
+        """
+        Write the observation of an environment into a slot
+
+        :param slot: slot index
+        :param env_idx: environment index
+        :param observation: observation dict, or array for a Box observation space
+        """
+        if None in self.arrays:
+            self.arrays[None][slot, env_idx] = observation
+            return
+        for key, array in self.arrays.items():
+            array[slot, env_idx] = observation[key]
+
+    def read(self, slot):
+        """
+        Read the observations of all the environments in a slot
+
+        :param slot: slot index
+        :return: dict of arrays of shape (num_envs,) + shape, or an array for a Box observation space.
+            The arrays are views of the shared memory
+        """
+        if None in self.arrays:
+            return self.arrays[None][slot]
+        return {key: array[slot] for key, array in self.arrays.items()}
+
+    def unlink(self):
+        """
+        Remove the backing file once every process has attached to the buffer. The memory stays mapped until
+        every process closes the buffer
+        """
+        if self.owner and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def close(self):
+        """
+        Release the buffer. The memory is unmapped once the views returned by read are released too
+        """
+        self.unlink()
+        self.arrays = {}
+        self.memory = None
@@ -1,8 +1,12 @@
 import gibson2
 from gibson2.envs.igibson_env import iGibsonEnv
+from gibson2.envs.observation_buffer import ObservationBuffer
+import asyncio
 import atexit
 import multiprocessing
+import multiprocessing.connection
 import sys
+import time
 import traceback
 import numpy as np
 import os
@@ -16,7 +20,8 @@ class ParallelNavEnv(iGibsonEnv):
     access global variables.
     """
 
-    def __init__(self, env_constructors, blocking=False, flatten=False):
+    def __init__(self, env_constructors, blocking=False, flatten=False, shared_memory=False, num_slots=2,
+                 auto_reset=False, start_method=None):
         """Batch together environments and simulate them in external processes.
         The environments can be different but must use the same action and
         observation specs.
@@ -25,16 +30,41 @@ class ParallelNavEnv(iGibsonEnv):
         :param blocking: Whether to step environments one after another.
         :param flatten: Boolean, whether to use flatten action and time_steps during
             communication to reduce overhead.
+        :param shared_memory: Whether the workers write their observations into shared memory
+            (see ObservationBuffer) instead of sending them through the pipes. reset and step
+            then return batched observations, as stacked views of the shared memory.
+        :param num_slots: Number of observation batches in shared memory. The observations returned
+            by reset and step stay valid for the next num_slots - 1 calls.
+        :param auto_reset: Whether the workers reset their environment in the background as soon as a step
+            ends an episode, instead of resetting inside the step (automatic_reset of iGibsonEnv). The step
+            returns the last observation of the episode, and the next reset of the environment returns as soon
+            as the background reset is done. Use with step_async and wait so that slow resets overlap with the
+            steps of the other environments.
+        :param start_method: multiprocessing start method of the workers, None for the default of the platform.
+            With 'forkserver', a server process preloads the heavy modules and the dataset indexes once
+            (see gibson2.envs.worker_preload) and forks the workers, which share them copy-on-write. The
+            environment constructors must then be picklable, e.g. classes or module-level functions.
         :raise ValueError: If the action or observation specs don't match.
         """
         self._envs = [ProcessPyEnvironment(
-            ctor, flatten=flatten) for ctor in env_constructors]
+            ctor, flatten=flatten, auto_reset=auto_reset, start_method=start_method) for ctor in env_constructors]
         self._num_envs = len(env_constructors)
         self.start()
         self.action_space = self._envs[0].action_space
         self.observation_space = self._envs[0].observation_space
         self._blocking = blocking
         self._flatten = flatten
+        self._observation_buffer = None
+        self._slot = 0
+        # env index -> (method name, slot) of the requests sent by step_async and reset_async
+        self._pending = {}
+        if shared_memory:
+            self._observation_buffer = ObservationBuffer(
+                self.observation_space, self._num_envs, num_slots=num_slots)
+            for env_idx, env in enumerate(self._envs):
+                env.attach_observation_buffer(self._observation_buffer, env_idx)
+            # every worker has mapped the buffer
+            self._observation_buffer.unlink()
 
     def start(self):
         """
@@ -51,33 +81,292 @@ class ParallelNavEnv(iGibsonEnv):
     def batch_size(self):
         return self._num_envs
 
+    def next_slot(self):
+        """
+        :return: the slot of the observation buffer to write the next observations to,
+            or None without shared memory
+        """
+        if self._observation_buffer is None:
+            return None
+        slot = self._slot
+        self._slot = (self._slot + 1) % self._observation_buffer.num_slots
+        return slot
+
     def reset(self):
         """Reset all environments and combine the resulting observation.
 
-        :return: a list of [next_obs, reward, done, info]
+        :return: a list of next_obs, or the batched next_obs with shared memory
         """
-        time_steps = [env.reset(self._blocking) for env in self._envs]
         if not self._blocking:
-            time_steps = [promise() for promise in time_steps]
+            self.reset_async()
+            return self.reset_wait()
+        slot = self.next_slot()
+        time_steps = [env.reset(self._blocking, slot=slot) for env in self._envs]
+        if slot is not None:
+            return self._observation_buffer.read(slot)
         return time_steps
 
     def step(self, actions):
         """Forward a batch of actions to the wrapped environments.
 
         :param actions: batched action, possibly nested, to apply to the environment.
-        :return: a list of [next_obs, reward, done, info]
+        :return: a list of [next_obs, reward, done, info], or with shared memory the batched
+            next_obs, an array of rewards, an array of dones and a list of infos
         """
-        time_steps = [env.step(action, self._blocking)
-                      for env, action in zip(self._envs, actions)]
-        # When blocking is False we get promises that need to be called.
         if not self._blocking:
-            time_steps = [promise() for promise in time_steps]
+            self.step_async(actions)
+            return self.step_wait()
+        slot = self.next_slot()
+        time_steps = [env.step(action, self._blocking, slot=slot)
+                      for env, action in zip(self._envs, actions)]
+        if slot is not None:
+            _, rewards, dones, infos = zip(*time_steps)
+            return self._observation_buffer.read(slot), np.array(rewards), np.array(dones), list(infos)
         return time_steps
 
+    def get_env_ids(self, env_ids):
+        """
+        :param env_ids: environment indices, or None for all the environments
+        :return: list of environment indices without a pending request
+        :raise ValueError: if an environment already has a pending request
+        """
+        if env_ids is None:
+            env_ids = range(self._num_envs)
+        env_ids = list(env_ids)
+        for env_id in env_ids:
+            if env_id in self._pending:
+                raise ValueError(
+                    'Environment {} has a pending {}, wait for it first'.format(env_id, self._pending[env_id][0]))
+        return env_ids
+
+    def reset_async(self, env_ids=None):
+        """Send reset requests without waiting for them. The results are collected by wait or reset_wait.
+
+        :param env_ids: environments to reset, None for all the environments
+        """
+        env_ids = self.get_env_ids(env_ids)
+        slot = self.next_slot()
+        for env_id in env_ids:
+            self._envs[env_id].reset(blocking=False, slot=slot)
+            self._pending[env_id] = ('reset', slot)
+
+    def step_async(self, actions, env_ids=None):
+        """Send step requests without waiting for them. The results are collected by wait or step_wait.
+
+        :param actions: actions of the environments, in the order of env_ids
+        :param env_ids: environments to step, None for all the environments
+        """
+        env_ids = self.get_env_ids(env_ids)
+        slot = self.next_slot()
+        for env_id, action in zip(env_ids, actions):
+            self._envs[env_id].step(action, blocking=False, slot=slot)
+            self._pending[env_id] = ('step', slot)
+
+    def receive(self, env_id):
+        """
+        Collect the result of the pending request of an environment
+
+        :param env_id: environment index
+        :return: next_obs for a reset, (next_obs, reward, done, info) for a step. With shared memory, next_obs
+            is a view of the shared memory
+        """
+        name, slot = self._pending.pop(env_id)
+        result = self._envs[env_id]._receive()
+        if slot is None:
+            return result
+        if None in self._observation_buffer.arrays:
+            obs = self._observation_buffer.arrays[None][slot, env_id]
+        else:
+            obs = {key: array[slot, env_id]
+                   for key, array in self._observation_buffer.arrays.items()}
+        if name == 'reset':
+            return obs
+        return (obs,) + tuple(result[1:])
+
+    def get_pending_connections(self):
+        """
+        :return: dict from the indices of the environments with a pending request to the connections to their
+            workers, which are readable when the results are ready
+        """
+        return {env_id: self._envs[env_id].connection for env_id in self._pending}
+
+    def wait(self, timeout=None, min_ready=1):
+        """Wait for the pending requests of step_async and reset_async, and collect the results that are ready.
+        The environments that are not ready keep their pending requests for the next calls.
+
+        :param timeout: maximum time to wait in seconds, None to wait until min_ready environments are ready
+        :param min_ready: number of ready environments to wait for, capped by the number of pending requests
+        :return: list of (env_id, result) for the ready environments, with the result of receive
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        min_ready = min(min_ready, len(self._pending))
+        ready = []
+        while len(self._pending) > 0:
+            conns = {self._envs[env_id].connection: env_id
+                     for env_id in self._pending}
+            if len(ready) >= min_ready:
+                # only collect the results that are already there
+                remaining = 0
+            elif deadline is None:
+                remaining = None
+            else:
+                remaining = max(deadline - time.time(), 0)
+            ready_conns = multiprocessing.connection.wait(
+                list(conns), timeout=remaining)
+            for conn in ready_conns:
+                env_id = conns[conn]
+                ready.append((env_id, self.receive(env_id)))
+            if len(ready_conns) == 0 or len(ready) >= min_ready:
+                break
+        return ready
+
+    def wait_all(self):
+        """
+        :return: the results of all the pending requests as a list of (env_id, result) sorted by environment
+            index, and the set of slots the pending requests write to
+        """
+        slots = set(slot for _, slot in self._pending.values())
+        results = sorted(self.wait(min_ready=len(self._pending)),
+                         key=lambda item: item[0])
+        return results, slots
+
+    def batch_observations(self, observations, env_ids, slots):
+        """
+        :param observations: next_obs of the environments, as views of the shared memory
+        :param env_ids: environment indices of the observations
+        :param slots: set of slots of the observations
+        :return: batched next_obs. When the observations are all the environments of a single slot, the views
+            of the slot are returned without any copy
+        """
+        if len(slots) == 1 and env_ids == list(range(self._num_envs)):
+            return self._observation_buffer.read(next(iter(slots)))
+        if None in self._observation_buffer.arrays:
+            return np.stack(observations)
+        return {key: np.stack([obs[key] for obs in observations])
+                for key in self._observation_buffer.arrays}
+
+    def combine_results(self, method, results, slots):
+        """
+        :param method: 'step' or 'reset'
+        :param results: list of (env_id, result) of the environments
+        :param slots: set of slots the results were written to
+        :return: a list of next_obs for a reset, or of [next_obs, reward, done, info] for a step. With shared
+            memory, the batched next_obs for a reset, or the batched next_obs, an array of rewards, an array of
+            dones and a list of infos for a step
+        """
+        if self._observation_buffer is None:
+            return [result for _, result in results]
+        env_ids = [env_id for env_id, _ in results]
+        if method == 'reset':
+            return self.batch_observations([obs for _, obs in results], env_ids, slots)
+        obs, rewards, dones, infos = zip(*[result for _, result in results])
+        obs = self.batch_observations(list(obs), env_ids, slots)
+        return obs, np.array(rewards), np.array(dones), list(infos)
+
+    def reset_wait(self):
+        """Wait for all the pending requests of reset_async.
+
+        :return: a list of next_obs of the pending environments, or with shared memory their batched next_obs
+        """
+        results, slots = self.wait_all()
+        return self.combine_results('reset', results, slots)
+
+    def step_wait(self):
+        """Wait for all the pending requests of step_async.
+
+        :return: a list of [next_obs, reward, done, info] of the pending environments, or with shared memory
+            their batched next_obs, an array of rewards, an array of dones and a list of infos
+        """
+        results, slots = self.wait_all()
+        return self.combine_results('step', results, slots)
+
     def close(self):
         """Close all external process."""
         for env in self._envs:
             env.close()
+        if self._observation_buffer is not None:
+            self._observation_buffer.close()
+
+
+class AsyncParallelNavEnv(ParallelNavEnv):
+    """ParallelNavEnv whose reset and step are coroutines. They send their requests to the workers and wait for
+    the answers with loop.add_reader on the pipes, so the event loop keeps running other tasks, e.g. other I/O or
+    the steps of other environments gathered with asyncio.gather, without a thread per environment.
+    The observations always go through shared memory: the answers in the pipes are then small and are received
+    at once when the pipes are readable, while multi-MB observations would block the event loop until the
+    workers finish writing them.
+    """
+
+    def __init__(self, env_constructors, flatten=False, num_slots=2, auto_reset=False, start_method=None):
+        """
+        :param env_constructors: List of callables that create environments.
+        :param flatten: Boolean, whether to use flatten action and time_steps during
+            communication to reduce overhead.
+        :param num_slots: Number of observation batches in shared memory. The observations returned
+            by reset and step stay valid for the next num_slots - 1 calls.
+        :param auto_reset: Whether the workers reset their environment in the background as soon as a step
+            ends an episode (see ParallelNavEnv).
+        :param start_method: multiprocessing start method of the workers, None for the default of the platform.
+        """
+        super(AsyncParallelNavEnv, self).__init__(
+            env_constructors, flatten=flatten, shared_memory=True, num_slots=num_slots,
+            auto_reset=auto_reset, start_method=start_method)
+
+    async def wait_readable(self, env_ids):
+        """Wait until the results of the environments are ready, without blocking the event loop.
+
+        :param env_ids: environment indices
+        """
+        # the running loop, get_running_loop needs Python 3.7
+        loop = asyncio.get_event_loop()
+        fds = [self._envs[env_id].connection.fileno() for env_id in env_ids]
+        futures = [loop.create_future() for _ in fds]
+
+        def set_readable(fd, future):
+            loop.remove_reader(fd)
+            if not future.done():
+                future.set_result(None)
+
+        for fd, future in zip(fds, futures):
+            loop.add_reader(fd, set_readable, fd, future)
+        try:
+            await asyncio.gather(*futures)
+        finally:
+            for fd in fds:
+                loop.remove_reader(fd)
+
+    async def reset(self, env_ids=None):
+        """Reset environments and combine the resulting observation.
+
+        :param env_ids: environments to reset, None for all the environments
+        :return: the batched next_obs, in the order of env_ids
+        """
+        env_ids = self.get_env_ids(env_ids)
+        self.reset_async(env_ids)
+        return await self.receive_results('reset', env_ids)
+
+    async def step(self, actions, env_ids=None):
+        """Forward actions to environments.
+
+        :param actions: actions of the environments, in the order of env_ids
+        :param env_ids: environments to step, None for all the environments
+        :return: the batched next_obs, an array of rewards, an array of dones and a list of infos, in the order
+            of env_ids
+        """
+        env_ids = self.get_env_ids(env_ids)
+        self.step_async(actions, env_ids)
+        return await self.receive_results('step', env_ids)
+
+    async def receive_results(self, method, env_ids):
+        """
+        :param method: 'step' or 'reset'
+        :param env_ids: environments with a pending request sent by the same step_async or reset_async
+        :return: results combined by combine_results, in the order of env_ids
+        """
+        slots = set(self._pending[env_id][1] for env_id in env_ids)
+        await self.wait_readable(env_ids)
+        results = [(env_id, self.receive(env_id)) for env_id in env_ids]
+        return self.combine_results(method, results, slots)
 
 
 class ProcessPyEnvironment(object):
@@ -90,8 +379,9 @@ class ProcessPyEnvironment(object):
     _RESULT = 4
     _EXCEPTION = 5
     _CLOSE = 6
+    _ATTACH = 7
 
-    def __init__(self, env_constructor, flatten=False):
+    def __init__(self, env_constructor, flatten=False, auto_reset=False, start_method=None):
         """Step environment in a separate process for lock free paralellism.
 
         The environment is created in an external process by calling the provided
@@ -102,15 +392,23 @@ class ProcessPyEnvironment(object):
         :param env_constructor: callable that creates and returns a Python environment.
         :param flatten: boolean, whether to assume flattened actions and time_steps
         during communication to avoid overhead.
+        :param auto_reset: whether to reset the environment in the background after a step ends an episode.
+        :param start_method: multiprocessing start method, None for the default of the platform.
         """
         self._env_constructor = env_constructor
         self._flatten = flatten
+        self._auto_reset = auto_reset
+        self._context = multiprocessing.get_context(start_method)
+        if start_method == 'forkserver':
+            self._context.set_forkserver_preload(
+                ['__main__', 'gibson2.envs.worker_preload'])
 
     def start(self):
         """Start the process."""
-        self._conn, conn = multiprocessing.Pipe()
-        self._process = multiprocessing.Process(target=self._worker,
-                                                args=(conn, self._env_constructor, self._flatten))
+        self._conn, conn = self._context.Pipe()
+        self._process = self._context.Process(target=self._worker,
+                                                args=(conn, self._env_constructor, self._flatten,
+                                                      self._auto_reset))
         atexit.register(self.close)
         self._process.start()
         result = self._conn.recv()
@@ -120,6 +418,11 @@ class ProcessPyEnvironment(object):
             raise result
         assert result is self._READY, result
 
+    @property
+    def connection(self):
+        """Connection to the external process, readable when a result is ready."""
+        return self._conn
+
     def __getattr__(self, name):
         """Request an attribute from the environment.
         Note that this involves communication with the external process, so it can
@@ -143,6 +446,17 @@ class ProcessPyEnvironment(object):
         self._conn.send((self._CALL, payload))
         return self._receive
 
+    def attach_observation_buffer(self, observation_buffer, env_idx):
+        """Make the external environment write its observations into shared memory.
+
+        :param observation_buffer: ObservationBuffer created by the main process.
+        :param env_idx: index of the environment in the buffer.
+        """
+        payload = (observation_buffer.observation_space, observation_buffer.num_envs,
+                   observation_buffer.num_slots, observation_buffer.path, env_idx)
+        self._conn.send((self._ATTACH, payload))
+        self._receive()
+
     def close(self):
         """Send a close message to the external process and join it."""
         try:
@@ -153,26 +467,36 @@ class ProcessPyEnvironment(object):
             pass
         self._process.join(5)
 
-    def step(self, action, blocking=True):
+    def step(self, action, blocking=True, slot=None):
         """Step the environment.
 
         :param action: the action to apply to the environment.
         :param blocking: whether to wait for the result.
+        :param slot: slot of the observation buffer to write next_obs to, in which case next_obs is
+            returned as None.
         :return: (next_obs, reward, done, info) tuple when blocking, otherwise callable that returns that tuple
         """
-        promise = self.call('step', action)
+        if slot is not None:
+            promise = self.call('step', action, observation_slot=slot)
+        else:
+            promise = self.call('step', action)
         if blocking:
             return promise()
         else:
             return promise
 
-    def reset(self, blocking=True):
+    def reset(self, blocking=True, slot=None):
         """Reset the environment.
 
         :param blocking: whether to wait for the result.
+        :param slot: slot of the observation buffer to write next_obs to, in which case next_obs is
+            returned as None.
         :return: next_obs when blocking, otherwise callable that returns next_obs
         """
-        promise = self.call('reset')
+        if slot is not None:
+            promise = self.call('reset', observation_slot=slot)
+        else:
+            promise = self.call('reset')
         if blocking:
             return promise()
         else:
@@ -197,20 +521,30 @@ class ProcessPyEnvironment(object):
         raise KeyError(
             'Received message of unexpected type {}'.format(message))
 
-    def _worker(self, conn, env_constructor, flatten=False):
+    @classmethod
+    def _worker(cls, conn, env_constructor, flatten=False, auto_reset=False):
         """The process waits for actions and sends back environment results.
 
         :param conn: connection for communication to the main process.
         :param env_constructor: env_constructor for the OpenAI Gym environment.
         :param flatten: boolean, whether to assume flattened actions and
         time_steps during communication to avoid overhead.
+        :param auto_reset: whether to reset the environment after sending the result of a step that ends an
+        episode, while the main process consumes the result.
 
         :raise KeyError: when receiving a message of unknown type.
         """
+        observation_buffer = None
+        env_idx = 0
+        # observation of the background reset, returned by the next reset
+        reset_observation = None
         try:
             np.random.seed()
             env = env_constructor()
-            conn.send(self._READY)    # Ready.
+            if auto_reset and getattr(env, 'automatic_reset', False):
+                # the background reset replaces the reset inside the step
+                env.automatic_reset = False
+            conn.send(cls._READY)    # Ready.
             while True:
                 try:
                     # Only block for short times to have keyboard exceptions be raised.
@@ -219,18 +553,41 @@ class ProcessPyEnvironment(object):
                     message, payload = conn.recv()
                 except (EOFError, KeyboardInterrupt):
                     break
-                if message == self._ACCESS:
+                if message == cls._ACCESS:
                     name = payload
                     result = getattr(env, name)
-                    conn.send((self._RESULT, result))
+                    conn.send((cls._RESULT, result))
                     continue
-                if message == self._CALL:
+                if message == cls._CALL:
                     name, args, kwargs = payload
-                    if name == 'step' or name == 'reset':
+                    slot = kwargs.pop('observation_slot', None)
+                    if name == 'reset' and reset_observation is not None:
+                        result = reset_observation
+                    else:
                         result = getattr(env, name)(*args, **kwargs)
-                    conn.send((self._RESULT, result))
+                    if name == 'step' or name == 'reset':
+                        # a step after done continues in the episode of the background reset
+                        reset_observation = None
+                    done = name == 'step' and result[2]
+                    if slot is not None:
+                        # only send the small part of the result through the pipe
+                        if name == 'step':
+                            observation_buffer.write(slot, env_idx, result[0])
+                            result = (None,) + tuple(result[1:])
+                        else:
+                            observation_buffer.write(slot, env_idx, result)
+                            result = None
+                    conn.send((cls._RESULT, result))
+                    if auto_reset and done:
+                        reset_observation = env.reset()
+                    continue
+                if message == cls._ATTACH:
+                    observation_space, num_envs, num_slots, path, env_idx = payload
+                    observation_buffer = ObservationBuffer(
+                        observation_space, num_envs, num_slots=num_slots, path=path)
+                    conn.send((cls._RESULT, None))
                     continue
-                if message == self._CLOSE:
+                if message == cls._CLOSE:
                     assert payload is None
                     break
                 raise KeyError(
@@ -240,7 +597,7 @@ class ProcessPyEnvironment(object):
             stacktrace = ''.join(traceback.format_exception(etype, evalue, tb))
             message = 'Error in environment process: {}'.format(stacktrace)
             # tf.logging.error(message)
-            conn.send((self._EXCEPTION, stacktrace))
+            conn.send((cls._EXCEPTION, stacktrace))
         finally:
             conn.close()
 
@@ -0,0 +1,845 @@
+import asyncio
+import collections
+import logging
+import multiprocessing.connection
+import os
+import pickle
+import select
+import socket
+import struct
+import sys
+import time
+import traceback
+import numpy as np
+
+# frame header: length of the pickled message and number of out-of-band buffers
+_HEADER = struct.Struct('<II')
+# pickle protocol of the first messages of a connection, which every supported Python version reads. Both ends
+# then use the highest protocol they share
+HANDSHAKE_PROTOCOL = 4
+# out-of-band buffers need pickle protocol 5, from Python 3.8
+PROTOCOL = min(pickle.HIGHEST_PROTOCOL, 5)
+
+
+def send_frame(sock, message, protocol=PROTOCOL):
+    """
+    Send a message as a binary frame: a header, the lengths of the buffers, the pickled message and its out-of-band
+    buffers. With pickle protocol 5, contiguous numpy arrays of the message are sent from their own memory,
+    without any copy. With older protocols, they are copied into the pickled message
+
+    :param sock: connected socket
+    :param message: picklable message
+    :param protocol: pickle protocol, supported by both ends of the connection
+    """
+    parts = pack_frame(message, protocol)
+    while not send_parts(sock, parts):
+        # non-blocking socket with a full send buffer
+        select.select([], [sock], [])
+
+
+def pack_frame(message, protocol=PROTOCOL):
+    """
+    :param message: picklable message
+    :param protocol: pickle protocol, supported by both ends of the connection
+    :return: parts of the frame of the message, as a list of byte memoryviews
+    """
+    buffers = []
+    if protocol >= 5:
+        data = pickle.dumps(message, protocol=protocol,
+                            buffer_callback=buffers.append)
+        buffers = [buffer.raw() for buffer in buffers]
+    else:
+        data = pickle.dumps(message, protocol=protocol)
+    parts = [_HEADER.pack(len(data), len(buffers)),
+             struct.pack('<{}Q'.format(len(buffers)), *[buffer.nbytes for buffer in buffers]),
+             data] + buffers
+    return [memoryview(part).cast('B') for part in parts if len(part) > 0]
+
+
+def send_parts(sock, parts):
+    """
+    Send frame parts, as many as a non-blocking socket accepts. The parts that were sent are removed from the list
+
+    :param sock: connected socket
+    :param parts: parts of frames, as byte memoryviews
+    :return: whether all the parts were sent
+    """
+    while len(parts) > 0:
+        try:
+            sent = sock.sendmsg(parts)
+        except BlockingIOError:
+            return False
+        # drop the parts that were completely sent
+        while len(parts) > 0 and sent >= parts[0].nbytes:
+            sent -= parts[0].nbytes
+            parts.pop(0)
+        if sent > 0:
+            parts[0] = parts[0][sent:]
+    return True
+
+
+class FrameReader(object):
+    """
+    Incremental reader of the frames sent by send_frame. Every out-of-band buffer is received into its own
+    bytearray, which the numpy arrays of the message use without any copy. With a non-blocking socket, read
+    returns the messages as they complete without ever waiting for the rest of a frame.
+    """
+
+    def __init__(self, sock):
+        """
+        :param sock: connected socket
+        """
+        self.sock = sock
+        self.start_frame()
+
+    def start_frame(self):
+        """Expect the header of a new frame."""
+        self.header = bytearray(_HEADER.size)
+        self.sizes = None
+        self.data = None
+        self.buffers = []
+        # parts of the frame that remain to be received, in order, as (view, callback when received)
+        self.parts = [(memoryview(self.header), self.on_header)]
+
+    def on_header(self):
+        data_size, num_buffers = _HEADER.unpack(self.header)
+        self.sizes = bytearray(8 * num_buffers)
+        self.data = bytearray(data_size)
+        self.parts += [(memoryview(self.sizes), self.on_sizes),
+                       (memoryview(self.data), None)]
+
+    def on_sizes(self):
+        self.buffers = [bytearray(size) for size in struct.unpack(
+            '<{}Q'.format(len(self.sizes) // 8), self.sizes)]
+        self.parts += [(memoryview(buffer), None) for buffer in self.buffers]
+
+    def read(self):
+        """
+        :return: the next message, or None if a non-blocking socket has no complete frame yet
+        :raise EOFError: if the connection is closed
+        """
+        while len(self.parts) > 0:
+            view, callback = self.parts[0]
+            if view.nbytes > 0:
+                try:
+                    received = self.sock.recv_into(view)
+                except BlockingIOError:
+                    return None
+                if received == 0:
+                    raise EOFError('Connection closed')
+                if received < view.nbytes:
+                    self.parts[0] = (view[received:], callback)
+                    continue
+            self.parts.pop(0)
+            if callback is not None:
+                callback()
+        if len(self.buffers) > 0:
+            message = pickle.loads(self.data, buffers=self.buffers)
+        else:
+            message = pickle.loads(self.data)
+        self.start_frame()
+        return message
+
+
+def recv_frame(sock):
+    """
+    Receive a message sent by send_frame from a blocking socket
+
+    :param sock: connected socket
+    :return: message
+    :raise EOFError: if the connection is closed
+    """
+    return FrameReader(sock).read()
+
+
+def create_socket(address):
+    """
+    :param address: (host, port) tuple for a TCP socket over IPv4 or IPv6, or path of a Unix socket
+    :return: socket of the address family
+    """
+    if isinstance(address, str):
+        return socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    family = socket.getaddrinfo(address[0], address[1], type=socket.SOCK_STREAM)[0][0]
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def is_readable(sock, timeout):
+    """
+    :param sock: socket
+    :param timeout: maximum time to wait in seconds, None to wait forever
+    :return: whether data can be read from the socket
+    """
+    return len(select.select([sock], [], [], timeout)[0]) > 0
+
+
+def batch_results(method, results, observation_space_is_dict):
+    """
+    Batch the results of several environments so that they are sent as a few contiguous arrays
+
+    :param method: 'step' or 'reset'
+    :param results: list of next_obs for a reset, or of (next_obs, reward, done, info) for a step
+    :param observation_space_is_dict: whether the observations are dicts of arrays
+    :return: batched next_obs for a reset, or batched next_obs, rewards, dones and list of infos for a step
+    """
+    if method == 'step':
+        obs, rewards, dones, infos = zip(*results)
+    else:
+        obs = results
+    if observation_space_is_dict:
+        obs = {key: np.stack([o[key] for o in obs]) for key in obs[0]}
+    else:
+        obs = np.stack(obs)
+    if method == 'step':
+        return obs, np.array(rewards), np.array(dones), list(infos)
+    return obs
+
+
+def unbatch_results(method, batch, num_envs, observation_space_is_dict):
+    """
+    Split the results batched by batch_results
+
+    :param method: 'step' or 'reset'
+    :param batch: batched results
+    :param num_envs: number of environments in the batch
+    :param observation_space_is_dict: whether the observations are dicts of arrays
+    :return: list of next_obs for a reset, or of (next_obs, reward, done, info) for a step. The observations are
+        views of the received arrays
+    """
+    obs = batch[0] if method == 'step' else batch
+    if observation_space_is_dict:
+        obs = [{key: array[i] for key, array in obs.items()}
+               for i in range(num_envs)]
+    else:
+        obs = [obs[i] for i in range(num_envs)]
+    if method == 'reset':
+        return obs
+    _, rewards, dones, infos = batch
+    return [(obs[i], float(rewards[i]), bool(dones[i]), infos[i]) for i in range(num_envs)]
+
+
+class EnvServer(object):
+    """
+    Serve a batch of environments, e.g. a ParallelNavEnv on a CPU-rich node, to a RemoteParallelNavEnv over a
+    TCP or Unix socket. Clients are served one after the other. Every request steps or resets a batch of
+    environments, and clients can send requests without waiting for the previous ones: the server starts the
+    requests for idle environments right away and answers in request order. Messages are pickled, so only
+    serve trusted networks. Arrays are sent out-of-band when both ends run Python 3.8 or later.
+    """
+
+    def __init__(self, env, address):
+        """
+        :param env: batch of environments with the asynchronous API of ParallelNavEnv (step_async, reset_async,
+            wait, wait_all and get_pending_connections)
+        :param address: (host, port) tuple to listen on with TCP, port 0 picking a free port, or path of a
+            Unix socket
+        """
+        self.env = env
+        self.sock = create_socket(address)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(address)
+        self.sock.listen(1)
+        self.address = self.sock.getsockname()
+        self.observation_space_is_dict = hasattr(
+            env.observation_space, 'spaces')
+        # pickle protocol of the connection, agreed on with the client by the spaces request
+        self.protocol = HANDSHAKE_PROTOCOL
+
+    def serve(self, num_connections=None):
+        """
+        Serve clients until the server is closed
+
+        :param num_connections: number of clients to serve before returning, None to serve forever
+        """
+        served = 0
+        while num_connections is None or served < num_connections:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                # the server was closed
+                break
+            if conn.family in [socket.AF_INET, socket.AF_INET6]:
+                conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.protocol = HANDSHAKE_PROTOCOL
+            try:
+                self.handle_connection(conn)
+            finally:
+                conn.close()
+            served += 1
+
+    def handle_connection(self, conn):
+        """
+        Answer the requests of a client until it closes the connection
+
+        :param conn: connected socket
+        """
+        # started requests, in request order: (request_id, method, env_ids)
+        in_flight = collections.deque()
+        # results of the environments that are ready, or exceptions of the environments that failed
+        results = {}
+        while True:
+            if len(in_flight) > 0:
+                # wait for the next request or for the environments, whichever comes first
+                ready = multiprocessing.connection.wait(
+                    [conn] + list(self.env.get_pending_connections().values()))
+                if conn not in ready:
+                    self.collect(results, in_flight, timeout=0)
+                    while len(in_flight) > 0 and all(env_id in results for env_id in in_flight[0][2]):
+                        self.answer(conn, in_flight.popleft(), results, in_flight)
+                    continue
+            try:
+                request = recv_frame(conn)
+            except EOFError:
+                self.drain(in_flight, results)
+                return
+            if not self.start_request(conn, request, in_flight, results):
+                return
+
+    def start_request(self, conn, request, in_flight, results):
+        """
+        Start a step or reset request, or answer another request once the earlier ones are answered
+
+        :param conn: connected socket
+        :param request: (request_id, method, args) of the request
+        :param in_flight: started requests
+        :param results: results of the environments that are ready
+        :return: False if the client closes the connection, True otherwise
+        """
+        request_id, method, args = request
+        if method in ['step', 'reset']:
+            env_ids = list(args[0])
+            while any(env_id in ids for _, _, ids in in_flight for env_id in env_ids):
+                # the environments are still busy with earlier requests
+                self.answer(conn, in_flight.popleft(), results, in_flight)
+            try:
+                if method == 'step':
+                    self.env.step_async(args[1], env_ids=env_ids)
+                else:
+                    self.env.reset_async(env_ids=env_ids)
+            except Exception:    # pylint: disable=broad-except
+                self.flush(conn, in_flight, results)
+                send_frame(conn, (request_id, False,
+                                  ''.join(traceback.format_exception(*sys.exc_info()))), self.protocol)
+                return True
+            in_flight.append((request_id, method, env_ids))
+            return True
+
+        self.flush(conn, in_flight, results)
+        if method == 'spaces':
+            # the argument is the highest pickle protocol of the client
+            send_frame(conn, (request_id, True, (self.env.action_space, self.env.observation_space,
+                                                 self.env.batch_size, PROTOCOL)), self.protocol)
+            self.protocol = min(args, PROTOCOL)
+        elif method == 'close':
+            send_frame(conn, (request_id, True, None), self.protocol)
+            return False
+        else:
+            send_frame(conn, (request_id, False,
+                              'Unknown request {}'.format(method)), self.protocol)
+        return True
+
+    def collect(self, results, requests, timeout=None):
+        """
+        Collect the results of the environments that are ready. If an environment fails, its exception is stored
+        as its result
+
+        :param results: results of the environments that are ready, filled by this call
+        :param requests: started requests whose results are not collected yet
+        :param timeout: maximum time to wait in seconds, None to wait for at least one environment
+        """
+        try:
+            results.update(self.env.wait(timeout=timeout))
+        except Exception:    # pylint: disable=broad-except
+            error = Exception(
+                ''.join(traceback.format_exception(*sys.exc_info())))
+            pending = self.env.get_pending_connections()
+            for _, _, env_ids in requests:
+                for env_id in env_ids:
+                    if env_id not in results and env_id not in pending:
+                        results[env_id] = error
+
+    def answer(self, conn, request, results, in_flight):
+        """
+        Wait for the environments of a request and send its results
+
+        :param conn: connected socket
+        :param request: (request_id, method, env_ids) of the request
+        :param results: results of the environments that are ready
+        :param in_flight: the other started requests
+        """
+        request_id, method, env_ids = request
+        while not all(env_id in results for env_id in env_ids):
+            self.collect(results, [request] + list(in_flight))
+        request_results = [results.pop(env_id) for env_id in env_ids]
+        errors = [result for result in request_results
+                  if isinstance(result, Exception)]
+        if len(errors) > 0:
+            send_frame(conn, (request_id, False, str(errors[0])), self.protocol)
+            return
+        try:
+            batch = batch_results(method, request_results,
+                                  self.observation_space_is_dict)
+        except Exception:    # pylint: disable=broad-except
+            send_frame(conn, (request_id, False,
+                              ''.join(traceback.format_exception(*sys.exc_info()))), self.protocol)
+            return
+        send_frame(conn, (request_id, True, batch), self.protocol)
+
+    def flush(self, conn, in_flight, results):
+        """
+        Answer all the started requests
+
+        :param conn: connected socket
+        :param in_flight: started requests
+        :param results: results of the environments that are ready
+        """
+        while len(in_flight) > 0:
+            self.answer(conn, in_flight.popleft(), results, in_flight)
+
+    def drain(self, in_flight, results):
+        """
+        Wait for the started requests of a client that disconnected, so that the next client starts with idle
+        environments
+
+        :param in_flight: started requests
+        :param results: results of the environments that are ready
+        """
+        while len(self.env.get_pending_connections()) > 0:
+            try:
+                self.env.wait_all()
+            except Exception:    # pylint: disable=broad-except
+                pass
+        in_flight.clear()
+        results.clear()
+
+    def close(self):
+        """Stop listening. The environments are not closed."""
+        self.sock.close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.remove(self.address)
+
+
+class RemoteParallelNavEnv(object):
+    """
+    Client of an EnvServer, with the API of ParallelNavEnv. Requests can be pipelined with step_async and
+    reset_async: they are sent right away, and the server starts them as soon as their environments are idle.
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        :param address: (host, port) tuple of a TCP server, or path of a Unix socket
+        :param timeout: maximum time in seconds to wait for the server to accept the connection, None to only
+            try once
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        while True:
+            self.sock = create_socket(address)
+            try:
+                self.sock.connect(address)
+                break
+            except OSError:
+                self.sock.close()
+                if deadline is None or time.time() > deadline:
+                    raise
+                time.sleep(0.05)
+        self._request_id = 0
+        # sent requests, in request order: (request_id, method, env_ids)
+        self._requests = collections.deque()
+        # env index -> method of the requests sent by step_async and reset_async
+        self._pending = {}
+        self._protocol = HANDSHAKE_PROTOCOL
+        self.action_space, self.observation_space, self._num_envs, server_protocol = self.call(
+            'spaces', PROTOCOL)
+        self._protocol = min(server_protocol, PROTOCOL)
+        self._observation_space_is_dict = hasattr(
+            self.observation_space, 'spaces')
+
+    @property
+    def batched(self):
+        return True
+
+    @property
+    def batch_size(self):
+        return self._num_envs
+
+    def send(self, method, args, env_ids=None):
+        """
+        Send a request without waiting for its answer
+
+        :param method: request name
+        :param args: arguments of the request
+        :param env_ids: environments of a step or reset request
+        :return: request id
+        """
+        self._request_id += 1
+        self.send_message((self._request_id, method, args))
+        self._requests.append((self._request_id, method, env_ids))
+        return self._request_id
+
+    def send_message(self, message):
+        """
+        :param message: request message
+        """
+        send_frame(self.sock, message, self._protocol)
+
+    def receive(self):
+        """
+        Receive the answer of the oldest request
+
+        :return: (request_id, method, env_ids, result) of the request
+        :raise Exception: an exception was raised by the server
+        """
+        return self.handle_answer(recv_frame(self.sock))
+
+    def handle_answer(self, answer):
+        """
+        :param answer: answer of the oldest request, as sent by the server
+        :return: (request_id, method, env_ids, result) of the request
+        :raise Exception: an exception was raised by the server
+        """
+        request_id, method, env_ids = self._requests.popleft()
+        answer_id, success, result = answer
+        assert answer_id == request_id, (answer_id, request_id)
+        if env_ids is not None:
+            for env_id in env_ids:
+                self._pending.pop(env_id)
+        if not success:
+            raise Exception(result)
+        return request_id, method, env_ids, result
+
+    def call(self, method, args):
+        """
+        Send a request and wait for its answer, after the answers of the earlier requests
+
+        :param method: request name
+        :param args: arguments of the request
+        :return: result of the request
+        """
+        if len(self._pending) > 0:
+            raise ValueError(
+                'Environments {} have pending requests, wait for them first'.format(sorted(self._pending)))
+        self.send(method, args)
+        return self.receive()[3]
+
+    def get_env_ids(self, env_ids):
+        """
+        :param env_ids: environment indices, or None for all the environments
+        :return: list of environment indices without a pending request
+        :raise ValueError: if an environment already has a pending request
+        """
+        if env_ids is None:
+            env_ids = range(self._num_envs)
+        env_ids = list(env_ids)
+        for env_id in env_ids:
+            if env_id in self._pending:
+                raise ValueError(
+                    'Environment {} has a pending {}, wait for it first'.format(env_id, self._pending[env_id]))
+        return env_ids
+
+    def reset_async(self, env_ids=None):
+        """Send a reset request without waiting for it. The results are collected by wait or reset_wait.
+
+        :param env_ids: environments to reset, None for all the environments
+        """
+        env_ids = self.get_env_ids(env_ids)
+        self.send('reset', (env_ids,), env_ids)
+        for env_id in env_ids:
+            self._pending[env_id] = 'reset'
+
+    def step_async(self, actions, env_ids=None):
+        """Send a step request without waiting for it. The results are collected by wait or step_wait.
+
+        :param actions: actions of the environments, in the order of env_ids
+        :param env_ids: environments to step, None for all the environments
+        """
+        env_ids = self.get_env_ids(env_ids)
+        self.send('step', (env_ids, actions), env_ids)
+        for env_id in env_ids:
+            self._pending[env_id] = 'step'
+
+    def wait(self, timeout=None, min_ready=1):
+        """Collect the answers of the requests of step_async and reset_async that are ready. Answers cover all
+        the environments of a request, so send a request per environment to collect them one by one.
+
+        :param timeout: maximum time to wait in seconds, None to wait until min_ready environments are ready
+        :param min_ready: number of ready environments to wait for, capped by the number of pending requests
+        :return: list of (env_id, result) for the ready environments, with next_obs for a reset and
+            (next_obs, reward, done, info) for a step
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        min_ready = min(min_ready, len(self._pending))
+        ready = []
+        while len(self._requests) > 0:
+            if len(ready) >= min_ready:
+                # only collect the answers that are already there
+                remaining = 0
+            elif deadline is None:
+                remaining = None
+            else:
+                remaining = max(deadline - time.time(), 0)
+            if not is_readable(self.sock, remaining):
+                break
+            _, method, env_ids, batch = self.receive()
+            ready.extend(zip(env_ids, unbatch_results(
+                method, batch, len(env_ids), self._observation_space_is_dict)))
+        return ready
+
+    def wait_all(self):
+        """
+        :return: the results of all the pending requests as a list of (env_id, result) sorted by environment
+            index
+        """
+        return sorted(self.wait(min_ready=len(self._pending)), key=lambda item: item[0])
+
+    def reset_wait(self):
+        """Wait for all the pending requests of reset_async.
+
+        :return: a list of next_obs of the pending environments
+        """
+        return [obs for _, obs in self.wait_all()]
+
+    def step_wait(self):
+        """Wait for all the pending requests of step_async.
+
+        :return: a list of [next_obs, reward, done, info] of the pending environments
+        """
+        return [result for _, result in self.wait_all()]
+
+    def reset(self):
+        """Reset all environments.
+
+        :return: a list of next_obs
+        """
+        self.reset_async()
+        return self.reset_wait()
+
+    def step(self, actions):
+        """Forward a batch of actions to the remote environments.
+
+        :param actions: batched action to apply to the environments.
+        :return: a list of [next_obs, reward, done, info]
+        """
+        self.step_async(actions)
+        return self.step_wait()
+
+    def close(self):
+        """Close the connection. The server keeps running and serves the next client."""
+        try:
+            self.wait_all()
+            self.call('close', None)
+        except (IOError, EOFError):
+            # The connection was already closed.
+            pass
+        self.sock.close()
+
+
+class AsyncRemoteParallelNavEnv(RemoteParallelNavEnv):
+    """
+    RemoteParallelNavEnv whose reset and step are coroutines. The socket is non-blocking: the requests are sent
+    with loop.add_writer when the send buffer is full, and the answers are read with loop.add_reader as they
+    arrive, so the event loop keeps running other tasks, e.g. other I/O or the steps of other environments
+    gathered with asyncio.gather. Requests gathered this way are pipelined.
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        :param address: (host, port) tuple of a TCP server, or path of a Unix socket
+        :param timeout: maximum time in seconds to wait for the server to accept the connection, None to only
+            try once
+        """
+        # parts of the requests that remain to be sent
+        self._outgoing = []
+        self._writing = False
+        self._loop = None
+        super(AsyncRemoteParallelNavEnv, self).__init__(address, timeout=timeout)
+        self.sock.setblocking(False)
+        self._reader = FrameReader(self.sock)
+        # request id -> future of the answer
+        self._futures = {}
+
+    def send_message(self, message):
+        """
+        Queue a request and send it without blocking the event loop
+
+        :param message: request message
+        """
+        if self.sock.gettimeout() is None:
+            # blocking socket of the first request, sent by the constructor
+            super(AsyncRemoteParallelNavEnv, self).send_message(message)
+            return
+        self._outgoing += pack_frame(message, self._protocol)
+        self.on_writable()
+
+    def on_writable(self):
+        """Send the queued requests, as far as the send buffer allows, and wait for it to drain for the rest."""
+        try:
+            sent = send_parts(self.sock, self._outgoing)
+        except OSError as e:
+            # the connection is broken, the answers of the requests will never come
+            self._outgoing = []
+            sent = True
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(e)
+        if sent and self._writing:
+            self._loop.remove_writer(self.sock.fileno())
+            self._writing = False
+        elif not sent and not self._writing:
+            self._loop.add_writer(self.sock.fileno(), self.on_writable)
+            self._writing = True
+
+    def on_readable(self):
+        """Resolve the futures of the answers received so far."""
+        try:
+            while len(self._futures) > 0:
+                answer = self._reader.read()
+                if answer is None:
+                    return
+                request_id = self._requests[0][0]
+                future = self._futures.pop(request_id)
+                try:
+                    _, method, env_ids, batch = self.handle_answer(answer)
+                    result = unbatch_results(
+                        method, batch, len(env_ids), self._observation_space_is_dict)
+                except Exception as e:    # pylint: disable=broad-except
+                    if not future.done():
+                        future.set_exception(e)
+                    continue
+                if not future.done():
+                    future.set_result(result)
+        except EOFError as e:
+            for future in self._futures.values():
+                if not future.done():
+                    future.set_exception(e)
+            self._futures.clear()
+        finally:
+            if len(self._futures) == 0:
+                self._loop.remove_reader(self.sock.fileno())
+
+    async def receive_results(self):
+        """
+        :return: results of the last request, as a list in the order of its environments
+        """
+        future = self._loop.create_future()
+        if len(self._futures) == 0:
+            self._loop.add_reader(self.sock.fileno(), self.on_readable)
+        self._futures[self._request_id] = future
+        return await future
+
+    async def reset(self, env_ids=None):
+        """Reset environments.
+
+        :param env_ids: environments to reset, None for all the environments
+        :return: a list of next_obs, in the order of env_ids
+        """
+        # the running loop, get_running_loop needs Python 3.7
+        self._loop = asyncio.get_event_loop()
+        self.reset_async(env_ids)
+        return await self.receive_results()
+
+    async def step(self, actions, env_ids=None):
+        """Forward actions to the remote environments.
+
+        :param actions: actions of the environments, in the order of env_ids
+        :param env_ids: environments to step, None for all the environments
+        :return: a list of [next_obs, reward, done, info], in the order of env_ids
+        """
+        self._loop = asyncio.get_event_loop()
+        self.step_async(actions, env_ids)
+        return await self.receive_results()
+
+    def receive_answers(self):
+        """
+        Receive and drop the answers of the pending requests, as far as they are received
+
+        :return: False if the connection is closed, True otherwise
+        """
+        while len(self._requests) > 0:
+            try:
+                answer = self._reader.read()
+            except (IOError, EOFError):
+                return False
+            if answer is None:
+                break
+            try:
+                self.handle_answer(answer)
+            except Exception:    # pylint: disable=broad-except
+                pass
+        return True
+
+    def close(self):
+        """Close the connection, once the answers of the pending requests are received."""
+        if len(self._futures) > 0:
+            self._loop.remove_reader(self.sock.fileno())
+        if self._writing:
+            self._loop.remove_writer(self.sock.fileno())
+            self._writing = False
+        # send the queued requests, receiving the answers meanwhile so that the server is never blocked on them
+        try:
+            while len(self._outgoing) > 0:
+                readable, writable, _ = select.select(
+                    [self.sock], [self.sock], [])
+                if len(readable) > 0 and not self.receive_answers():
+                    break
+                if len(writable) > 0:
+                    send_parts(self.sock, self._outgoing)
+        except (IOError, EOFError):
+            pass
+        self._outgoing = []
+        self.sock.setblocking(True)
+        # the reader may hold a partially received answer
+        self.receive_answers()
+        for future in self._futures.values():
+            future.cancel()
+        self._futures.clear()
+        super(AsyncRemoteParallelNavEnv, self).close()
+
+
+class iGibsonEnvConstructor(object):
+    def __init__(self, config_file, mode):
+        self.config_file = config_file
+        self.mode = mode
+
+    def __call__(self):
+        from gibson2.envs.igibson_env import iGibsonEnv
+        return iGibsonEnv(config_file=self.config_file, mode=self.mode)
+
+
+def main():
+    import argparse
+    from gibson2.envs.parallel_env import ParallelNavEnv
+    parser = argparse.ArgumentParser(
+        description='Serve a batch of iGibson environments to RemoteParallelNavEnv clients')
+    parser.add_argument('--config', required=True,
+                        help='environment config file')
+    parser.add_argument('--mode', default='headless',
+                        choices=['headless', 'headless_tensor', 'gui', 'iggui', 'pbgui'])
+    parser.add_argument('--num_envs', type=int, default=8)
+    parser.add_argument('--host', default='127.0.0.1',
+                        help='interface to listen on. The messages are pickled, so anyone who can connect can run '
+                             'code on the server: only listen on other interfaces, e.g. 0.0.0.0, on trusted '
+                             'networks')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--unix_socket', default=None,
+                        help='path of a Unix socket to listen on instead of TCP')
+    parser.add_argument('--start_method', default='forkserver')
+    args = parser.parse_args()
+    env = ParallelNavEnv([iGibsonEnvConstructor(args.config, args.mode)] * args.num_envs,
+                         auto_reset=True, start_method=args.start_method)
+    address = args.unix_socket if args.unix_socket is not None else (
+        args.host, args.port)
+    if args.unix_socket is None and args.host not in ['127.0.0.1', 'localhost', '::1']:
+        logging.warning('Listening on {}: every client that can reach it can run code on this server'.format(
+            args.host))
+    server = EnvServer(env, address)
+    print('Serving {} environments on {}'.format(args.num_envs, server.address))
+    try:
+        server.serve()
+    finally:
+        server.close()
+        env.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Preload of the environment workers started by the fork server of ParallelNavEnv (start_method='forkserver').
+The fork server imports this module once, then forks every worker from itself, so the workers share the heavy
+modules and the dataset indexes copy-on-write instead of importing and reading them again.
+"""
+import importlib
+import logging
+from gibson2.utils.assets_utils import preload_dataset_indexes
+
+# modules imported by the environments, the missing optional ones are skipped
+PRELOAD_MODULES = [
+    'cv2',
+    'networkx',
+    'trimesh',
+    'pybullet',
+    'gibson2.external.pybullet_tools.utils',
+    'gibson2.scenes.gibson_indoor_scene',
+    'gibson2.scenes.igibson_indoor_scene',
+    'gibson2.envs.igibson_env',
+    'torch',
+]
+
+
+def preload(modules=PRELOAD_MODULES):
+    """
+    Import the modules and read the dataset indexes into the caches of this process
+
+    :param modules: names of the modules to import
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            logging.info('Cannot preload {}: {}'.format(module, e))
+    preload_dataset_indexes()
+
+
+preload()
@@ -8,9 +8,10 @@ import xml.etree.ElementTree as ET
 
 from gibson2.objects.object_base import Object
 import pybullet as p
-import trimesh
 
 from gibson2.utils.urdf_utils import save_urdfs_without_floating_joints, round_up
+from gibson2.utils.urdf_cache import save_urdfs_cached
+from gibson2.utils.mass_properties_cache import get_mass_properties
 from gibson2.utils.utils import quatXYZWFromRotMat, rotate_vector_3d
 from gibson2.render.mesh_renderer.materials import RandomizedMaterial
 
@@ -124,6 +125,14 @@ class URDFObject(Object):
         #     }
         # ]
         self.visual_mesh_to_material = []
+        # randomizable materials of the visual meshes of each link, keyed by
+        # link name, for each sub URDF
+        self.link_name_to_materials = []
+        # (link index, randomizable materials) of the links with randomizable
+        # materials, for each loaded body
+        self.link_materials = []
+        # lateral friction last set on each (sub URDF index, link index)
+        self.link_frictions = {}
 
         # a list of all materials used, RandomizedMaterial
         self.materials = []
@@ -317,21 +326,21 @@ class URDFObject(Object):
         all_links = self.object_tree.findall('link')
         # compute dynamics properties
         if self.category not in ["walls", "floors", "ceilings"]:
-            all_links_trimesh = []
+            # mass properties of the collision meshes at unit density
+            all_links_mass_properties = []
             total_volume = 0.0
             for link in all_links:
                 meshes = link.findall('collision/geometry/mesh')
                 if len(meshes) == 0:
-                    all_links_trimesh.append(None)
+                    all_links_mass_properties.append(None)
                     continue
                 # assume one collision mesh per link
                 assert len(meshes) == 1, (self.filename, link.attrib['name'])
                 collision_mesh_path = os.path.join(self.model_path,
                                                    meshes[0].attrib['filename'])
-                trimesh_obj = trimesh.load(
-                    file_obj=collision_mesh_path, force='mesh')
-                all_links_trimesh.append(trimesh_obj)
-                volume = trimesh_obj.volume
+                mass_properties = get_mass_properties(collision_mesh_path)
+                all_links_mass_properties.append(mass_properties)
+                volume = mass_properties['volume']
                 # a hack to artificially increase the density of the lamp base
                 if link.attrib['name'] == 'base_link':
                     if self.category in ['lamp']:
@@ -355,16 +364,13 @@ class URDFObject(Object):
 
             density = total_mass / total_volume
             # print('avg density', density)
-            for trimesh_obj in all_links_trimesh:
-                if trimesh_obj is not None:
-                    trimesh_obj.density = density
 
-            assert len(all_links_trimesh) == len(all_links)
+            assert len(all_links_mass_properties) == len(all_links)
 
         # Now iterate over all links and scale the meshes and positions
         for i, link in enumerate(all_links):
             if self.category not in ["walls", "floors", "ceilings"]:
-                link_trimesh = all_links_trimesh[i]
+                link_mass_properties = all_links_mass_properties[i]
                 # assign dynamics properties
                 inertials = link.findall('inertial')
                 if len(inertials) == 0:
@@ -394,24 +400,26 @@ class URDFObject(Object):
                     assert len(origins) == 1
                     origin = origins[0]
 
-                if link_trimesh is not None:
+                if link_mass_properties is not None:
+                    link_density = density
                     # a hack to artificially increase the density of the lamp base
                     if link.attrib['name'] == 'base_link':
                         if self.category in ['lamp']:
-                            link_trimesh.density *= 10.0
+                            link_density *= 10.0
 
-                    if link_trimesh.is_watertight:
-                        center = link_trimesh.center_mass
-                    else:
-                        center = link_trimesh.centroid
+                    # center of mass, or centroid if the mesh is not watertight
+                    center = link_mass_properties['center']
 
                     # The inertial frame origin will be scaled down below.
                     # Here, it has the value BEFORE scaling
                     origin.attrib['xyz'] = ' '.join(map(str, center))
                     origin.attrib['rpy'] = ' '.join(map(str, [0.0, 0.0, 0.0]))
 
-                    mass.attrib['value'] = str(round_up(link_trimesh.mass, 10))
-                    moment_of_inertia = link_trimesh.moment_inertia
+                    # mass and moment of inertia scale linearly with the density
+                    mass.attrib['value'] = str(round_up(
+                        link_mass_properties['volume'] * link_density, 10))
+                    moment_of_inertia = np.array(
+                        link_mass_properties['moment_inertia']) * link_density
                     inertia.attrib['ixx'] = str(moment_of_inertia[0][0])
                     inertia.attrib['ixy'] = str(moment_of_inertia[0][1])
                     inertia.attrib['ixz'] = str(moment_of_inertia[0][2])
@@ -452,15 +460,21 @@ class URDFObject(Object):
                     [round_up(val, 10) for val in new_origin_xyz])
                 origin.attrib['xyz'] = ' '.join(map(str, new_origin_xyz))
 
-    def remove_floating_joints(self, folder=""):
+    def remove_floating_joints(self, folder=None):
         """
         Split a single urdf to multiple urdfs if there exist floating joints
+
+        :param folder: folder to save the urdfs in. If None, the urdfs are saved in (or reused from)
+            the content-addressed urdf cache, see gibson2.utils.urdf_cache
         """
         # Deal with floating joints inside the embedded urdf
-        folder_name = os.path.join(folder, self.name)
-        urdfs_no_floating = \
-            save_urdfs_without_floating_joints(self.object_tree,
-                                               folder_name)
+        if folder is None:
+            urdfs_no_floating = save_urdfs_cached(self.object_tree, self.name)
+        else:
+            folder_name = os.path.join(folder, self.name)
+            urdfs_no_floating = \
+                save_urdfs_without_floating_joints(self.object_tree,
+                                                   folder_name)
 
         # append a new tuple of file name of the instantiated embedded urdf
         # and the transformation (!= identity if its connection was floating)
@@ -481,41 +495,21 @@ class URDFObject(Object):
 
     def update_friction(self):
         """
-        Update the surface lateral friction for each link based on its material
+        Update the surface lateral friction for each link based on its material.
+        Only the links whose friction changed are updated in pybullet.
         """
         if self.material_to_friction is None:
             return
-        for i in range(len(self.urdf_paths)):
-            # if the sub URDF does not have visual meshes
-            if len(self.visual_mesh_to_material[i]) == 0:
-                continue
+        for i, link_materials in enumerate(self.link_materials):
             body_id = self.body_ids[i]
-            sub_urdf_tree = ET.parse(self.urdf_paths[i])
-
-            for j in np.arange(-1, p.getNumJoints(body_id)):
-                # base_link
-                if j == -1:
-                    link_name = p.getBodyInfo(body_id)[0].decode('UTF-8')
-                else:
-                    link_name = p.getJointInfo(body_id, j)[12].decode('UTF-8')
-                link = sub_urdf_tree.find(
-                    ".//link[@name='{}']".format(link_name))
-                link_materials = []
-                for visual_mesh in link.findall('visual/geometry/mesh'):
-                    link_materials.append(
-                        self.visual_mesh_to_material[i][visual_mesh.attrib['filename']])
-                link_frictions = []
-                for link_material in link_materials:
-                    if link_material.random_class is None:
-                        friction = 0.5
-                    elif link_material.random_class not in self.material_to_friction:
-                        friction = 0.5
-                    else:
-                        friction = self.material_to_friction.get(
-                            link_material.random_class, 0.5)
-                    link_frictions.append(friction)
-                link_friction = np.mean(link_frictions)
-                p.changeDynamics(body_id, j, lateralFriction=link_friction)
+            for link_id, materials in link_materials:
+                link_friction = np.mean(
+                    [self.material_to_friction.get(material.random_class, 0.5)
+                     for material in materials])
+                if self.link_frictions.get((i, link_id)) != link_friction:
+                    p.changeDynamics(
+                        body_id, link_id, lateralFriction=link_friction)
+                    self.link_frictions[(i, link_id)] = link_friction
 
     def prepare_texture(self):
         """
@@ -550,14 +544,22 @@ class URDFObject(Object):
             visual_mesh_to_idx[new_path] = visual_mesh_to_idx[old_path]
             del visual_mesh_to_idx[old_path]
 
-        # check each visual object belongs to which sub URDF in case of splitting
+        # check each visual object belongs to which sub URDF in case of splitting,
+        # and to which link
         for i, urdf_path in enumerate(self.urdf_paths):
             sub_urdf_tree = ET.parse(urdf_path)
-            for visual_mesh_path in visual_mesh_to_idx:
-                # check if this visual object belongs to this URDF
-                if sub_urdf_tree.find(".//mesh[@filename='{}']".format(visual_mesh_path)) is not None:
-                    self.visual_mesh_to_material[i][visual_mesh_path] = \
-                        all_materials[visual_mesh_to_idx[visual_mesh_path]]
+            link_name_to_materials = {}
+            for link in sub_urdf_tree.findall('link'):
+                link_materials = []
+                for visual_mesh in link.findall('visual/geometry/mesh'):
+                    visual_mesh_path = visual_mesh.attrib['filename']
+                    if visual_mesh_path in visual_mesh_to_idx:
+                        material = all_materials[visual_mesh_to_idx[visual_mesh_path]]
+                        self.visual_mesh_to_material[i][visual_mesh_path] = material
+                        link_materials.append(material)
+                if len(link_materials) > 0:
+                    link_name_to_materials[link.attrib['name']] = link_materials
+            self.link_name_to_materials.append(link_name_to_materials)
 
         self.materials = list(all_materials.values())
 
@@ -571,6 +573,8 @@ class URDFObject(Object):
         """
         Load the object into pybullet and set it to the correct pose
         """
+        self.link_materials = []
+        self.link_frictions = {}
         for idx in range(len(self.urdf_paths)):
             logging.info("Loading " + self.urdf_paths[idx])
             body_id = p.loadURDF(self.urdf_paths[idx])
@@ -597,8 +601,28 @@ class URDFObject(Object):
                         body_id, j, p.VELOCITY_CONTROL,
                         targetVelocity=0.0, force=self.joint_friction)
             self.body_ids.append(body_id)
+            self.link_materials.append(
+                self.get_link_materials(body_id, idx))
         return self.body_ids
 
+    def get_link_materials(self, body_id, idx):
+        """
+        Map the links of a loaded body to their randomizable materials
+
+        :param body_id: pybullet body id
+        :param idx: index of the sub URDF of the body
+        :return: list of (link index, randomizable materials) of the links with randomizable materials
+        """
+        if idx >= len(self.link_name_to_materials) or len(self.link_name_to_materials[idx]) == 0:
+            return []
+        link_name_to_materials = self.link_name_to_materials[idx]
+        link_names = [p.getBodyInfo(body_id)[0].decode('UTF-8')]
+        link_names += [p.getJointInfo(body_id, j)[12].decode('UTF-8')
+                       for j in range(p.getNumJoints(body_id))]
+        return [(link_id, link_name_to_materials[link_name])
+                for link_id, link_name in zip(range(-1, len(link_names) - 1), link_names)
+                if link_name in link_name_to_materials]
+
     def force_wakeup(self):
         """
         Force wakeup sleeping objects
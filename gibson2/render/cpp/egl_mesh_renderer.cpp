@@ -245,6 +245,8 @@ PYBIND11_MODULE(EGLRendererContext, m) {
     pymodule.def("setup_framebuffer_meshrenderer_ms", &EGLRendererContext::setup_framebuffer_meshrenderer_ms,
                  "setup framebuffer in meshrenderer with MSAA");
     pymodule.def("blit_buffer", &EGLRendererContext::blit_buffer, "blit buffer");
+    pymodule.def("set_viewport_meshrenderer", &EGLRendererContext::set_viewport_meshrenderer,
+                 "set viewport to the size of a framebuffer");
     pymodule.def("compile_shader_meshrenderer", &EGLRendererContext::compile_shader_meshrenderer,
                  "compile vertex and fragment shader");
     pymodule.def("load_object_meshrenderer", &EGLRendererContext::load_object_meshrenderer,
@@ -128,6 +128,8 @@ PYBIND11_MODULE(GLFWRendererContext, m) {
     pymodule.def("setup_framebuffer_meshrenderer_ms", &GLFWRendererContext::setup_framebuffer_meshrenderer_ms,
                  "setup framebuffer in meshrenderer with MSAA");
     pymodule.def("blit_buffer", &GLFWRendererContext::blit_buffer, "blit buffer");
+    pymodule.def("set_viewport_meshrenderer", &GLFWRendererContext::set_viewport_meshrenderer,
+                 "set viewport to the size of a framebuffer");
 
     pymodule.def("compile_shader_meshrenderer", &GLFWRendererContext::compile_shader_meshrenderer,
                  "compile vertex and fragment shader");
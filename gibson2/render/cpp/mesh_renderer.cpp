@@ -221,6 +221,10 @@ void MeshRendererContext::blit_buffer(int width, int height, GLuint fb1, GLuint
     }
 }
 
+void MeshRendererContext::set_viewport_meshrenderer(int width, int height) {
+    glViewport(0, 0, width, height);
+}
+
 py::array_t<float> MeshRendererContext::readbuffer_meshrenderer(char *mode, int width, int height, GLuint fb2) {
     glBindFramebuffer(GL_FRAMEBUFFER, fb2);
     if (!strcmp(mode, "rgb")) {
@@ -1,7 +1,7 @@
 import gibson2
 import numpy as np
 import os
-import json
+from gibson2.utils.assets_utils import load_dataset_index
 import random
 import math
 
@@ -177,24 +177,19 @@ class RandomizedMaterial(Material):
         material_json_file = os.path.join(material_dir, 'materials.json')
         assert os.path.isfile(material_json_file), \
             'cannot find material files: {}'.format(material_json_file)
-        with open(material_json_file) as f:
-            all_materials = json.load(f)
+        all_materials = load_dataset_index(material_json_file)
 
         material_files = {}
         for material_class in self.material_classes:
-            material_files[material_class] = []
             assert material_class in all_materials, \
                 'unknown material class: {}'.format(material_class)
 
             # append gibson2.ig_dataset_path/materials to the beginning
-            for material_instance in all_materials[material_class]:
-                for key in all_materials[material_class][material_instance]:
-                    value = all_materials[material_class][material_instance][key]
-                    if value is not None:
-                        value = os.path.join(material_dir, value)
-                    all_materials[material_class][material_instance][key] = value
-            material_files[material_class] = list(
-                all_materials[material_class].values())
+            material_files[material_class] = []
+            for material_instance in all_materials[material_class].values():
+                material_files[material_class].append({
+                    key: None if value is None else os.path.join(material_dir, value)
+                    for key, value in material_instance.items()})
         return material_files
 
     def randomize(self):
@@ -10,6 +10,7 @@ from gibson2.utils.constants import AVAILABLE_MODALITIES, ShadowPass
 import numpy as np
 import os
 import sys
+from collections import OrderedDict
 from gibson2.render.mesh_renderer.materials import Material, RandomizedMaterial
 from gibson2.render.mesh_renderer.instances import Instance, InstanceGroup, Robot
 from gibson2.render.mesh_renderer.visual_object import VisualObject
@@ -40,6 +41,9 @@ class MeshRenderer(object):
         self.color_tex_rgb, self.color_tex_normal, self.color_tex_semantics, self.color_tex_3d = None, None, None, None
         self.color_tex_scene_flow, self.color_tex_optical_flow = None, None
         self.depth_tex = None
+        # additional render targets at resolutions other than (width, height), keyed by (width, height)
+        self.render_targets = {}
+        self.primary_render_target = None
         self.VAOs = []
         self.VBOs = []
         self.textures = []
@@ -54,6 +58,8 @@ class MeshRenderer(object):
         self.fisheye = rendering_settings.use_fisheye
         self.optimized = rendering_settings.optimized
         self.texture_files = {}
+        # obj files parsed ahead of load_object, keyed by normalized path (see parse_visual_meshes)
+        self.parsed_obj_readers = {}
         self.enable_shadow = rendering_settings.enable_shadow
         self.platform = platform.system()
         self.optimization_process_executed = False
@@ -254,6 +260,82 @@ class MeshRenderer(object):
              self.depth_tex_ms] = self.r.setup_framebuffer_meshrenderer_ms(self.width, self.height)
 
         self.depth_tex_shadow = self.r.allocateTexture(self.width, self.height)
+        self.primary_render_target = self.get_current_render_target()
+
+    def get_current_render_target(self):
+        """
+        Get the framebuffers and textures that are currently being rendered into
+
+        :return: render target as a dictionary
+        """
+        target = {
+            'width': self.width,
+            'height': self.height,
+            'fbo': self.fbo,
+            'color_tex_rgb': self.color_tex_rgb,
+            'color_tex_normal': self.color_tex_normal,
+            'color_tex_semantics': self.color_tex_semantics,
+            'color_tex_3d': self.color_tex_3d,
+            'color_tex_scene_flow': self.color_tex_scene_flow,
+            'color_tex_optical_flow': self.color_tex_optical_flow,
+            'depth_tex': self.depth_tex,
+        }
+        if self.msaa:
+            target.update({
+                'fbo_ms': self.fbo_ms,
+                'color_tex_rgb_ms': self.color_tex_rgb_ms,
+                'color_tex_normal_ms': self.color_tex_normal_ms,
+                'color_tex_semantics_ms': self.color_tex_semantics_ms,
+                'color_tex_3d_ms': self.color_tex_3d_ms,
+                'color_tex_scene_flow_ms': self.color_tex_scene_flow_ms,
+                'color_tex_optical_flow_ms': self.color_tex_optical_flow_ms,
+                'depth_tex_ms': self.depth_tex_ms,
+            })
+        return target
+
+    def get_render_target(self, width, height):
+        """
+        Get the render target for a given resolution. Framebuffers for resolutions other than
+        the renderer's (width, height) are created the first time they are requested.
+        All render targets share the same camera (pose and vertical field of view).
+
+        :param width: width of the render target
+        :param height: height of the render target
+        :return: render target as a dictionary
+        """
+        if (width, height) == (self.primary_render_target['width'], self.primary_render_target['height']):
+            return self.primary_render_target
+        if (width, height) not in self.render_targets:
+            target = {'width': width, 'height': height}
+            [target['fbo'], target['color_tex_rgb'], target['color_tex_normal'], target['color_tex_semantics'],
+             target['color_tex_3d'], target['color_tex_scene_flow'], target['color_tex_optical_flow'],
+             target['depth_tex']] = self.r.setup_framebuffer_meshrenderer(width, height)
+            if self.msaa:
+                [target['fbo_ms'], target['color_tex_rgb_ms'], target['color_tex_normal_ms'],
+                 target['color_tex_semantics_ms'], target['color_tex_3d_ms'], target['color_tex_scene_flow_ms'],
+                 target['color_tex_optical_flow_ms'], target['depth_tex_ms']] = \
+                    self.r.setup_framebuffer_meshrenderer_ms(width, height)
+            # setting up framebuffers changes the viewport, restore it for the current render target
+            self.r.set_viewport_meshrenderer(self.width, self.height)
+            self.render_targets[(width, height)] = target
+            logging.debug('Created render target of size {}x{}'.format(width, height))
+        return self.render_targets[(width, height)]
+
+    def set_render_target(self, target):
+        """
+        Render into the given render target until the next call to this function.
+        The projection matrix is kept if the aspect ratio does not change, and otherwise
+        recomputed from the vertical field of view.
+
+        :param target: render target, from get_render_target
+        """
+        if target['width'] * self.height != target['height'] * self.width:
+            P = perspective(self.vertical_fov, float(
+                target['width']) / float(target['height']), self.znear, self.zfar)
+            self.P = np.ascontiguousarray(P, np.float32)
+        for key, value in target.items():
+            setattr(self, key, value)
+        self.r.set_viewport_meshrenderer(self.width, self.height)
 
     def load_texture_file(self, tex_filename):
         """
@@ -331,16 +413,18 @@ class MeshRenderer(object):
                           "objects")
             return
 
-        reader = tinyobjloader.ObjReader()
         logging.info("Loading {}".format(obj_path))
-        ret = reader.ParseFromFile(obj_path)
+        reader = self.parsed_obj_readers.get(os.path.normpath(obj_path))
+        if reader is None:
+            reader = tinyobjloader.ObjReader()
+            ret = reader.ParseFromFile(obj_path)
+            if not ret:
+                logging.error("Warning: {}".format(reader.Warning()))
+                logging.error("Error: {}".format(reader.Error()))
+                logging.error("Failed to load: {}".format(obj_path))
+                sys.exit(-1)
         vertex_data_indices = []
         face_indices = []
-        if not ret:
-            logging.error("Warning: {}".format(reader.Warning()))
-            logging.error("Error: {}".format(reader.Error()))
-            logging.error("Failed to load: {}".format(obj_path))
-            sys.exit(-1)
 
         if reader.Warning():
             logging.warning("Warning: {}".format(reader.Warning()))
@@ -594,6 +678,19 @@ class MeshRenderer(object):
                                        shadow_caster=shadow_caster)
         self.instances.append(instance_group)
 
+    def remove_instances(self, pybullet_uuid):
+        """
+        Remove the instances linked to a pybullet body. The visual objects and textures stay loaded,
+        so that they can be reused by other instances. Not supported by the optimized renderer.
+
+        :param pybullet_uuid: body id in pybullet
+        """
+        if self.optimized:
+            logging.error("Using optimized renderer, cannot remove objects")
+            return
+        self.instances = [instance for instance in self.instances
+                          if instance.pybullet_uuid != pybullet_uuid]
+
     def add_robot(self,
                   object_ids,
                   link_ids,
@@ -757,7 +854,8 @@ class MeshRenderer(object):
             results.append(frame)
         return results
 
-    def render(self, modes=AVAILABLE_MODALITIES, hidden=(), return_buffer=True, render_shadow_pass=True):
+    def render(self, modes=AVAILABLE_MODALITIES, hidden=(), return_buffer=True, render_shadow_pass=True,
+               resolution=None):
         """
         A function to render all the instances in the renderer and read the output from framebuffer.
 
@@ -765,8 +863,11 @@ class MeshRenderer(object):
         :param hidden: hidden instances to skip. When rendering from a robot's perspective, it's own body can be hidden
         :param return_buffer: whether to return the frame buffers as numpy arrays
         :param render_shadow_pass: whether to render shadow
+        :param resolution: (width, height) to render at, or None to use the renderer's width and height
         :return: a list of float32 numpy arrays of shape (H, W, 4) corresponding to `modes`, where last channel is alpha
         """
+        if isinstance(modes, str):
+            modes = [modes]
 
         # run optimization process the first time render is called
         if self.optimized and not self.optimization_process_executed:
@@ -777,7 +878,9 @@ class MeshRenderer(object):
                 "Rendering segmentation masks with MSAA on may generate interpolation artifacts. "
                 "It is recommended to turn MSAA off when rendering segmentation.")
 
-        render_shadow_pass = render_shadow_pass and 'rgb' in modes
+        # shadows and the skybox only affect rgb, so they are skipped for all other modalities
+        render_rgb = 'rgb' in modes
+        render_shadow_pass = render_shadow_pass and render_rgb
         need_flow_info = 'optical_flow' in modes or 'scene_flow' in modes
         self.update_dynamic_positions(need_flow_info=need_flow_info)
 
@@ -821,44 +924,62 @@ class MeshRenderer(object):
             self.r.readbuffer_meshrenderer_shadow_depth(
                 self.width, self.height, self.fbo, self.depth_tex_shadow)
 
-        # main pass
-        if self.msaa:
-            self.r.render_meshrenderer_pre(1, self.fbo_ms, self.fbo)
-        else:
-            self.r.render_meshrenderer_pre(0, 0, self.fbo)
+        # main pass, the shadow map above is always rendered at the primary resolution
+        target = None
+        if resolution is not None:
+            target = self.get_render_target(*resolution)
+            if target is self.primary_render_target:
+                target = None
+        if target is not None:
+            P = self.P
+            self.set_render_target(target)
+
+        try:
+            if self.msaa:
+                self.r.render_meshrenderer_pre(1, self.fbo_ms, self.fbo)
+            else:
+                self.r.render_meshrenderer_pre(0, 0, self.fbo)
 
-        if self.rendering_settings.enable_pbr:
-            self.r.renderSkyBox(self.skyboxShaderProgram, self.V, self.P)
+            if self.rendering_settings.enable_pbr and render_rgb:
+                self.r.renderSkyBox(self.skyboxShaderProgram, self.V, self.P)
 
-        if self.optimized:
-            if self.enable_shadow:
-                self.r.updateDynamicData(
-                    self.shaderProgram, self.pose_trans_array, self.pose_rot_array, self.last_trans_array,
-                    self.last_rot_array, self.V, self.last_V, self.P,
-                    self.lightV, self.lightP, ShadowPass.HAS_SHADOW_RENDER_SCENE, self.camera)
+            if self.optimized:
+                if self.enable_shadow and render_rgb:
+                    self.r.updateDynamicData(
+                        self.shaderProgram, self.pose_trans_array, self.pose_rot_array, self.last_trans_array,
+                        self.last_rot_array, self.V, self.last_V, self.P,
+                        self.lightV, self.lightP, ShadowPass.HAS_SHADOW_RENDER_SCENE, self.camera)
+                else:
+                    self.r.updateDynamicData(
+                        self.shaderProgram, self.pose_trans_array, self.pose_rot_array, self.last_trans_array,
+                        self.last_rot_array, self.V, self.last_V, self.P,
+                        self.lightV, self.lightP, ShadowPass.NO_SHADOW, self.camera)
+                self.r.renderOptimized(self.optimized_VAO)
             else:
-                self.r.updateDynamicData(
-                    self.shaderProgram, self.pose_trans_array, self.pose_rot_array, self.last_trans_array,
-                    self.last_rot_array, self.V, self.last_V, self.P,
-                    self.lightV, self.lightP, ShadowPass.NO_SHADOW, self.camera)
-            self.r.renderOptimized(self.optimized_VAO)
-        else:
-            for instance in self.instances:
-                if instance not in hidden:
-                    if self.enable_shadow:
-                        instance.render(
-                            shadow_pass=ShadowPass.HAS_SHADOW_RENDER_SCENE)
-                    else:
-                        instance.render(
-                            shadow_pass=ShadowPass.NO_SHADOW)
+                for instance in self.instances:
+                    if instance not in hidden:
+                        if self.enable_shadow and render_rgb:
+                            instance.render(
+                                shadow_pass=ShadowPass.HAS_SHADOW_RENDER_SCENE)
+                        else:
+                            instance.render(
+                                shadow_pass=ShadowPass.NO_SHADOW)
+
+            self.r.render_meshrenderer_post()
 
-        self.r.render_meshrenderer_post()
+            if self.msaa:
+                self.r.blit_buffer(self.width, self.height, self.fbo_ms, self.fbo)
 
-        if self.msaa:
-            self.r.blit_buffer(self.width, self.height, self.fbo_ms, self.fbo)
+            frames = None
+            if return_buffer:
+                frames = self.readbuffer(modes)
+        finally:
+            # restore the primary render target even if rendering fails
+            if target is not None:
+                self.set_render_target(self.primary_render_target)
+                self.P = P
 
-        if return_buffer:
-            return self.readbuffer(modes)
+        return frames
 
     def render_companion_window(self):
         """
@@ -951,6 +1072,11 @@ class MeshRenderer(object):
             ]
             fbo_list += [self.fbo_ms]
 
+        for target in self.render_targets.values():
+            clean_list += [target[key] for key in target
+                           if key.startswith('color_tex') or key.startswith('depth_tex')]
+            fbo_list += [target[key] for key in ['fbo', 'fbo_ms'] if key in target]
+
         if self.optimized:
             self.r.clean_meshrenderer_optimized(clean_list, [self.tex_id_1, self.tex_id_2], fbo_list,
                                                 [self.optimized_VAO], [self.optimized_VBO], [self.optimized_EBO])
@@ -965,12 +1091,15 @@ class MeshRenderer(object):
         self.color_tex_optical_flow = None
         self.depth_tex = None
         self.fbo = None
+        self.render_targets = {}
+        self.primary_render_target = None
         self.VAOs = []
         self.VBOs = []
         self.textures = []
         self.objects = []  # GC should free things here
         self.faces = []  # GC should free things here
         self.visual_objects = []
+        self.parsed_obj_readers = {}
         self.instances = []
         self.vertex_data = []
         self.shapes = []
@@ -1008,12 +1137,27 @@ class MeshRenderer(object):
         pose_cam = self.V.dot(pose_trans.T).dot(pose_rot).T
         return np.concatenate([mat2xyz(pose_cam), safemat2quat(pose_cam[:3, :3].T)])
 
-    def render_robot_cameras(self, modes=('rgb')):
+    def render_robot_cameras(self, modes=('rgb'), resolutions=None):
         """
         Render robot camera images
 
+        :param modes: a tuple consisting of a subset of ('rgb', 'normal', 'seg', '3d', 'scene_flow', 'optical_flow').
+        :param resolutions: optional dictionary that maps a mode to the (width, height) to render it at.
+            Modes that are not in the dictionary are rendered at the renderer's width and height.
+            Modes with the same resolution are rendered together in one pass, from the same camera pose.
         :return: a list of frames (number of modalities x number of robots)
         """
+        if isinstance(modes, str):
+            modes = [modes]
+        if resolutions is None:
+            resolutions = {}
+
+        # group the modes by resolution, in the order that they first appear
+        modes_by_resolution = OrderedDict()
+        for mode in modes:
+            resolution = tuple(resolutions.get(mode, (self.width, self.height)))
+            modes_by_resolution.setdefault(resolution, []).append(mode)
+
         frames = []
         for instance in self.instances:
             if isinstance(instance, Robot):
@@ -1026,8 +1170,15 @@ class MeshRenderer(object):
                 hidden_instances = []
                 if self.rendering_settings.hide_robot:
                     hidden_instances.append(instance)
-                for item in self.render(modes=modes, hidden=hidden_instances):
-                    frames.append(item)
+                robot_frames = {}
+                for resolution, resolution_modes in modes_by_resolution.items():
+                    for mode, item in zip(resolution_modes,
+                                          self.render(modes=resolution_modes,
+                                                      hidden=hidden_instances,
+                                                      resolution=resolution)):
+                        robot_frames[mode] = item
+                for mode in modes:
+                    frames.append(robot_frames[mode])
         return frames
 
     def optimize_vertex_and_texture(self):
@@ -90,13 +90,17 @@ try:
             return results
 
         def render(self, modes=AVAILABLE_MODALITIES, hidden=(),
-                   return_buffer=True, render_shadow_pass=True):
+                   return_buffer=True, render_shadow_pass=True, resolution=None):
             """
             A function to render all the instances in the renderer and read the output from framebuffer into pytorch tensor.
 
             :param modes: it should be a tuple consisting of a subset of ('rgb', 'normal', 'seg', '3d', 'optical_flow', 'scene_flow')
             :param hidden: Hidden instances to skip. When rendering from a robot's perspective, it's own body can be hidden
+            :param resolution: (width, height) to render at. Only the renderer's width and height are supported.
             """
+            if resolution is not None and tuple(resolution) != (self.width, self.height):
+                raise ValueError(
+                    'Rendering to tensor only supports the renderer resolution {}x{}'.format(self.width, self.height))
 
             super(MeshRendererG2G, self).render(modes=modes, hidden=hidden, return_buffer=False,
                                                 render_shadow_pass=render_shadow_pass)
@@ -11,6 +11,8 @@ import pybullet_data
 import pybullet as p
 import os
 from gibson2.scenes.indoor_scene import IndoorScene
+from gibson2.utils.scene_prefetcher import parse_visual_meshes
+from gibson2.utils.collision_mesh_cache import get_collision_mesh_file
 
 
 class StaticIndoorScene(IndoorScene):
@@ -66,19 +68,30 @@ class StaticIndoorScene(IndoorScene):
             self.floor_heights = sorted(list(map(float, f.readlines())))
             logging.debug('Floors {}'.format(self.floor_heights))
 
-    def load_scene_mesh(self):
+    def get_scene_mesh_file(self):
         """
-        Load scene mesh
+        Get the scene mesh file, the downsampled one if available
+
+        :return: scene mesh file
         """
         filename = os.path.join(get_scene_path(
             self.scene_id), "mesh_z_up_downsampled.obj")
         if not os.path.isfile(filename):
             filename = os.path.join(get_scene_path(
                 self.scene_id), "mesh_z_up.obj")
+        return filename
+
+    def load_scene_mesh(self):
+        """
+        Load scene mesh
+        """
+        filename = self.get_scene_mesh_file()
 
+        # the collision shape is built from a cached compact copy of the mesh, which has no texture
+        # coordinates, so the renderer is given the original mesh
         collision_id = p.createCollisionShape(
             p.GEOM_MESH,
-            fileName=filename,
+            fileName=get_collision_mesh_file(filename),
             flags=p.GEOM_FORCE_CONCAVE_TRIMESH)
         if self.pybullet_load_texture:
             visual_id = p.createVisualShape(
@@ -91,6 +104,7 @@ class StaticIndoorScene(IndoorScene):
             baseCollisionShapeIndex=collision_id,
             baseVisualShapeIndex=visual_id)
         p.changeDynamics(self.mesh_body_id, -1, lateralFriction=1)
+        self.render_mesh_files[self.mesh_body_id] = filename
 
         if self.pybullet_load_texture:
             texture_filename = get_texture_file(filename)
@@ -116,6 +130,18 @@ class StaticIndoorScene(IndoorScene):
             self.mesh_body_id, floor_body_id, -1, -1, enableCollision=0)
         self.floor_body_ids.append(floor_body_id)
 
+    def prefetch(self):
+        """
+        Load the floor metadata and the traversability maps, prepare the collision mesh and parse the scene mesh
+        for the renderer
+        """
+        self.load_floor_metadata()
+        self.load_trav_map(get_scene_path(self.scene_id))
+        self.trav_map_prefetched = True
+        get_collision_mesh_file(self.get_scene_mesh_file())
+        self.parsed_visual_meshes = parse_visual_meshes(
+            [self.get_scene_mesh_file()])
+
     def load(self):
         """
         Load the scene (including scene mesh and floor plane) into pybullet
@@ -124,7 +150,8 @@ class StaticIndoorScene(IndoorScene):
         self.load_scene_mesh()
         self.load_floor_planes()
 
-        self.load_trav_map(get_scene_path(self.scene_id))
+        if not self.trav_map_prefetched:
+            self.load_trav_map(get_scene_path(self.scene_id))
         return [self.mesh_body_id] + self.floor_body_ids
 
     def get_random_floor(self):
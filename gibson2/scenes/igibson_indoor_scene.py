@@ -1,4 +1,3 @@
-import time
 import gibson2
 import logging
 import numpy as np
@@ -8,12 +7,24 @@ import pybullet as p
 import os
 import xml.etree.ElementTree as ET
 from gibson2.scenes.gibson_indoor_scene import StaticIndoorScene
+from gibson2.utils.collision_groups import SCENE_FIXED
 import random
 import json
-from gibson2.utils.assets_utils import get_ig_scene_path, get_ig_model_path, get_ig_category_path, get_ig_category_ids, get_cubicasa_scene_path, get_3dfront_scene_path
+import hashlib
+from gibson2.utils.trav_map_cache import save_atomic
+from gibson2.utils.scene_prefetcher import parse_visual_meshes
+from gibson2.utils.room_streaming import RoomStreaming
+from gibson2.utils.assets_utils import get_ig_scene_path, get_ig_model_path, get_ig_category_path, get_ig_category_models, get_ig_category_ids, get_cubicasa_scene_path, get_3dfront_scene_path, load_dataset_index
 from PIL import Image
 
 SCENE_SOURCE = ['IG', 'CUBICASA', 'THREEDFRONT']
+SCENE_QUALITY_CHECK = ['always', 'cached', 'lazy']
+
+# bump whenever the scene quality check changes
+SCENE_QUALITY_CACHE_VERSION = 1
+
+# object categories that stay loaded when rooms are streamed
+STREAMING_RESIDENT_CATEGORIES = ['walls', 'floors', 'ceilings', 'door']
 
 
 class InteractiveIndoorScene(StaticIndoorScene):
@@ -44,6 +55,7 @@ class InteractiveIndoorScene(StaticIndoorScene):
                  load_room_instances=None,
                  seg_map_resolution=0.1,
                  scene_source="IG",
+                 scene_quality_check='cached',
                  ):
         """
         :param scene_id: Scene id
@@ -64,6 +76,9 @@ class InteractiveIndoorScene(StaticIndoorScene):
         :param load_room_instances: only load objects in these room instances into the scene (a list of str)
         :param seg_map_resolution: room segmentation map resolution
         :param scene_source: source of scene data; among IG, CUBICASA, THREEDFRONT 
+        :param scene_quality_check: when to run the scene quality check; among always (at every load),
+            cached (at load, unless the result for the same objects is cached) and lazy (on the first access of
+            quality_check, unless cached)
         """
 
         super(InteractiveIndoorScene, self).__init__(
@@ -87,6 +102,11 @@ class InteractiveIndoorScene(StaticIndoorScene):
                                               object_randomization_idx)
         else:
             fname = '{}_best'.format(scene_id)
+        if scene_quality_check not in SCENE_QUALITY_CHECK:
+            raise ValueError(
+                'Unsupported scene quality check: {}'.format(scene_quality_check))
+        self.scene_quality_check = scene_quality_check
+        self._quality_check = None
         if scene_source not in SCENE_SOURCE:
             raise ValueError(
                 'Unsupported scene source: {}'.format(scene_source))
@@ -107,14 +127,15 @@ class InteractiveIndoorScene(StaticIndoorScene):
         self.objects_by_name = {}
         self.objects_by_id = {}
         self.category_ids = get_ig_category_ids()
-
-        # Current time string to use to save the temporal urdfs
-        timestr = time.strftime("%Y%m%d-%H%M%S")
-        # Create the subfolder
-        self.scene_instance_folder = os.path.join(
-            gibson2.ig_dataset_path, "scene_instances",
-            '{}_{}_{}'.format(timestr, random.getrandbits(64), os.getpid()))
-        os.makedirs(self.scene_instance_folder, exist_ok=True)
+        # room streaming, see enable_room_streaming
+        self.room_streaming = None
+        self.streamed_rooms = set()
+        self.unloaded_object_states = {}
+        # streamed objects of each room, rooms of each streamed object and number of bodies of each room,
+        # see index_streamed_objects
+        self.room_objects = {}
+        self.streamed_object_rooms = {}
+        self.room_num_bodies = {}
 
         # Load room semantic and instance segmentation map
         self.load_room_sem_ins_seg_map(seg_map_resolution)
@@ -132,6 +153,11 @@ class InteractiveIndoorScene(StaticIndoorScene):
         # percentage of objects allowed that CANNOT extend their joints by >66%
         self.link_collision_tolerance = link_collision_tolerance
 
+        # Index the joints that connect the embedded URDF objects by their child link
+        self.joints_by_child_link = {
+            joint.find("child").attrib["link"]: joint
+            for joint in self.scene_tree.findall("joint")}
+
         # Parse all the special link entries in the root URDF that defines the scene
         for link in self.scene_tree.findall('link'):
             if 'category' in link.attrib:
@@ -162,10 +188,10 @@ class InteractiveIndoorScene(StaticIndoorScene):
                             len(set(self.load_room_instances) & set(in_rooms)) == 0:
                         continue
 
-                    category_path = get_ig_category_path(category)
-                    assert len(os.listdir(category_path)) != 0, \
+                    category_models = get_ig_category_models(category)
+                    assert len(category_models) != 0, \
                         "There are no models in category folder {}".format(
-                            category_path)
+                            get_ig_category_path(category))
 
                     if model == 'random':
                         # Using random group to assign the same model to a group of objects
@@ -183,12 +209,11 @@ class InteractiveIndoorScene(StaticIndoorScene):
                             # otherwise, this is the first instance of this random group
                             # select a random model and cache it
                             else:
-                                model = random.choice(
-                                    os.listdir(category_path))
+                                model = random.choice(category_models)
                                 self.random_groups[random_group_key] = model
                         else:
                             # Using a random instance
-                            model = random.choice(os.listdir(category_path))
+                            model = random.choice(category_models)
                     else:
                         model = link.attrib['model']
 
@@ -214,10 +239,7 @@ class InteractiveIndoorScene(StaticIndoorScene):
                 object_name = link.attrib['name']
 
                 # The joint location is given wrt the bounding box center but we need it wrt to the base_link frame
-                joint_connecting_embedded_link = \
-                    [joint for joint in self.scene_tree.findall("joint")
-                     if joint.find("child").attrib["link"]
-                     == object_name][0]
+                joint_connecting_embedded_link = self.joints_by_child_link[object_name]
 
                 joint_xyz = np.array([float(val) for val in joint_connecting_embedded_link.find(
                     "origin").attrib["xyz"].split(" ")])
@@ -318,17 +340,19 @@ class InteractiveIndoorScene(StaticIndoorScene):
 
         room_categories = os.path.join(
             gibson2.ig_dataset_path, 'metadata/room_categories.txt')
-        with open(room_categories, 'r') as fp:
-            room_cats = [line.rstrip() for line in fp.readlines()]
+        room_cats = [line.rstrip()
+                     for line in load_dataset_index(room_categories)]
+
+        # flat indices of the cells of each room type / room instance
+        room_sem_cells = self.group_cells_by_id(img_sem)
+        room_ins_cells = self.group_cells_by_id(img_ins)
 
         sem_id_to_ins_id = {}
-        unique_ins_ids = np.unique(img_ins)
-        unique_ins_ids = np.delete(unique_ins_ids, 0)
-        for ins_id in unique_ins_ids:
-            # find one pixel for each ins id
-            x, y = np.where(img_ins == ins_id)
-            # retrieve the correspounding sem id
-            sem_id = img_sem[x[0], y[0]]
+        for ins_id, cells in room_ins_cells.items():
+            if ins_id == 0:
+                continue
+            # retrieve the correspounding sem id of the first pixel of each ins id
+            sem_id = img_sem.flat[cells[0]]
             if sem_id not in sem_id_to_ins_id:
                 sem_id_to_ins_id[sem_id] = []
             sem_id_to_ins_id[sem_id].append(ins_id)
@@ -356,6 +380,38 @@ class InteractiveIndoorScene(StaticIndoorScene):
         self.room_sem_name_to_ins_name = room_sem_name_to_ins_name
         self.room_ins_map = img_ins
         self.room_sem_map = img_sem
+        self.room_sem_cells = room_sem_cells
+        self.room_ins_cells = room_ins_cells
+        self.room_sem_trav_cells = None
+        self.room_ins_trav_cells = None
+
+    def group_cells_by_id(self, seg_map):
+        """
+        Group the cells of a segmentation map by their id
+
+        :param seg_map: segmentation map
+        :return: dict from id to the (sorted) flat indices of the cells with that id
+        """
+        flat_seg_map = seg_map.ravel()
+        order = np.argsort(flat_seg_map, kind='stable')
+        ids, starts = np.unique(flat_seg_map[order], return_index=True)
+        return dict(zip(ids.tolist(), np.split(order, starts[1:])))
+
+    def load_room_trav_cells(self):
+        """
+        Intersect the cells of each room type / room instance with the traversability map
+        """
+        seg_cells = np.arange(self.seg_map_size * self.seg_map_size)
+        seg_cells = np.stack(np.divmod(seg_cells, self.seg_map_size), axis=1)
+        trav_cells = self.world_to_map(self.seg_map_to_world(seg_cells))
+        in_map = np.all((trav_cells >= 0) & (trav_cells < self.trav_map_size), axis=1)
+        trav_cells = np.clip(trav_cells, 0, self.trav_map_size - 1)
+        # assume only 1 floor
+        is_free = in_map & (self.floor_map[0][trav_cells[:, 0], trav_cells[:, 1]] == 255)
+        self.room_sem_trav_cells = {
+            sem_id: cells[is_free[cells]] for sem_id, cells in self.room_sem_cells.items()}
+        self.room_ins_trav_cells = {
+            ins_id: cells[is_free[cells]] for ins_id, cells in self.room_ins_cells.items()}
 
     def load_avg_obj_dims(self):
         """
@@ -364,8 +420,7 @@ class InteractiveIndoorScene(StaticIndoorScene):
         avg_obj_dim_file = os.path.join(
             gibson2.ig_dataset_path, 'objects/avg_category_specs.json')
         if os.path.isfile(avg_obj_dim_file):
-            with open(avg_obj_dim_file) as f:
-                return json.load(f)
+            return load_dataset_index(avg_obj_dim_file)
         else:
             return {}
 
@@ -467,10 +522,38 @@ class InteractiveIndoorScene(StaticIndoorScene):
 
         # Save the transformation internally to be used when loading
         added_object.joint_frame = joint_frame
-        added_object.remove_floating_joints(self.scene_instance_folder)
+        added_object.remove_floating_joints()
         if self.texture_randomization:
             added_object.prepare_texture()
 
+    def reuse_loaded_objects(self, scene):
+        """
+        Reuse the objects of another, already loaded instance of the same scene (e.g. another object randomization)
+        that are identical to the objects of this scene, i.e. that have the same sub URDFs (which are
+        content-addressed, see gibson2.utils.urdf_cache) and poses. Reused objects are reset to their initial pose.
+        Must be called before load.
+
+        :param scene: loaded InteractiveIndoorScene instance of the same scene
+        :return: pybullet body ids of the objects of the other scene that are not reused
+        """
+        unused_body_ids = []
+        for name, obj in scene.objects_by_name.items():
+            new_obj = self.objects_by_name.get(name)
+            if obj.loaded and new_obj is not None and \
+                    new_obj.urdf_paths == obj.urdf_paths and \
+                    all(np.allclose(new_pose, pose) for new_pose, pose in zip(new_obj.poses, obj.poses)):
+                self.objects_by_name[name] = obj
+                objects = self.objects_by_category[obj.category]
+                objects[objects.index(new_obj)] = obj
+                obj.reset()
+            else:
+                for body_id in obj.body_ids:
+                    scene.collision_groups.remove_body(body_id)
+                unused_body_ids += obj.body_ids
+        # keep the collision classes declared for the robots and other objects
+        self.collision_groups = scene.collision_groups
+        return unused_body_ids
+
     def randomize_texture(self):
         """
         Randomize texture/material for all objects in the scene
@@ -536,11 +619,9 @@ class InteractiveIndoorScene(StaticIndoorScene):
                 for obj2_body_id in self.objects_by_name[obj2_name].body_ids:
                     overlapped_body_ids.append((obj1_body_id, obj2_body_id))
 
-        # cache pybullet initial state
-        state_id = p.saveState()
-
         # check if these overlapping bboxes have collision
-        p.stepSimulation()
+        # (collision detection only, the state of the simulation does not change)
+        p.performCollisionDetection()
         for body_a, body_b in overlapped_body_ids:
             has_collision = self.check_collision(body_a=body_a, body_b=body_b)
             quality_check = quality_check and (not has_collision)
@@ -554,6 +635,8 @@ class InteractiveIndoorScene(StaticIndoorScene):
         joint_collision_so_far = 0
         for body_id in fixed_body_ids:
             joint_quality = True
+            # joint positions to check: j_default, 33% and 66% of the range
+            joint_positions = {}
             for joint_id in range(p.getNumJoints(body_id)):
                 j_low, j_high = p.getJointInfo(body_id, joint_id)[8:10]
                 j_type = p.getJointInfo(body_id, joint_id)[2]
@@ -569,34 +652,37 @@ class InteractiveIndoorScene(StaticIndoorScene):
                 if not (j_low <= j_default <= j_high):
                     j_default = j_low
 
-                # check three joint positions, 0%, 33% and 66%
                 j_range = j_high - j_low
-                j_low_perc = j_range * 0.33 + j_low
-                j_high_perc = j_range * 0.66 + j_low
-
-                # check if j_default has collision
-                p.restoreState(state_id)
-                p.resetJointState(body_id, joint_id, j_default)
-                p.stepSimulation()
-                has_collision = self.check_collision(
-                    body_a=body_id, link_a=joint_id, fixed_body_ids=fixed_body_ids)
-                joint_quality = joint_quality and (not has_collision)
-
-                # check if j_low_perc has collision
-                p.restoreState(state_id)
-                p.resetJointState(body_id, joint_id, j_low_perc)
-                p.stepSimulation()
-                has_collision = self.check_collision(
-                    body_a=body_id, link_a=joint_id, fixed_body_ids=fixed_body_ids)
-                joint_quality = joint_quality and (not has_collision)
-
-                # check if j_high_perc has collision
-                p.restoreState(state_id)
-                p.resetJointState(body_id, joint_id, j_high_perc)
-                p.stepSimulation()
-                has_collision = self.check_collision(
-                    body_a=body_id, link_a=joint_id, fixed_body_ids=fixed_body_ids)
-                joint_quality = joint_quality and (not has_collision)
+                joint_positions[joint_id] = [
+                    j_default, j_range * 0.33 + j_low, j_range * 0.66 + j_low]
+            if len(joint_positions) == 0:
+                continue
+
+            # joints that do not move each other's links are checked at the same time,
+            # the other ones one by one
+            joint_batches = [[]]
+            for joint_id in joint_positions:
+                if self.has_movable_ancestor(body_id, joint_id):
+                    joint_batches.append([joint_id])
+                else:
+                    joint_batches[0].append(joint_id)
+
+            initial_joint_states = p.getJointStates(
+                body_id, list(joint_positions.keys()))
+            for joint_batch in joint_batches:
+                for i in range(3):
+                    for joint_id in joint_batch:
+                        p.resetJointState(
+                            body_id, joint_id, joint_positions[joint_id][i])
+                    p.performCollisionDetection()
+                    for joint_id in joint_batch:
+                        has_collision = self.check_collision(
+                            body_a=body_id, link_a=joint_id, fixed_body_ids=fixed_body_ids)
+                        joint_quality = joint_quality and (not has_collision)
+                    for joint_id, joint_state in zip(joint_positions, initial_joint_states):
+                        if joint_id in joint_batch:
+                            p.resetJointState(
+                                body_id, joint_id, joint_state[0], joint_state[1])
 
             if not joint_quality:
                 joint_collision_so_far += 1
@@ -605,11 +691,7 @@ class InteractiveIndoorScene(StaticIndoorScene):
         quality_check = quality_check and (
             joint_collision_so_far <= joint_collision_allowed)
 
-        # restore state to the initial state before testing collision
-        p.restoreState(state_id)
-        p.removeState(state_id)
-
-        self.quality_check = quality_check
+        self._quality_check = quality_check
 
         self.body_collision_set = set()
         for body_a, body_b in body_body_collision:
@@ -627,7 +709,77 @@ class InteractiveIndoorScene(StaticIndoorScene):
             ))
             self.link_collision_set.add(body_id_to_name[body_id])
 
-        return self.quality_check
+        return self._quality_check
+
+    def has_movable_ancestor(self, body_id, joint_id):
+        """
+        :param body_id: pybullet body id
+        :param joint_id: joint index
+        :return: whether the link of the joint is moved by another revolute or prismatic joint
+        """
+        parent_idx = p.getJointInfo(body_id, joint_id)[-1]
+        while parent_idx >= 0:
+            if p.getJointInfo(body_id, parent_idx)[2] in [p.JOINT_REVOLUTE, p.JOINT_PRISMATIC]:
+                return True
+            parent_idx = p.getJointInfo(body_id, parent_idx)[-1]
+        return False
+
+    def get_scene_quality_cache_file(self):
+        """
+        Get the cache file of the scene quality check. The result of the check only depends on the
+        scene and on the objects that are checked, i.e. loaded by load: without the objects of the
+        streamed rooms, or only the first N objects. The key has the stamp of the scene file, which
+        covers the object poses, and the name, category, model and scale of every checked object.
+
+        :return: path of the cache file
+        """
+        objects = [[obj.name, obj.category, obj.model,
+                    np.asarray(obj.scale).tolist() if obj.scale is not None else None]
+                   for obj in self.quality_check_objects]
+        stat = os.stat(self.scene_file)
+        key = json.dumps([SCENE_QUALITY_CACHE_VERSION,
+                          os.path.abspath(self.scene_file),
+                          stat.st_size, int(stat.st_mtime),
+                          self.link_collision_tolerance,
+                          objects])
+        return os.path.join(gibson2.cache_path, 'scene_quality', '{}_{}.json'.format(
+            self.scene_id, hashlib.md5(key.encode('utf-8')).hexdigest()))
+
+    @property
+    def quality_check(self):
+        """
+        Whether the scene passes the scene quality check (see check_scene_quality).
+        The result is loaded from the cache if available, otherwise the check runs and the result is cached.
+        """
+        if self._quality_check is not None:
+            return self._quality_check
+        cache_file = self.get_scene_quality_cache_file()
+        if self.scene_quality_check != 'always' and os.path.isfile(cache_file):
+            try:
+                with open(cache_file, 'r') as f:
+                    cached = json.load(f)
+                self._quality_check = cached['quality_check']
+                self.body_collision_set = set(cached['body_collision'])
+                self.link_collision_set = set(cached['link_collision'])
+                return self._quality_check
+            except (IOError, OSError, ValueError, KeyError) as e:
+                logging.warning(
+                    'Cannot load scene quality check {}: {}'.format(cache_file, e))
+
+        self.check_scene_quality(*self.quality_check_body_ids)
+        cached = {
+            'quality_check': self._quality_check,
+            'body_collision': sorted(self.body_collision_set),
+            'link_collision': sorted(self.link_collision_set),
+        }
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            save_atomic(cache_file,
+                        lambda f: f.write(json.dumps(cached).encode('utf-8')))
+        except (IOError, OSError) as e:
+            logging.warning(
+                'Cannot save scene quality check {}: {}'.format(cache_file, e))
+        return self._quality_check
 
     def _set_first_n_objects(self, first_n_objects):
         """
@@ -749,6 +901,144 @@ class InteractiveIndoorScene(StaticIndoorScene):
         """
         return self.open_all_objs_by_category('door', mode='max')
 
+    def enable_room_streaming(self, load_distance=3.0, unload_distance=5.0, max_bodies=None):
+        """
+        Only load the objects of the rooms around the robot (see RoomStreaming), which keeps the number of bodies
+        bounded in large scenes. Walls, floors, ceilings and doors are always loaded. Must be called before load;
+        the rooms are then loaded and unloaded by Simulator.stream_ig_scene.
+
+        :param load_distance: rooms closer than this distance (in meters) to the robot are loaded
+        :param unload_distance: loaded rooms farther than this distance (in meters) from the robot are unloaded
+        :param max_bodies: maximum number of bodies of the loaded rooms, None for no budget
+        """
+        self.room_streaming = RoomStreaming(
+            self, load_distance=load_distance, unload_distance=unload_distance, max_bodies=max_bodies)
+
+    def get_object_rooms(self, obj):
+        """
+        :param obj: scene object
+        :return: set of the room instance ids of the object, or None if the object is not streamed
+        """
+        if obj.category in STREAMING_RESIDENT_CATEGORIES or obj.in_rooms is None:
+            return None
+        rooms = set(self.room_ins_name_to_ins_id[room] for room in obj.in_rooms
+                    if room in self.room_ins_name_to_ins_id)
+        return rooms if len(rooms) > 0 else None
+
+    def index_streamed_objects(self):
+        """
+        Index the streamed objects by room once, so that streaming updates only look at the objects of the rooms
+        that are loaded or unloaded
+        """
+        self.room_objects = {}
+        self.streamed_object_rooms = {}
+        self.room_num_bodies = {}
+        for obj in self.objects_by_name.values():
+            rooms = self.get_object_rooms(obj)
+            if rooms is None:
+                continue
+            self.streamed_object_rooms[obj.name] = rooms
+            for room in rooms:
+                self.room_objects.setdefault(room, []).append(obj)
+                self.room_num_bodies[room] = self.room_num_bodies.get(
+                    room, 0) + len(obj.urdf_paths)
+
+    def get_room_streaming_update(self, xy):
+        """
+        Select the rooms to load for a robot position
+
+        :param xy: 2D location of the robot in world reference frame
+        :return: objects to load and objects to unload
+        """
+        rooms = self.room_streaming.get_rooms(
+            xy, self.streamed_rooms, self.room_num_bodies)
+        if rooms == self.streamed_rooms:
+            return [], []
+        changed = sorted(rooms ^ self.streamed_rooms)
+        self.streamed_rooms = rooms
+        to_load = []
+        to_unload = []
+        visited = set()
+        for room in changed:
+            for obj in self.room_objects.get(room, []):
+                if obj.name in visited:
+                    continue
+                visited.add(obj.name)
+                needed = len(self.streamed_object_rooms[obj.name] & rooms) > 0
+                if needed and not obj.loaded:
+                    to_load.append(obj)
+                elif not needed and obj.loaded:
+                    to_unload.append(obj)
+        return to_load, to_unload
+
+    def load_streamed_object(self, obj):
+        """
+        Load an object of a streamed room into pybullet, in the state it was unloaded in
+
+        :param obj: scene object
+        :return: pybullet body ids of the object
+        """
+        body_ids = obj.load()
+        for body_id, state in zip(body_ids, self.unloaded_object_states.pop(obj.name, [])):
+            pos, orn, joint_positions = state
+            p.resetBasePositionAndOrientation(body_id, pos, orn)
+            for joint_id, joint_position in joint_positions:
+                p.resetJointState(body_id, joint_id, joint_position)
+        for body_id, is_fixed in zip(body_ids, obj.is_fixed):
+            self.objects_by_id[body_id] = obj
+            if is_fixed:
+                self.collision_groups.add_body(SCENE_FIXED, body_id, [0])
+        return body_ids
+
+    def unload_streamed_object(self, obj):
+        """
+        Forget the bodies of an object of a streamed room and keep its state for the next load.
+        The caller removes the bodies from pybullet and the renderer.
+
+        :param obj: scene object
+        :return: pybullet body ids of the object
+        """
+        body_ids = obj.body_ids
+        state = []
+        for body_id in body_ids:
+            pos, orn = p.getBasePositionAndOrientation(body_id)
+            joint_positions = [(joint_id, p.getJointState(body_id, joint_id)[0])
+                               for joint_id in range(p.getNumJoints(body_id))
+                               if p.getJointInfo(body_id, joint_id)[2] in [p.JOINT_REVOLUTE, p.JOINT_PRISMATIC]]
+            state.append((pos, orn, joint_positions))
+            del self.objects_by_id[body_id]
+            self.collision_groups.remove_body(body_id)
+        self.unloaded_object_states[obj.name] = state
+        obj.body_ids = []
+        obj.body_id = None
+        obj.loaded = False
+        return body_ids
+
+    def get_visual_mesh_files(self):
+        """
+        Get the visual mesh files of all scene objects
+
+        :return: list of visual mesh files
+        """
+        mesh_files = []
+        for obj in self.objects_by_name.values():
+            for urdf_path in obj.urdf_paths:
+                for mesh in ET.parse(urdf_path).findall('.//visual/geometry/mesh'):
+                    mesh_files.append(os.path.join(
+                        os.path.dirname(urdf_path), mesh.attrib['filename']))
+        return mesh_files
+
+    def prefetch(self):
+        """
+        Load the traversability maps if needed, and parse the visual meshes of the objects for the renderer
+        """
+        if self.build_graph:
+            self.load_trav_map(os.path.join(self.scene_dir, "layout"))
+            self.load_room_trav_cells()
+            self.trav_map_prefetched = True
+        self.parsed_visual_meshes = parse_visual_meshes(
+            self.get_visual_mesh_files())
+
     def load(self):
         """
         Load all scene objects into pybullet
@@ -757,9 +1047,13 @@ class InteractiveIndoorScene(StaticIndoorScene):
         body_ids = []
         fixed_body_ids = []
         visual_mesh_to_material = []
+        loaded_objects = []
         num_loaded = 0
         for int_object in self.objects_by_name:
             obj = self.objects_by_name[int_object]
+            if self.room_streaming is not None and self.get_object_rooms(obj) is not None:
+                # loaded by Simulator.stream_ig_scene
+                continue
             new_ids = obj.load()
             for id in new_ids:
                 self.objects_by_id[id] = obj
@@ -768,27 +1062,33 @@ class InteractiveIndoorScene(StaticIndoorScene):
             fixed_body_ids += [body_id for body_id, is_fixed
                                in zip(obj.body_ids, obj.is_fixed)
                                if is_fixed]
+            loaded_objects.append(obj)
             num_loaded += 1
             if num_loaded > self.first_n_objects:
                 break
 
         # disable collision between the fixed links of the fixed objects
-        for i in range(len(fixed_body_ids)):
-            for j in range(i + 1, len(fixed_body_ids)):
-                # link_id = 0 is the base link that is connected to the world
-                # by a fixed link
-                p.setCollisionFilterPair(
-                    fixed_body_ids[i],
-                    fixed_body_ids[j],
-                    0, 0, enableCollision=0)
+        self.collision_groups.set_collision(SCENE_FIXED, SCENE_FIXED, False)
+        for body_id in fixed_body_ids:
+            # link_id = 0 is the base link that is connected to the world
+            # by a fixed link
+            self.collision_groups.add_body(SCENE_FIXED, body_id, [0])
 
         # Load the traversability map
         maps_path = os.path.join(self.scene_dir, "layout")
-        if self.build_graph:
+        if self.build_graph and not self.trav_map_prefetched:
             self.load_trav_map(maps_path)
+            self.load_room_trav_cells()
+
+        if self.room_streaming is not None:
+            self.index_streamed_objects()
 
         self.visual_mesh_to_material = visual_mesh_to_material
-        self.check_scene_quality(body_ids, fixed_body_ids)
+        self.quality_check_body_ids = (body_ids, fixed_body_ids)
+        self.quality_check_objects = loaded_objects
+        self._quality_check = None
+        if self.scene_quality_check != 'lazy':
+            self.quality_check
 
         # force wake up each body once
         self.force_wakeup_scene_objects()
@@ -808,6 +1108,8 @@ class InteractiveIndoorScene(StaticIndoorScene):
         """
         for obj_name in self.objects_by_name:
             self.objects_by_name[obj_name].reset()
+        # unloaded objects of streamed rooms are loaded in their original pose
+        self.unloaded_object_states.clear()
 
         if self.should_open_all_doors:
             self.force_wakeup_scene_objects()
@@ -821,11 +1123,12 @@ class InteractiveIndoorScene(StaticIndoorScene):
         """
         return len(self.objects_by_name)
 
-    def get_random_point_by_room_type(self, room_type):
+    def get_random_point_by_room_type(self, room_type, traversable=False):
         """
         Sample a random point by room type
 
         :param room_type: room type (e.g. bathroom)
+        :param traversable: only sample points that are traversable, requires the traversability map
         :return: floor (always 0), a randomly sampled point in [x, y, z]
         """
         if room_type not in self.room_sem_name_to_sem_id:
@@ -833,20 +1136,20 @@ class InteractiveIndoorScene(StaticIndoorScene):
             return None, None
 
         sem_id = self.room_sem_name_to_sem_id[room_type]
-        valid_idx = np.array(np.where(self.room_sem_map == sem_id))
-        random_point_map = valid_idx[:, np.random.randint(valid_idx.shape[1])]
-
-        x, y = self.seg_map_to_world(random_point_map)
-        # assume only 1 floor
-        floor = 0
-        z = self.floor_heights[floor]
-        return floor, np.array([x, y, z])
+        if traversable:
+            assert self.room_sem_trav_cells is not None, \
+                'cannot sample traversable points without the traversability map'
+            cells = self.room_sem_trav_cells[sem_id]
+        else:
+            cells = self.room_sem_cells[sem_id]
+        return self.sample_seg_map_cell(cells)
 
-    def get_random_point_by_room_instance(self, room_instance):
+    def get_random_point_by_room_instance(self, room_instance, traversable=False):
         """
         Sample a random point by room instance
 
         :param room_instance: room instance (e.g. bathroom_1)
+        :param traversable: only sample points that are traversable, requires the traversability map
         :return: floor (always 0), a randomly sampled point in [x, y, z]
         """
         if room_instance not in self.room_ins_name_to_ins_id:
@@ -855,8 +1158,27 @@ class InteractiveIndoorScene(StaticIndoorScene):
             return None, None
 
         ins_id = self.room_ins_name_to_ins_id[room_instance]
-        valid_idx = np.array(np.where(self.room_ins_map == ins_id))
-        random_point_map = valid_idx[:, np.random.randint(valid_idx.shape[1])]
+        if traversable:
+            assert self.room_ins_trav_cells is not None, \
+                'cannot sample traversable points without the traversability map'
+            cells = self.room_ins_trav_cells[ins_id]
+        else:
+            cells = self.room_ins_cells[ins_id]
+        return self.sample_seg_map_cell(cells)
+
+    def sample_seg_map_cell(self, cells):
+        """
+        Sample a random point from the given cells of the room segmentation map
+
+        :param cells: flat indices of room segmentation map cells
+        :return: floor (always 0), a randomly sampled point in [x, y, z], or None if there is no cell
+        """
+        if cells.shape[0] == 0:
+            logging.warning('no valid point to sample from.')
+            return None, None
+
+        random_point_map = np.array(
+            divmod(cells[np.random.randint(cells.shape[0])], self.seg_map_size))
 
         x, y = self.seg_map_to_world(random_point_map)
         # assume only 1 floor
@@ -881,15 +1203,24 @@ class InteractiveIndoorScene(StaticIndoorScene):
         :param xy: 2D location in world reference frame (metric)
         :return: 2D location in seg map reference frame (image)
         """
-        return np.flip((xy / self.seg_map_resolution + self.seg_map_size / 2.0)).astype(np.int)
+        axis = 0 if len(xy.shape) == 1 else 1
+        return np.flip((xy / self.seg_map_resolution + self.seg_map_size / 2.0), axis=axis).astype(np.int)
 
     def get_room_type_by_point(self, xy):
         """
-        Return the room type given a point
+        Return the room type given a point, or given an array of points
 
-        :param xy: 2D location in world reference frame (metric)
-        :return: room type that this point is in or None, if this point is not on the room segmentation map
+        :param xy: 2D location in world reference frame (metric), or Nx2 locations
+        :return: room type that this point is in or None, if this point is not on the room segmentation map.
+            A list of room types if an array of points is given
         """
+        xy = np.asarray(xy)
+        if xy.ndim == 2:
+            cells = self.world_to_seg_map(xy)
+            sem_ids = self.room_sem_map[cells[:, 0], cells[:, 1]]
+            return [None if sem_id == 0 else self.room_sem_id_to_sem_name[sem_id]
+                    for sem_id in sem_ids]
+
         x, y = self.world_to_seg_map(xy)
         sem_id = self.room_sem_map[x, y]
         # room boundary
@@ -900,11 +1231,18 @@ class InteractiveIndoorScene(StaticIndoorScene):
 
     def get_room_instance_by_point(self, xy):
         """
-        Return the room instance given a point
+        Return the room instance given a point, or given an array of points
 
-        :param xy: 2D location in world reference frame (metric)
-        :return: room instance that this point is in or None, if this point is not on the room segmentation map
+        :param xy: 2D location in world reference frame (metric), or Nx2 locations
+        :return: room instance that this point is in or None, if this point is not on the room segmentation map.
+            A list of room instances if an array of points is given
         """
+        xy = np.asarray(xy)
+        if xy.ndim == 2:
+            cells = self.world_to_seg_map(xy)
+            ins_ids = self.room_ins_map[cells[:, 0], cells[:, 1]]
+            return [None if ins_id == 0 else self.room_ins_id_to_ins_name[ins_id]
+                    for ins_id in ins_ids]
 
         x, y = self.world_to_seg_map(xy)
         ins_id = self.room_ins_map[x, y]
@@ -1,8 +1,5 @@
 import logging
-import pickle
-import networkx as nx
 import cv2
-import sys
 from PIL import Image
 import numpy as np
 from gibson2.objects.articulated_object import ArticulatedObject, URDFObject
@@ -11,7 +8,11 @@ from gibson2.utils.assets_utils import get_scene_path, get_texture_file, get_ig_
 import pybullet_data
 import pybullet as p
 import os
+from collections import OrderedDict
 from gibson2.scenes.scene_base import Scene
+from gibson2.utils.trav_graph import TraversableGraph
+from gibson2.utils.trav_map_cache import TravMapCache
+from gibson2.utils.dynamic_occupancy import DynamicOccupancy
 
 
 class IndoorScene(Scene):
@@ -57,10 +58,37 @@ class IndoorScene(Scene):
         self.mesh_body_id = None
         self.pybullet_load_texture = pybullet_load_texture
         self.floor_heights = [0.0]
+        # distance fields to recently queried targets,
+        # keyed by (floor, target node, whether movable bodies are avoided)
+        self.distance_fields = OrderedDict()
+        self.max_distance_fields = 8
+        self.trav_map_cache = None
+        # whether load_trav_map already ran in prefetch
+        self.trav_map_prefetched = False
+        # occupancy of movable bodies on top of the traversability map, see enable_dynamic_occupancy
+        self.dynamic_occupancy = None
+        self.blocked_nodes = None
+        self.dynamic_adjacency = None
+
+    def get_trav_map_files(self, maps_path, floor):
+        """
+        Get the source traversability and obstacle maps of a floor
+
+        :param maps_path: String with the path to the folder containing the traversability maps
+        :param floor: floor number
+        :return: paths of the traversability map and obstacle map
+        """
+        if self.trav_map_type == 'with_obj':
+            return [os.path.join(maps_path, 'floor_trav_{}.png'.format(floor)),
+                    os.path.join(maps_path, 'floor_{}.png'.format(floor))]
+        else:
+            return [os.path.join(maps_path, 'floor_trav_no_obj_{}.png'.format(floor)),
+                    os.path.join(maps_path, 'floor_no_obj_{}.png'.format(floor))]
 
     def load_trav_map(self, maps_path):
         """
-        Loads the traversability maps for all floors
+        Loads the traversability maps for all floors.
+        Processed maps are cached (see TravMapCache) and loaded with mmap if available.
 
         :param maps_path: String with the path to the folder containing the traversability maps
         """
@@ -70,42 +98,82 @@ class IndoorScene(Scene):
 
         self.floor_map = []
         self.floor_graph = []
+        self.floor_free_cells = []
+        self.floor_clearance = []
+        self.distance_fields.clear()
+        cache = TravMapCache(maps_path,
+                             self.scene_id,
+                             self.trav_map_resolution,
+                             self.trav_map_erosion,
+                             self.trav_map_type,
+                             self.build_graph)
         for floor in range(len(self.floor_heights)):
-            if self.trav_map_type == 'with_obj':
-                trav_map = np.array(Image.open(
-                    os.path.join(maps_path, 'floor_trav_{}.png'.format(floor))
-                ))
-                obstacle_map = np.array(Image.open(
-                    os.path.join(maps_path, 'floor_{}.png'.format(floor))
-                ))
-            else:
-                trav_map = np.array(Image.open(
-                    os.path.join(
-                        maps_path, 'floor_trav_no_obj_{}.png'.format(floor))
-                ))
-                obstacle_map = np.array(Image.open(
-                    os.path.join(
-                        maps_path, 'floor_no_obj_{}.png'.format(floor))
-                ))
-            if self.trav_map_original_size is None:
-                height, width = trav_map.shape
-                assert height == width, 'trav map is not a square'
-                self.trav_map_original_size = height
-                self.trav_map_size = int(self.trav_map_original_size *
-                                         self.trav_map_default_resolution /
-                                         self.trav_map_resolution)
-            trav_map[obstacle_map == 0] = 0
-            trav_map = cv2.resize(
-                trav_map, (self.trav_map_size, self.trav_map_size))
-            trav_map = cv2.erode(trav_map, np.ones(
-                (self.trav_map_erosion, self.trav_map_erosion)))
-            trav_map[trav_map < 255] = 0
+            source_files = self.get_trav_map_files(maps_path, floor)
+            cached = cache.load(floor, source_files)
+            if cached is None:
+                trav_map, clearance = self.process_trav_map(source_files)
+                if self.build_graph:
+                    self.build_trav_graph(maps_path, floor, trav_map)
+                graph = self.floor_graph.pop() if self.build_graph else None
+                cache.save(floor, source_files, trav_map, clearance, graph,
+                           self.trav_map_original_size)
+                # attach to the saved copy, which is shared with the other processes
+                cached = cache.load(floor, source_files)
+                if cached is None:
+                    if graph is not None:
+                        self.floor_graph.append(graph)
+                    self.floor_map.append(trav_map)
+                    self.floor_free_cells.append(np.flatnonzero(trav_map == 255))
+                    self.floor_clearance.append(clearance)
+                    continue
 
+            trav_map, free_cells, clearance, graph, metadata = cached
+            self.trav_map_original_size = metadata['original_size']
+            self.trav_map_size = metadata['map_size']
             if self.build_graph:
-                self.build_trav_graph(maps_path, floor, trav_map)
+                self.floor_graph.append(graph)
             self.floor_map.append(trav_map)
+            self.floor_free_cells.append(free_cells)
+            self.floor_clearance.append(clearance)
+        self.trav_map_cache = cache
+
+    def process_trav_map(self, source_files):
+        """
+        Resize, erode and threshold the traversability map of a floor
+
+        :param source_files: paths of the traversability map and obstacle map
+        :return: processed traversability map, and clearance map before erosion (see compute_clearance)
+        """
+        trav_map = np.array(Image.open(source_files[0]))
+        obstacle_map = np.array(Image.open(source_files[1]))
+        if self.trav_map_original_size is None:
+            height, width = trav_map.shape
+            assert height == width, 'trav map is not a square'
+            self.trav_map_original_size = height
+            self.trav_map_size = int(self.trav_map_original_size *
+                                     self.trav_map_default_resolution /
+                                     self.trav_map_resolution)
+        trav_map[obstacle_map == 0] = 0
+        trav_map = cv2.resize(
+            trav_map, (self.trav_map_size, self.trav_map_size))
+        clearance = self.compute_clearance(trav_map)
+        trav_map = cv2.erode(trav_map, np.ones(
+            (self.trav_map_erosion, self.trav_map_erosion)))
+        trav_map[trav_map < 255] = 0
+        return trav_map, clearance
+
+    def compute_clearance(self, trav_map):
+        """
+        Compute the Euclidean distance transform of the obstacles of a (non-eroded) traversability map
+
+        :param trav_map: traversability map, where 255 is free space
+        :return: distance (in meters) from the center of every cell to the center of the closest
+            non-free cell, 0 for non-free cells
+        """
+        free = (trav_map == 255).astype(np.uint8)
+        clearance = cv2.distanceTransform(free, cv2.DIST_L2, cv2.DIST_MASK_PRECISE)
+        return clearance * np.float32(self.trav_map_resolution)
 
-    # TODO: refactor into C++ for speedup
     def build_trav_graph(self, maps_path, floor, trav_map):
         """
         Build traversibility graph and only take the largest connected component
@@ -114,43 +182,12 @@ class IndoorScene(Scene):
         :param floor: floor number
         :param trav_map: traversability map
         """
-        graph_file = os.path.join(maps_path, 'floor_trav_{}_py{}{}.p'.format(floor, sys.version_info.major,
-                                                                             sys.version_info.minor))
-        if os.path.isfile(graph_file):
-            logging.info("Loading traversable graph")
-            with open(graph_file, 'rb') as pfile:
-                g = pickle.load(pfile)
-        else:
-            logging.info("Building traversable graph")
-            g = nx.Graph()
-            for i in range(self.trav_map_size):
-                for j in range(self.trav_map_size):
-                    if trav_map[i, j] == 0:
-                        continue
-                    g.add_node((i, j))
-                    # 8-connected graph
-                    neighbors = [
-                        (i - 1, j - 1), (i, j - 1),
-                        (i + 1, j - 1), (i - 1, j)]
-                    for n in neighbors:
-                        if 0 <= n[0] < self.trav_map_size and \
-                            0 <= n[1] < self.trav_map_size and \
-                                trav_map[n[0], n[1]] > 0:
-                            g.add_edge(
-                                n, (i, j), weight=l2_distance(n, (i, j)))
-
-            # only take the largest connected component
-            largest_cc = max(nx.connected_components(g), key=len)
-            g = g.subgraph(largest_cc).copy()
-            with open(graph_file, 'wb') as pfile:
-                pickle.dump(g, pfile)
-
+        logging.info("Building traversable graph")
+        g = TraversableGraph.from_trav_map(trav_map)
         self.floor_graph.append(g)
 
         # update trav_map accordingly
-        trav_map[:, :] = 0
-        for node in g.nodes:
-            trav_map[node[0], node[1]] = 255
+        trav_map[:, :] = g.get_trav_map()
 
     def get_random_point(self, floor=None):
         """
@@ -160,15 +197,65 @@ class IndoorScene(Scene):
         :return floor: floor number
         :return point: randomly sampled point in [x, y, z]
         """
+        floor, points = self.sample_points(1, floor=floor)
+        return floor, points[0]
+
+    def sample_points(self, n, floor=None):
+        """
+        Sample random points on the given floor number. If not given, sample a random floor number.
+        Points are drawn from the precomputed free cells of the floor.
+
+        :param n: number of points
+        :param floor: floor number
+        :return floor: floor number
+        :return points: n randomly sampled points in [x, y, z]
+        """
         if floor is None:
             floor = self.get_random_floor()
-        trav = self.floor_map[floor]
-        trav_space = np.where(trav == 255)
-        idx = np.random.randint(0, high=trav_space[0].shape[0])
-        xy_map = np.array([trav_space[0][idx], trav_space[1][idx]])
-        x, y = self.map_to_world(xy_map)
-        z = self.floor_heights[floor]
-        return floor, np.array([x, y, z])
+        free_cells = self.floor_free_cells[floor]
+        idx = np.random.randint(0, high=free_cells.shape[0], size=n)
+        xy_map = np.stack(np.divmod(free_cells[idx], self.trav_map_size), axis=1)
+        xy = self.map_to_world(xy_map)
+        z = np.full((n, 1), self.floor_heights[floor])
+        return floor, np.concatenate((xy, z), axis=1)
+
+    def get_clearance(self, floor, xy):
+        """
+        Get the distance to the closest obstacle, regardless of trav_map_erosion
+
+        :param floor: floor number
+        :param xy: 2D location in world reference frame (metric), or Nx2 locations
+        :return: clearance (in meters) of the location(s), 0 outside of the map
+        """
+        xy = np.asarray(xy)
+        cells = self.world_to_map(xy.reshape(-1, 2))
+        in_map = np.all((cells >= 0) & (cells < self.trav_map_size), axis=1)
+        cells = np.clip(cells, 0, self.trav_map_size - 1)
+        clearance = np.where(
+            in_map, self.floor_clearance[floor][cells[:, 0], cells[:, 1]], 0.0)
+        return clearance[0] if xy.ndim == 1 else clearance
+
+    def is_free(self, floor, xy, radius):
+        """
+        Check whether a robot with a circular footprint can be placed at the given location(s)
+
+        :param floor: floor number
+        :param xy: 2D location in world reference frame (metric), or Nx2 locations
+        :param radius: radius of the robot footprint (in meters)
+        :return: whether the location(s) are free for the footprint
+        """
+        return self.get_clearance(floor, xy) > radius
+
+    def get_trav_map_for_radius(self, floor, radius):
+        """
+        Get the traversability map of a robot with a circular footprint,
+        in place of the map eroded by trav_map_erosion
+
+        :param floor: floor number
+        :param radius: radius of the robot footprint (in meters)
+        :return: traversability map, where 255 is free space
+        """
+        return (self.floor_clearance[floor] > radius).astype(np.uint8) * 255
 
     def map_to_world(self, xy):
         """
@@ -187,7 +274,8 @@ class IndoorScene(Scene):
         :param xy: 2D location in world reference frame (metric)
         :return: 2D location in map reference frame (image)
         """
-        return np.flip((xy / self.trav_map_resolution + self.trav_map_size / 2.0)).astype(np.int)
+        axis = 0 if len(xy.shape) == 1 else 1
+        return np.flip((xy / self.trav_map_resolution + self.trav_map_size / 2.0), axis=axis).astype(np.int)
 
     def has_node(self, floor, world_xy):
         """
@@ -196,15 +284,247 @@ class IndoorScene(Scene):
         :param floor: floor number
         :param world_xy: 2D location in world reference frame (metric)
         """
-        map_xy = tuple(self.world_to_map(world_xy))
+        map_xy = self.world_to_map(world_xy)
         g = self.floor_graph[floor]
         return g.has_node(map_xy)
 
+    def get_distance_field(self, floor, target_world, dynamic=True):
+        """
+        Get the geodesic distance field to a target point, i.e. the result of a single Dijkstra pass
+        from the target node over the whole floor graph. The distance fields of the most recently
+        queried targets are cached, so that repeated queries to the same target (e.g. the goal of
+        an episode) only require array lookups.
+
+        :param floor: floor number
+        :param target_world: 2D target location in world reference frame (metric)
+        :param dynamic: whether to avoid the nodes occupied by movable bodies, if dynamic occupancy is enabled
+        :return: target node, geodesic distance (in map pixels) from every node to the target node,
+            and the next node on the shortest path to the target node of every node
+        """
+        assert self.build_graph, 'cannot get distance field without building the graph'
+        g = self.floor_graph[floor]
+        blocked = self.get_blocked_nodes(floor) if dynamic else None
+        target_node = g.get_closest_node(
+            self.world_to_map(target_world), blocked=blocked)
+        key = (floor, target_node, blocked is not None)
+        if key in self.distance_fields:
+            self.distance_fields.move_to_end(key)
+        else:
+            distance_field = None
+            if blocked is not None:
+                distance_field = g.get_shortest_path_tree(
+                    target_node, adjacency=self.dynamic_adjacency)
+            elif self.trav_map_cache is not None:
+                distance_field = self.trav_map_cache.load_distance_field(
+                    floor, target_node)
+            if distance_field is None:
+                distance_field = g.get_shortest_path_tree(target_node)
+            self.distance_fields[key] = distance_field
+            if len(self.distance_fields) > self.max_distance_fields:
+                self.distance_fields.popitem(last=False)
+        distances, predecessors = self.distance_fields[key]
+        return target_node, distances, predecessors
+
+    def get_source_node(self, floor, source_map, target_world):
+        """
+        Get the distance field to a target point and the node of a source point in it.
+        If movable bodies disconnect the source from the target, fall back to the static map.
+
+        :param floor: floor number
+        :param source_map: 2D source location in map reference frame (image)
+        :param target_world: 2D target location in world reference frame (metric)
+        :return: source node, target node, distances and predecessors (see get_distance_field)
+        """
+        g = self.floor_graph[floor]
+        blocked = self.get_blocked_nodes(floor)
+        target_node, distances, predecessors = self.get_distance_field(
+            floor, target_world)
+        source_node = g.get_closest_node(source_map, blocked=blocked)
+        if blocked is not None and not np.isfinite(distances[source_node]):
+            target_node, distances, predecessors = self.get_distance_field(
+                floor, target_world, dynamic=False)
+            source_node = g.get_closest_node(source_map)
+        return source_node, target_node, distances, predecessors
+
+    def enable_dynamic_occupancy(self, floor, body_ids, padding=None):
+        """
+        Track the footprints of movable bodies (e.g. interactive objects, doors) on top of the
+        traversability map of a floor. Shortest paths and geodesic distances avoid them after every
+        update_dynamic_occupancy.
+
+        :param floor: floor number
+        :param body_ids: pybullet body ids of the movable bodies
+        :param padding: number of cells the footprints are padded with, half of trav_map_erosion by default
+        """
+        assert self.build_graph, 'cannot track dynamic occupancy without building the graph'
+        if padding is None:
+            padding = int(np.ceil(self.trav_map_erosion / 2.0))
+        self.disable_dynamic_occupancy()
+        self.dynamic_occupancy = DynamicOccupancy(
+            self, floor, body_ids, padding=padding)
+        self.blocked_nodes = np.zeros(
+            self.floor_graph[floor].num_nodes, dtype=bool)
+        self.dynamic_adjacency = self.floor_graph[floor].adjacency
+        self.update_dynamic_occupancy()
+
+    def disable_dynamic_occupancy(self):
+        """
+        Stop tracking movable bodies
+        """
+        self.dynamic_occupancy = None
+        self.blocked_nodes = None
+        self.dynamic_adjacency = None
+        for key in list(self.distance_fields.keys()):
+            if key[2]:
+                del self.distance_fields[key]
+
+    def get_blocked_nodes(self, floor):
+        """
+        :param floor: floor number
+        :return: boolean mask of the nodes occupied by movable bodies,
+            or None if dynamic occupancy is not enabled on this floor
+        """
+        if self.dynamic_occupancy is None or self.dynamic_occupancy.floor != floor:
+            return None
+        return self.blocked_nodes
+
+    def update_dynamic_occupancy(self):
+        """
+        Rasterize the movable bodies that moved since the last update, and update the cached
+        distance fields whose shortest paths go through the cells that changed
+
+        :return: whether the occupancy changed
+        """
+        if self.dynamic_occupancy is None:
+            return False
+        occupied_cells, freed_cells = self.dynamic_occupancy.update()
+        floor = self.dynamic_occupancy.floor
+        g = self.floor_graph[floor]
+        blocked_nodes = g.cell_to_node[occupied_cells]
+        blocked_nodes = blocked_nodes[blocked_nodes >= 0]
+        unblocked_nodes = g.cell_to_node[freed_cells]
+        unblocked_nodes = unblocked_nodes[unblocked_nodes >= 0]
+        if blocked_nodes.shape[0] == 0 and unblocked_nodes.shape[0] == 0:
+            return False
+
+        self.blocked_nodes[blocked_nodes] = True
+        self.blocked_nodes[unblocked_nodes] = False
+        self.dynamic_adjacency = g.get_masked_adjacency(self.blocked_nodes)
+        for key in list(self.distance_fields.keys()):
+            if key[0] != floor or not key[2]:
+                continue
+            distances, predecessors = self.distance_fields[key]
+            distance_field = g.update_shortest_path_tree(
+                self.dynamic_adjacency, distances, predecessors, key[1],
+                blocked_nodes, unblocked_nodes)
+            if distance_field is None:
+                del self.distance_fields[key]
+            else:
+                self.distance_fields[key] = distance_field
+        return True
+
+    def precompute_distance_fields(self, floor, targets_world):
+        """
+        Compute the distance fields to the given targets and save them in the traversability
+        map cache, so that every process that loads the scene (e.g. the workers of ParallelNavEnv)
+        shares them instead of computing its own
+
+        :param floor: floor number
+        :param targets_world: 2D target locations in world reference frame (metric)
+        """
+        assert self.trav_map_cache is not None, 'cannot share distance fields without the trav map cache'
+        g = self.floor_graph[floor]
+        target_nodes = np.unique(g.get_closest_nodes(
+            self.world_to_map(np.asarray(targets_world).reshape(-1, 2))))
+        for target_node in target_nodes:
+            if self.trav_map_cache.load_distance_field(floor, target_node) is None:
+                distances, predecessors = g.get_shortest_path_tree(target_node)
+                self.trav_map_cache.save_distance_field(
+                    floor, target_node, distances, predecessors)
+
+    def get_geodesic_distance(self, floor, source_world, target_world):
+        """
+        Get the geodesic distance from one point to another point without computing the path.
+        If any of the given point is not in the graph, connect it to its closest node.
+
+        :param floor: floor number
+        :param source_world: 2D source location in world reference frame (metric)
+        :param target_world: 2D target location in world reference frame (metric)
+        :return: geodesic distance
+        """
+        g = self.floor_graph[floor]
+        source_map = self.world_to_map(source_world)
+        target_map = self.world_to_map(target_world)
+        source_node, target_node, distances, _ = self.get_source_node(
+            floor, source_map, target_world)
+        geodesic_distance = distances[source_node]
+        # distance from the off-graph source / target points to their closest nodes
+        geodesic_distance += np.linalg.norm(g.node_coords[source_node] - source_map)
+        geodesic_distance += np.linalg.norm(g.node_coords[target_node] - target_map)
+        return geodesic_distance * self.trav_map_resolution
+
+    def get_geodesic_distances(self, floor, source_world, target_world):
+        """
+        Get the geodesic distances of many (source, target) pairs at once.
+        The distance field of every distinct target is only computed once.
+
+        :param floor: floor number
+        :param source_world: Nx2 source locations in world reference frame (metric)
+        :param target_world: Nx2 target locations in world reference frame (metric),
+            or a single 2D target location shared by all sources
+        :return: N geodesic distances
+        """
+        source_world = np.asarray(source_world).reshape(-1, 2)
+        target_world = np.broadcast_to(
+            np.asarray(target_world).reshape(-1, 2), source_world.shape)
+        g = self.floor_graph[floor]
+        source_map = self.world_to_map(source_world)
+        target_map = self.world_to_map(target_world)
+        blocked = self.get_blocked_nodes(floor)
+        source_nodes = g.get_closest_nodes(source_map, blocked=blocked)
+        target_nodes = g.get_closest_nodes(target_map, blocked=blocked)
+
+        geodesic_distances = np.linalg.norm(
+            g.node_coords[source_nodes] - source_map, axis=1)
+        geodesic_distances += np.linalg.norm(
+            g.node_coords[target_nodes] - target_map, axis=1)
+        for target_node in np.unique(target_nodes):
+            pairs = target_nodes == target_node
+            first = np.flatnonzero(pairs)[0]
+            _, distances, _ = self.get_distance_field(floor, target_world[first])
+            geodesic_distances[pairs] += distances[source_nodes[pairs]]
+        geodesic_distances *= self.trav_map_resolution
+
+        # sources disconnected from their target by movable bodies fall back to the static map
+        if blocked is not None:
+            for i in np.flatnonzero(~np.isfinite(geodesic_distances)):
+                geodesic_distances[i] = self.get_geodesic_distance(
+                    floor, source_world[i], target_world[i])
+        return geodesic_distances
+
+    def get_next_waypoint(self, floor, source_world, target_world):
+        """
+        Get the next waypoint on the shortest path from one point to another point,
+        which is waypoint_resolution away from the source along the path
+
+        :param floor: floor number
+        :param source_world: 2D source location in world reference frame (metric)
+        :param target_world: 2D target location in world reference frame (metric)
+        :return: 2D location of the next waypoint in world reference frame (metric)
+        """
+        g = self.floor_graph[floor]
+        node, target_node, _, predecessors = self.get_source_node(
+            floor, self.world_to_map(source_world), target_world)
+        for _ in range(max(self.waypoint_interval, 1)):
+            if node == target_node:
+                return np.array(target_world[:2])
+            node = predecessors[node]
+        return self.map_to_world(g.node_coords[node])
+
     def get_shortest_path(self, floor, source_world, target_world, entire_path=False):
         """
         Get the shortest path from one point to another point.
-        If any of the given point is not in the graph, add it to the graph and
-        create an edge between it to its closest node.
+        If any of the given point is not in the graph, connect it to its closest node.
 
         :param floor: floor number
         :param source_world: 2D source location in world reference frame (metric)
@@ -212,27 +532,17 @@ class IndoorScene(Scene):
         :param entire_path: whether to return the entire path
         """
         assert self.build_graph, 'cannot get shortest path without building the graph'
-        source_map = tuple(self.world_to_map(source_world))
-        target_map = tuple(self.world_to_map(target_world))
+        source_map = self.world_to_map(source_world)
+        target_map = self.world_to_map(target_world)
 
         g = self.floor_graph[floor]
-
-        if not g.has_node(target_map):
-            nodes = np.array(g.nodes)
-            closest_node = tuple(
-                nodes[np.argmin(np.linalg.norm(nodes - target_map, axis=1))])
-            g.add_edge(closest_node, target_map,
-                       weight=l2_distance(closest_node, target_map))
-
+        source_node, _, _, predecessors = self.get_source_node(
+            floor, source_map, target_world)
+        path_map = g.node_coords[g.get_path(source_node, predecessors)]
         if not g.has_node(source_map):
-            nodes = np.array(g.nodes)
-            closest_node = tuple(
-                nodes[np.argmin(np.linalg.norm(nodes - source_map, axis=1))])
-            g.add_edge(closest_node, source_map,
-                       weight=l2_distance(closest_node, source_map))
-
-        path_map = np.array(nx.astar_path(
-            g, source_map, target_map, heuristic=l2_distance))
+            path_map = np.concatenate((source_map[None, :], path_map), axis=0)
+        if not g.has_node(target_map):
+            path_map = np.concatenate((path_map, target_map[None, :]), axis=0)
 
         path_world = self.map_to_world(path_map)
         geodesic_distance = np.sum(np.linalg.norm(
@@ -1,3 +1,6 @@
+from gibson2.utils.collision_groups import CollisionGroups
+
+
 class Scene(object):
     """
     Base class for all Scene objects
@@ -7,6 +10,16 @@ class Scene(object):
     def __init__(self):
         self.build_graph = False  # Indicates if a graph for shortest path has been built
         self.floor_body_ids = []  # List of ids of the floor_heights
+        self.collision_groups = CollisionGroups()  # Collision classes of the bodies in the scene
+        self.parsed_visual_meshes = {}  # Visual meshes parsed by prefetch, consumed by the renderer
+        self.render_mesh_files = {}  # Mesh files rendered instead of the pybullet mesh shapes, by body id
+
+    def prefetch(self):
+        """
+        Prepare the data of the scene that does not depend on pybullet or the renderer before load,
+        e.g. in a background thread while another scene is simulated (see ScenePrefetcher)
+        """
+        pass
 
     def load(self):
         """
@@ -48,6 +61,27 @@ class Scene(object):
         """
         raise NotImplementedError()
 
+    def get_geodesic_distance(self, floor, source_world, target_world):
+        """
+        Query the geodesic distance between two points in the given floor
+
+        :param floor: Floor to compute geodesic distance in
+        :param source_world: Initial location in world reference frame
+        :param target_world: Target location in world reference frame
+        :return: Geodesic distance (length of the shortest path)
+        """
+        _, geodesic_distance = self.get_shortest_path(
+            floor, source_world, target_world)
+        return geodesic_distance
+
+    def update_dynamic_occupancy(self):
+        """
+        Update the occupancy of movable bodies used by shortest path queries
+
+        :return: whether the occupancy changed
+        """
+        return False
+
     def get_floor_height(self, floor=0):
         """
         Get the height of the given floor
@@ -18,6 +18,8 @@ class VisionSensor(BaseSensor):
         self.raw_modalities = self.get_raw_modalities(modalities)
         self.image_width = self.config.get('image_width', 128)
         self.image_height = self.config.get('image_height', 128)
+        self.raw_modality_resolutions = self.get_raw_modality_resolutions(
+            env, modalities)
 
         self.depth_noise_rate = self.config.get('depth_noise_rate', 0.0)
         self.depth_low = self.config.get('depth_low', 0.5)
@@ -64,6 +66,22 @@ class VisionSensor(BaseSensor):
             raw_modalities.append('scene_flow')
         return raw_modalities
 
+    def get_raw_modality_resolutions(self, env, modalities):
+        """
+        Helper function that gathers the resolution to render each raw modality at
+
+        :return: a dictionary that maps raw modalities to (width, height)
+        """
+        raw_modality_resolutions = {}
+        for modality in modalities:
+            for raw_modality in self.get_raw_modalities([modality]):
+                resolution = env.get_image_size(modality)
+                if raw_modality_resolutions.get(raw_modality, resolution) != resolution:
+                    raise ValueError(
+                        'Modalities rendered from {} must have the same image size'.format(raw_modality))
+                raw_modality_resolutions[raw_modality] = resolution
+        return raw_modality_resolutions
+
     def get_rgb(self, raw_vision_obs):
         """
         :return: RGB sensor reading, normalized to [0.0, 1.0]
@@ -133,7 +151,8 @@ class VisionSensor(BaseSensor):
         :return: vision sensor reading
         """
         raw_vision_obs = env.simulator.renderer.render_robot_cameras(
-            modes=self.raw_modalities)
+            modes=self.raw_modalities,
+            resolutions=self.raw_modality_resolutions)
 
         raw_vision_obs = {
             mode: value
@@ -185,10 +185,13 @@ class Simulator:
         self.objects += new_object_pb_ids
 
         # Load the objects in the renderer
+        self.renderer.parsed_obj_readers = scene.parsed_visual_meshes
         for new_object_pb_id in new_object_pb_ids:
             self.load_object_in_renderer(new_object_pb_id, class_id=class_id, texture_scale=texture_scale,
                                          load_texture=load_texture, render_floor_plane=render_floor_plane,
-                                         use_pbr=False, use_pbr_mapping=False)
+                                         use_pbr=False, use_pbr_mapping=False,
+                                         mesh_file=scene.render_mesh_files.get(new_object_pb_id))
+        self.release_parsed_visual_meshes(scene)
 
         self.scene = scene
         return new_object_pb_ids
@@ -205,10 +208,105 @@ class Simulator:
             'import_ig_scene can only be called with InteractiveIndoorScene'
         new_object_ids = scene.load()
         self.objects += new_object_ids
+        self.renderer.parsed_obj_readers = scene.parsed_visual_meshes
+        self.load_ig_scene_objects_in_renderer(
+            scene, new_object_ids, scene.visual_mesh_to_material)
+        self.release_parsed_visual_meshes(scene)
+        self.scene = scene
+
+        return new_object_ids
+
+    @load_without_pybullet_vis
+    def reload_ig_scene(self, scene):
+        """
+        Replace the current interactive scene with another instance of the same scene (e.g. another object
+        randomization) in place. Only the objects that differ are removed from and loaded into pybullet and the
+        renderer; the identical objects (e.g. walls, floors and ceilings), the robots, the other imported objects
+        and the textures already uploaded to the renderer are kept.
+
+        :param scene: InteractiveIndoorScene instance of the same scene, not loaded yet
+        :return: pybullet body ids of the objects that were loaded
+        """
+        assert isinstance(scene, InteractiveIndoorScene) and isinstance(self.scene, InteractiveIndoorScene), \
+            'reload_ig_scene can only be called with InteractiveIndoorScene'
+        assert self.can_remove_objects(), \
+            'the optimized renderer cannot remove objects'
+        for body_id in scene.reuse_loaded_objects(self.scene):
+            self.remove_object(body_id)
+        loaded_object_ids = set(self.objects)
+        object_ids = scene.load()
+        # visual_mesh_to_material is only set up with texture randomization
+        all_visual_mesh_to_material = scene.visual_mesh_to_material \
+            if scene.texture_randomization else [None] * len(object_ids)
+        new_object_ids = []
+        visual_mesh_to_material = []
+        for body_id, body_visual_mesh_to_material in zip(object_ids, all_visual_mesh_to_material):
+            if body_id not in loaded_object_ids:
+                new_object_ids.append(body_id)
+                visual_mesh_to_material.append(body_visual_mesh_to_material)
+        self.objects += new_object_ids
+        self.renderer.parsed_obj_readers = scene.parsed_visual_meshes
+        self.load_ig_scene_objects_in_renderer(
+            scene, new_object_ids, visual_mesh_to_material)
+        self.release_parsed_visual_meshes(scene)
+        self.scene = scene
+
+        return new_object_ids
+
+    def stream_ig_scene(self, xy):
+        """
+        Load the rooms of the interactive scene around a robot position and unload the far ones, if room streaming
+        is enabled (see InteractiveIndoorScene.enable_room_streaming)
+
+        :param xy: 2D location of the robot in world reference frame
+        :return: pybullet body ids of the objects that were loaded, and of the objects that were unloaded
+        """
+        scene = self.scene
+        if not isinstance(scene, InteractiveIndoorScene) or scene.room_streaming is None:
+            return [], []
+        assert self.can_remove_objects(), \
+            'the optimized renderer cannot stream rooms'
+        to_load, to_unload = scene.get_room_streaming_update(xy)
+        removed_object_ids = []
+        for obj in to_unload:
+            for body_id in scene.unload_streamed_object(obj):
+                self.remove_object(body_id)
+                removed_object_ids.append(body_id)
+
+        new_object_ids = []
+        visual_mesh_to_material = []
+        for obj in to_load:
+            body_ids = scene.load_streamed_object(obj)
+            new_object_ids += body_ids
+            # visual_mesh_to_material is only set up with texture randomization
+            visual_mesh_to_material += obj.visual_mesh_to_material \
+                if scene.texture_randomization else [None] * len(body_ids)
+        self.objects += new_object_ids
+        self.load_ig_scene_objects_in_renderer(
+            scene, new_object_ids, visual_mesh_to_material)
+        return new_object_ids, removed_object_ids
+
+    def release_parsed_visual_meshes(self, scene):
+        """
+        Free the visual meshes parsed by scene.prefetch once they are loaded into the renderer
+
+        :param scene: Scene object
+        """
+        self.renderer.parsed_obj_readers = {}
+        scene.parsed_visual_meshes = {}
+
+    def load_ig_scene_objects_in_renderer(self, scene, body_ids, visual_mesh_to_material):
+        """
+        Load the objects of an interactive scene into the renderer
+
+        :param scene: InteractiveIndoorScene instance
+        :param body_ids: pybullet body ids of the objects
+        :param visual_mesh_to_material: mapping from visual mesh to randomizable materials of each body
+        """
         if scene.texture_randomization:
             # use randomized texture
-            for body_id, visual_mesh_to_material in \
-                    zip(new_object_ids, scene.visual_mesh_to_material):
+            for body_id, body_visual_mesh_to_material in \
+                    zip(body_ids, visual_mesh_to_material):
                 shadow_caster = True
                 if scene.objects_by_id[body_id].category == 'ceilings':
                     shadow_caster = False
@@ -217,11 +315,11 @@ class Simulator:
                 self.load_articulated_object_in_renderer(
                     body_id,
                     class_id=class_id,
-                    visual_mesh_to_material=visual_mesh_to_material,
+                    visual_mesh_to_material=body_visual_mesh_to_material,
                     shadow_caster=shadow_caster)
         else:
             # use default texture
-            for body_id in new_object_ids:
+            for body_id in body_ids:
                 use_pbr = True
                 use_pbr_mapping = True
                 shadow_caster = True
@@ -239,9 +337,23 @@ class Simulator:
                     use_pbr=use_pbr,
                     use_pbr_mapping=use_pbr_mapping,
                     shadow_caster=shadow_caster)
-        self.scene = scene
 
-        return new_object_ids
+    def can_remove_objects(self):
+        """
+        :return: whether objects can be removed, which the optimized renderer does not support
+        """
+        return not self.optimized_renderer
+
+    def remove_object(self, body_id):
+        """
+        Remove an object from pybullet and the renderer
+
+        :param body_id: pybullet body id
+        """
+        self.renderer.remove_instances(body_id)
+        p.removeBody(body_id)
+        if body_id in self.objects:
+            self.objects.remove(body_id)
 
     @load_without_pybullet_vis
     def import_object(self,
@@ -292,7 +404,8 @@ class Simulator:
                                 render_floor_plane=False,
                                 use_pbr=True,
                                 use_pbr_mapping=True,
-                                shadow_caster=True
+                                shadow_caster=True,
+                                mesh_file=None
                                 ):
         """
         Load the object into renderer
@@ -306,12 +419,13 @@ class Simulator:
         :param use_pbr: Whether to use pbr
         :param use_pbr_mapping: Whether to use pbr mapping
         :param shadow_caster: Whether to cast shadow
+        :param mesh_file: Mesh file to render instead of the mesh file of the pybullet mesh shape
         """
         for shape in p.getVisualShapeData(object_pb_id):
             id, link_id, type, dimensions, filename, rel_pos, rel_orn, color = shape[:8]
             visual_object = None
             if type == p.GEOM_MESH:
-                filename = filename.decode('utf-8')
+                filename = mesh_file if mesh_file is not None else filename.decode('utf-8')
                 if (filename, tuple(dimensions), tuple(rel_pos), tuple(rel_orn)) not in self.visual_objects.keys():
                     self.renderer.load_object(filename,
                                               transform_orn=rel_orn,
@@ -10,6 +10,9 @@ class InteractiveNavRandomTask(PointNavRandomTask):
     The goal is to navigate to a random goal position, in the presence of interactive objects that are small and light
     """
 
+    # the interactive objects are placed at every reset, after the episodes were generated
+    validate_episodes = True
+
     def __init__(self, env):
         super(InteractiveNavRandomTask, self).__init__(env)
         self.interactive_objects = self.load_interactive_objects(env)
@@ -72,3 +75,19 @@ class InteractiveNavRandomTask(PointNavRandomTask):
         """
         super(InteractiveNavRandomTask, self).reset_scene(env)
         self.reset_interactive_objects(env)
+        if self.config.get('dynamic_occupancy', False) and env.scene.build_graph:
+            env.scene.enable_dynamic_occupancy(
+                self.floor_num, self.get_movable_body_ids(env))
+
+    def get_movable_body_ids(self, env):
+        """
+        Get the bodies that can move out of the way of the robot: the interactive objects and the doors
+
+        :param env: environment instance
+        :return: a list of pybullet body ids
+        """
+        body_ids = [obj.body_id for obj in self.interactive_objects]
+        if hasattr(env.scene, 'objects_by_category'):
+            for door in env.scene.objects_by_category.get('door', []):
+                body_ids.extend(door.body_ids)
+        return body_ids
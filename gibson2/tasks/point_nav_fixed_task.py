@@ -102,8 +102,10 @@ class PointNavFixedTask(BaseTask):
         :param env: environment instance
         :return: geodesic distance to the target position
         """
-        _, geodesic_dist = self.get_shortest_path(env)
-        return geodesic_dist
+        env.scene.update_dynamic_occupancy()
+        source = env.robots[0].get_position()[:2]
+        target = self.target_pos[:2]
+        return env.scene.get_geodesic_distance(self.floor_num, source, target)
 
     def get_l2_potential(self, env):
         """
@@ -1,5 +1,6 @@
 from gibson2.tasks.point_nav_fixed_task import PointNavFixedTask
 from gibson2.utils.utils import l2_distance
+from gibson2.utils.episode_utils import EpisodeDataset
 import pybullet as p
 import logging
 import numpy as np
@@ -11,11 +12,43 @@ class PointNavRandomTask(PointNavFixedTask):
     The goal is to navigate to a random goal position
     """
 
+    # whether reset_scene places bodies that pre-generated episodes did not account for,
+    # in which case the poses of the episodes are checked for collisions at reset
+    validate_episodes = False
+
     def __init__(self, env):
         super(PointNavRandomTask, self).__init__(env)
         self.target_dist_min = self.config.get('target_dist_min', 1.0)
         self.target_dist_max = self.config.get('target_dist_max', 10.0)
 
+        # pre-generated episodes (see gibson2.utils.generate_episodes)
+        self.episodes = None
+        self.episode = None
+        episodes_file = self.config.get('episodes_file', None)
+        if episodes_file is not None:
+            self.load_episodes(
+                episodes_file,
+                shard_id=self.config.get('episodes_shard_id', 0),
+                num_shards=self.config.get('episodes_num_shards', 1))
+
+    def load_episodes(self, episodes_file, shard_id=0, num_shards=1):
+        """
+        Stream pre-generated episodes instead of sampling them at every reset
+
+        :param episodes_file: path of the episode file
+        :param shard_id: index of the shard of the episodes used by this environment
+        :param num_shards: number of shards, e.g. number of parallel environments
+        """
+        self.episodes = EpisodeDataset(
+            episodes_file,
+            shard_id=shard_id,
+            num_shards=num_shards,
+            shuffle=self.config.get('episodes_shuffle', True),
+            seed=self.config.get('episodes_seed', None))
+        if self.episodes.scene_id != self.config.get('scene_id'):
+            logging.warning('episodes of scene {} are used in scene {}'.format(
+                self.episodes.scene_id, self.config.get('scene_id')))
+
     def sample_initial_pose_and_target_pos(self, env):
         """
         Sample robot initial pose and target position
@@ -29,10 +62,12 @@ class PointNavRandomTask(PointNavFixedTask):
         for _ in range(max_trials):
             _, target_pos = env.scene.get_random_point(floor=self.floor_num)
             if env.scene.build_graph:
-                _, dist = env.scene.get_shortest_path(
+                # distance from the target to the initial position, so that all the candidate targets share
+                # the distance field of the initial position
+                dist = env.scene.get_geodesic_distance(
                     self.floor_num,
-                    initial_pos[:2],
-                    target_pos[:2], entire_path=False)
+                    target_pos[:2],
+                    initial_pos[:2])
             else:
                 dist = l2_distance(initial_pos, target_pos)
             if self.target_dist_min < dist < self.target_dist_max:
@@ -42,31 +77,24 @@ class PointNavRandomTask(PointNavFixedTask):
         initial_orn = np.array([0, 0, np.random.uniform(0, np.pi * 2)])
         return initial_pos, initial_orn, target_pos
 
-    def reset_scene(self, env):
+    def sample_valid_initial_pose_and_target_pos(self, env, max_trials=100):
         """
-        Task-specific scene reset: get a random floor number first
-
-        :param env: environment instance
-        """
-        self.floor_num = env.scene.get_random_floor()
-        super(PointNavRandomTask, self).reset_scene(env)
-
-    def reset_agent(self, env):
-        """
-        Reset robot initial pose.
-        Sample initial pose and target position, check validity, and land it.
+        Sample robot initial pose and target position until both are collision-free
 
         :param env: environment instance
+        :param max_trials: maximum number of trials
+        :return: initial pose, target position and whether they are valid
         """
         reset_success = False
-        max_trials = 100
 
-        # cache pybullet state
+        # cache pybullet state, saved again when the rooms around the poses are streamed in
         # TODO: p.saveState takes a few seconds, need to speed up
-        state_id = p.saveState()
+        state_id = None
         for i in range(max_trials):
             initial_pos, initial_orn, target_pos = \
                 self.sample_initial_pose_and_target_pos(env)
+            state_id = env.stream_and_save_state(
+                [initial_pos, target_pos], state_id)
             reset_success = env.test_valid_position(
                 env.robots[0], initial_pos, initial_orn) and \
                 env.test_valid_position(
@@ -75,10 +103,66 @@ class PointNavRandomTask(PointNavFixedTask):
             if reset_success:
                 break
 
-        if not reset_success:
-            logging.warning("WARNING: Failed to reset robot without collision")
+        p.removeState(state_id)
+        return initial_pos, initial_orn, target_pos, reset_success
+
+    def get_episode_initial_pose_and_target_pos(self, env):
+        """
+        Get robot initial pose and target position of the current pre-generated episode
 
+        :param env: environment instance
+        :return: initial pose, target position and whether they are valid
+        """
+        initial_pos = self.episode['initial_pos'].astype(np.float64)
+        initial_orn = self.episode['initial_orn'].astype(np.float64)
+        target_pos = self.episode['target_pos'].astype(np.float64)
+        if not self.validate_episodes:
+            return initial_pos, initial_orn, target_pos, True
+
+        state_id = env.stream_and_save_state([initial_pos, target_pos])
+        reset_success = env.test_valid_position(
+            env.robots[0], initial_pos, initial_orn) and \
+            env.test_valid_position(
+                env.robots[0], target_pos)
+        p.restoreState(state_id)
         p.removeState(state_id)
+        return initial_pos, initial_orn, target_pos, reset_success
+
+    def reset_scene(self, env):
+        """
+        Task-specific scene reset: get a random floor number first,
+        or the floor of the next pre-generated episode
+
+        :param env: environment instance
+        """
+        if self.episodes is not None:
+            self.episode = self.episodes.next_episode()
+            self.floor_num = int(self.episode['floor'])
+        else:
+            self.floor_num = env.scene.get_random_floor()
+        super(PointNavRandomTask, self).reset_scene(env)
+
+    def reset_agent(self, env):
+        """
+        Reset robot initial pose.
+        Sample initial pose and target position, check validity, and land it.
+        Pre-generated episodes are used as they are, unless validate_episodes is set and they
+        collide with the bodies placed by reset_scene, in which case a new pose is sampled.
+
+        :param env: environment instance
+        """
+        reset_success = False
+        if self.episodes is not None:
+            initial_pos, initial_orn, target_pos, reset_success = \
+                self.get_episode_initial_pose_and_target_pos(env)
+            if not reset_success:
+                logging.info(
+                    'Pre-generated episode in collision, sampling a new one')
+        if not reset_success:
+            initial_pos, initial_orn, target_pos, reset_success = \
+                self.sample_valid_initial_pose_and_target_pos(env)
+            if not reset_success:
+                logging.warning("WARNING: Failed to reset robot without collision")
 
         self.target_pos = target_pos
         self.initial_pos = initial_pos
@@ -92,11 +92,12 @@ class RoomRearrangementTask(BaseTask):
         reset_success = False
         max_trials = 100
 
-        # cache pybullet state
+        # cache pybullet state, saved again when the rooms around the pose are streamed in
         # TODO: p.saveState takes a few seconds, need to speed up
-        state_id = p.saveState()
+        state_id = None
         for _ in range(max_trials):
             initial_pos, initial_orn = self.sample_initial_pose(env)
+            state_id = env.stream_and_save_state([initial_pos], state_id)
             reset_success = env.test_valid_position(
                 env.robots[0], initial_pos, initial_orn)
             p.restoreState(state_id)
@@ -106,8 +107,8 @@ class RoomRearrangementTask(BaseTask):
         if not reset_success:
             logging.warning("WARNING: Failed to reset robot without collision")
 
-        env.land(env.robots[0], initial_pos, initial_orn)
         p.removeState(state_id)
+        env.land(env.robots[0], initial_pos, initial_orn)
 
         for reward_function in self.reward_functions:
             reward_function.reset(self, env)
@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+
+from gibson2.utils.collision_groups import CollisionGroups, SCENE_FIXED
+import pybullet as p
+import argparse
+import time
+import numpy as np
+
+
+def load_fixed_bodies(num_bodies):
+    """
+    Load bodies shaped like the fixed objects of interactive scenes: an empty base link (world)
+    and a link 0 attached to it by a fixed joint. Neighboring bodies overlap.
+
+    :param num_bodies: number of bodies
+    :return: pybullet body ids
+    """
+    shape = p.createCollisionShape(p.GEOM_BOX, halfExtents=[0.55, 0.55, 0.5])
+    side = int(np.ceil(np.sqrt(num_bodies)))
+    body_ids = []
+    for i in range(num_bodies):
+        body_ids.append(p.createMultiBody(
+            baseMass=0,
+            basePosition=[i % side, i // side, 0.5],
+            linkMasses=[1.0],
+            linkCollisionShapeIndices=[shape],
+            linkVisualShapeIndices=[-1],
+            linkPositions=[[0, 0, 0]],
+            linkOrientations=[[0, 0, 0, 1]],
+            linkInertialFramePositions=[[0, 0, 0]],
+            linkInertialFrameOrientations=[[0, 0, 0, 1]],
+            linkParentIndices=[0],
+            linkJointTypes=[p.JOINT_FIXED],
+            linkJointAxis=[[0, 0, 1]]))
+    return body_ids
+
+
+def benchmark_collision_filtering(num_bodies, use_groups, num_steps=100):
+    """
+    Time the collision filtering of fixed bodies and the simulation steps afterwards
+
+    :param num_bodies: number of fixed bodies
+    :param use_groups: whether to use collision groups instead of pair filters
+    :param num_steps: number of simulation steps
+    :return: filtering time and time per step, in seconds
+    """
+    client = p.connect(p.DIRECT)
+    body_ids = load_fixed_bodies(num_bodies)
+    start = time.time()
+    if use_groups:
+        collision_groups = CollisionGroups()
+        collision_groups.set_collision(SCENE_FIXED, SCENE_FIXED, False)
+        for body_id in body_ids:
+            collision_groups.add_body(SCENE_FIXED, body_id, [0])
+    else:
+        for i in range(len(body_ids)):
+            for j in range(i + 1, len(body_ids)):
+                p.setCollisionFilterPair(
+                    body_ids[i], body_ids[j], 0, 0, enableCollision=0)
+    filter_time = time.time() - start
+    start = time.time()
+    for _ in range(num_steps):
+        p.stepSimulation()
+    step_time = (time.time() - start) / num_steps
+    num_contacts = len(p.getContactPoints())
+    p.disconnect(client)
+    print('{} bodies, {}: filtering {:.3f}s, step {:.2f}ms, {} contacts'.format(
+        num_bodies, 'groups' if use_groups else 'pairs',
+        filter_time, step_time * 1000, num_contacts))
+    return filter_time, step_time
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark collision filtering of fixed scene objects')
+    parser.add_argument('--num_bodies', type=int, nargs='+', default=[100, 300, 600])
+    args = parser.parse_args()
+    for num_bodies in args.num_bodies:
+        for use_groups in [False, True]:
+            benchmark_collision_filtering(num_bodies, use_groups)
+
+
+if __name__ == "__main__":
+    main()
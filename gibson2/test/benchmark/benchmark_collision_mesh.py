@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+from gibson2.scenes.gibson_indoor_scene import StaticIndoorScene
+from gibson2.utils.collision_mesh_cache import get_collision_mesh_file
+import pybullet as p
+import argparse
+import time
+
+
+class MeshFileScene(StaticIndoorScene):
+    """
+    Static scene whose mesh is read from a given mesh file instead of the dataset
+    """
+
+    def __init__(self, mesh_path):
+        super(MeshFileScene, self).__init__('benchmark', build_graph=False)
+        self.mesh_path = mesh_path
+
+    def get_scene_mesh_file(self):
+        return self.mesh_path
+
+
+def time_original_load(mesh_path):
+    """
+    Time the load of a scene mesh as done before the collision mesh cache, with the collision shape created
+    from the original mesh, in a new physics client
+
+    :param mesh_path: mesh file
+    :return: load time in seconds
+    """
+    client = p.connect(p.DIRECT)
+    p.setPhysicsEngineParameter(enableFileCaching=0)
+    start = time.time()
+    collision_id = p.createCollisionShape(
+        p.GEOM_MESH, fileName=mesh_path, flags=p.GEOM_FORCE_CONCAVE_TRIMESH)
+    body_id = p.createMultiBody(
+        baseCollisionShapeIndex=collision_id, baseVisualShapeIndex=-1)
+    p.changeDynamics(body_id, -1, lateralFriction=1)
+    elapsed = time.time() - start
+    p.disconnect(client)
+    return elapsed
+
+
+def time_scene_load(mesh_path):
+    """
+    Time StaticIndoorScene.load_scene_mesh in a new physics client, as done by every scene load
+
+    :param mesh_path: mesh file
+    :return: load time in seconds
+    """
+    scene = MeshFileScene(mesh_path)
+    client = p.connect(p.DIRECT)
+    p.setPhysicsEngineParameter(enableFileCaching=0)
+    start = time.time()
+    scene.load_scene_mesh()
+    elapsed = time.time() - start
+    p.disconnect(client)
+    return elapsed
+
+
+def benchmark_collision_mesh(mesh_path, repeats=3):
+    """
+    Compare the load of a scene mesh from the original mesh and from its cached compact collision copy
+
+    :param mesh_path: mesh file, e.g. the mesh_z_up_downsampled.obj of a Gibson scene
+    :param repeats: number of loads
+    :return: best load times from the original mesh and with the compact copy, in seconds
+    """
+    start = time.time()
+    collision_mesh_path = get_collision_mesh_file(mesh_path)
+    print('Compact copy {} ready in {:.3f}s'.format(
+        collision_mesh_path, time.time() - start))
+    original = min(time_original_load(mesh_path) for _ in range(repeats))
+    compact = min(time_scene_load(mesh_path) for _ in range(repeats))
+    print('{}: original {:.3f}s, compact {:.3f}s'.format(
+        mesh_path, original, compact))
+    return original, compact
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the load of scene meshes')
+    parser.add_argument('mesh_paths', nargs='+', help='mesh files')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='number of loads')
+    args = parser.parse_args()
+    for mesh_path in args.mesh_paths:
+        benchmark_collision_mesh(mesh_path, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+
+from gibson2.envs.parallel_env import ParallelNavEnv
+import argparse
+import time
+import numpy as np
+import gym
+
+
+class PreloadEnv(gym.Env):
+    """
+    Environment that only imports the modules and reads the dataset indexes of the iGibson environments,
+    to measure the startup of the ParallelNavEnv workers without loading scenes
+    """
+
+    def __init__(self):
+        # imports the modules and reads the indexes, unless the fork server already did
+        import gibson2.envs.worker_preload
+        self.observation_space = gym.spaces.Box(
+            low=0.0, high=1.0, shape=(1,), dtype=np.float32)
+        self.action_space = gym.spaces.Box(
+            low=-1.0, high=1.0, shape=(2,), dtype=np.float32)
+
+    def reset(self):
+        return np.zeros(1, dtype=np.float32)
+
+    def step(self, action):
+        return self.reset(), 0.0, False, {}
+
+
+class iGibsonEnvConstructor(object):
+    def __init__(self, config_file):
+        self.config_file = config_file
+
+    def __call__(self):
+        from gibson2.envs.igibson_env import iGibsonEnv
+        return iGibsonEnv(config_file=self.config_file, mode='headless')
+
+
+def get_memory(pid):
+    """
+    :param pid: process id
+    :return: resident set size and proportional set size of the process in MB. The proportional set size
+        splits the pages shared by several processes between them
+    """
+    memory = {}
+    with open('/proc/{}/smaps_rollup'.format(pid)) as f:
+        for line in f:
+            fields = line.split()
+            if fields[0] in ['Rss:', 'Pss:']:
+                memory[fields[0][:-1]] = int(fields[1]) / 1024.0
+    return memory['Rss'], memory['Pss']
+
+
+def benchmark_startup(env_constructor, num_envs, start_method):
+    """
+    Time the startup of a batch of workers and measure their memory
+
+    :param env_constructor: environment constructor
+    :param num_envs: number of workers
+    :param start_method: multiprocessing start method
+    :return: startup time in seconds, total resident set size and total proportional set size of the workers in MB
+    """
+    start = time.time()
+    env = ParallelNavEnv([env_constructor] * num_envs,
+                         start_method=start_method)
+    startup_time = time.time() - start
+    memory = np.sum([get_memory(worker._process.pid)
+                     for worker in env._envs], axis=0)
+    env.close()
+    print('{} workers, {}: {:.2f}s startup, {:.0f} MB RSS, {:.0f} MB PSS'.format(
+        num_envs, start_method, startup_time, memory[0], memory[1]))
+    return startup_time, memory[0], memory[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the worker startup of ParallelNavEnv')
+    parser.add_argument('--num_envs', type=int, default=32)
+    parser.add_argument('--start_methods', nargs='+',
+                        default=['spawn', 'forkserver'])
+    parser.add_argument('--config', default=None,
+                        help='environment config file, to load full iGibson environments instead of only '
+                             'preloading their modules and dataset indexes')
+    args = parser.parse_args()
+    if args.config is None:
+        env_constructor = PreloadEnv
+    else:
+        env_constructor = iGibsonEnvConstructor(args.config)
+    for start_method in args.start_methods:
+        benchmark_startup(env_constructor, args.num_envs, start_method)
+
+
+if __name__ == "__main__":
+    main()
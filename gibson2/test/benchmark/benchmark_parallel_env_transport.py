@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+
+from gibson2.envs.parallel_env import ParallelNavEnv
+import argparse
+import time
+import numpy as np
+import gym
+
+
+class RGBDEnv(gym.Env):
+    """
+    Environment that only produces RGBD observations, to measure the transport of ParallelNavEnv
+    """
+
+    def __init__(self, image_size):
+        self.observation_space = gym.spaces.Dict({
+            'rgb': gym.spaces.Box(low=0.0, high=1.0, shape=(image_size, image_size, 3), dtype=np.float32),
+            'depth': gym.spaces.Box(low=0.0, high=1.0, shape=(image_size, image_size, 1), dtype=np.float32),
+        })
+        self.action_space = gym.spaces.Box(
+            low=-1.0, high=1.0, shape=(2,), dtype=np.float32)
+        self.observation = {key: np.random.uniform(size=space.shape).astype(np.float32)
+                            for key, space in self.observation_space.spaces.items()}
+
+    def reset(self):
+        return self.observation
+
+    def step(self, action):
+        return self.observation, 0.0, False, {}
+
+
+class RGBDEnvConstructor(object):
+    def __init__(self, image_size):
+        self.image_size = image_size
+
+    def __call__(self):
+        return RGBDEnv(self.image_size)
+
+
+def benchmark_transport(num_envs, image_size, shared_memory, num_steps=100):
+    """
+    Time the steps of a batch of RGBD environments
+
+    :param num_envs: number of environments
+    :param image_size: width and height of the observations
+    :param shared_memory: whether to transport the observations through shared memory
+    :param num_steps: number of steps
+    :return: steps per second of the batch
+    """
+    env = ParallelNavEnv([RGBDEnvConstructor(image_size)] * num_envs,
+                         shared_memory=shared_memory)
+    env.reset()
+    actions = [env.action_space.sample() for _ in range(num_envs)]
+    start = time.time()
+    for _ in range(num_steps):
+        env.step(actions)
+    steps_per_second = num_steps / (time.time() - start)
+    env.close()
+    print('{} envs, {}x{} RGBD, {}: {:.1f} batch steps/s, {:.0f} env steps/s'.format(
+        num_envs, image_size, image_size, 'shared memory' if shared_memory else 'pipe',
+        steps_per_second, steps_per_second * num_envs))
+    return steps_per_second
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the observation transport of ParallelNavEnv')
+    parser.add_argument('--num_envs', type=int, nargs='+', default=[8, 16, 32])
+    parser.add_argument('--image_sizes', type=int, nargs='+', default=[128, 256])
+    parser.add_argument('--num_steps', type=int, default=100)
+    args = parser.parse_args()
+    for image_size in args.image_sizes:
+        for num_envs in args.num_envs:
+            for shared_memory in [False, True]:
+                benchmark_transport(num_envs, image_size,
+                                    shared_memory, args.num_steps)
+
+
+if __name__ == "__main__":
+    main()
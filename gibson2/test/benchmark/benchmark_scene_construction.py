@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+from gibson2.scenes.igibson_indoor_scene import InteractiveIndoorScene
+import argparse
+import time
+import numpy as np
+
+
+def benchmark_scene_construction(scene_id, scene_source='IG', repeats=3):
+    """
+    Time the construction of an interactive scene, i.e. the parsing of its iGSDF file and the
+    instantiation of its URDF objects, without loading it into the simulator
+
+    :param scene_id: scene id
+    :param scene_source: source of scene data; among IG, CUBICASA, THREEDFRONT
+    :param repeats: number of constructions
+    :return: construction times in seconds
+    """
+    times = []
+    for _ in range(repeats):
+        start = time.time()
+        scene = InteractiveIndoorScene(scene_id, scene_source=scene_source)
+        times.append(time.time() - start)
+    print('Scene {}: {} links, {} joints, {} objects, construction {:.3f}s (min {:.3f}s)'.format(
+        scene_id,
+        len(scene.scene_tree.findall('link')),
+        len(scene.scene_tree.findall('joint')),
+        scene.get_num_objects(),
+        np.mean(times), np.min(times)))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the construction of interactive scenes')
+    parser.add_argument('--scene_ids', nargs='+', default=['Rs_int', 'Beechwood_0_int'],
+                        help='scene ids')
+    parser.add_argument('--scene_source', default='IG',
+                        help='source of scene data; among IG, CUBICASA, THREEDFRONT')
+    parser.add_argument('--repeats', type=int, default=3,
+                        help='number of constructions per scene')
+    args = parser.parse_args()
+    for scene_id in args.scene_ids:
+        benchmark_scene_construction(scene_id, args.scene_source, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import pybullet as p
+import pytest
+from gibson2.utils.collision_groups import CollisionGroups, SCENE_FIXED, ROBOT
+
+
+def load_fixed_body(position):
+    # an empty base link and a link 0 attached to it by a fixed joint, like the fixed scene objects
+    return p.createMultiBody(
+        baseMass=0,
+        basePosition=position,
+        linkMasses=[1.0],
+        linkCollisionShapeIndices=[p.createCollisionShape(
+            p.GEOM_BOX, halfExtents=[0.55, 0.55, 0.5])],
+        linkVisualShapeIndices=[-1],
+        linkPositions=[[0, 0, 0]],
+        linkOrientations=[[0, 0, 0, 1]],
+        linkInertialFramePositions=[[0, 0, 0]],
+        linkInertialFrameOrientations=[[0, 0, 0, 1]],
+        linkParentIndices=[0],
+        linkJointTypes=[p.JOINT_FIXED],
+        linkJointAxis=[[0, 0, 1]])
+
+
+def has_contact(body_a, body_b):
+    p.performCollisionDetection()
+    return len(p.getContactPoints(bodyA=body_a, bodyB=body_b)) > 0
+
+
+def test_collision_groups():
+    client = p.connect(p.DIRECT)
+    try:
+        fixed_a = load_fixed_body([0.0, 0.0, 0.5])
+        fixed_b = load_fixed_body([1.0, 0.0, 0.5])
+        box = p.createMultiBody(
+            baseMass=1.0,
+            baseCollisionShapeIndex=p.createCollisionShape(
+                p.GEOM_BOX, halfExtents=[0.2, 0.2, 0.2]),
+            basePosition=[0.5, 0.0, 0.5])
+        assert has_contact(fixed_a, fixed_b)
+
+        collision_groups = CollisionGroups()
+        collision_groups.set_collision(SCENE_FIXED, SCENE_FIXED, False)
+        for body_id in [fixed_a, fixed_b]:
+            collision_groups.add_body(SCENE_FIXED, body_id, [0])
+        assert not has_contact(fixed_a, fixed_b)
+        # bodies without collision class still collide with the fixed bodies
+        assert has_contact(fixed_a, box)
+
+        collision_groups.add_body(ROBOT, box)
+        assert has_contact(fixed_a, box)
+        collision_groups.set_collision(ROBOT, SCENE_FIXED, False)
+        assert not has_contact(fixed_a, box)
+        collision_groups.set_collision(SCENE_FIXED, SCENE_FIXED, True)
+        assert has_contact(fixed_a, fixed_b)
+        assert not has_contact(fixed_a, box)
+    finally:
+        p.disconnect(client)
+
+
+def test_collision_groups_allocation():
+    collision_groups = CollisionGroups()
+    groups = [collision_groups.get_group(str(i)) for i in range(29)]
+    assert len(set(groups)) == 29
+    assert collision_groups.get_group('0') == groups[0]
+    with pytest.raises(ValueError):
+        collision_groups.get_group('29')
@@ -0,0 +1,32 @@
+import os
+import numpy as np
+import pybullet as p
+import trimesh
+from gibson2.utils.collision_mesh_cache import get_collision_mesh_file
+
+
+def test_collision_mesh_cache(tmp_path):
+    # a box whose faces do not share vertices, as in textured meshes
+    box = trimesh.creation.box(extents=[1.0, 2.0, 3.0])
+    box.unmerge_vertices()
+    mesh_path = str(tmp_path / 'box.obj')
+    box.export(mesh_path)
+    cache_path = str(tmp_path / 'cache')
+
+    collision_mesh_path = get_collision_mesh_file(mesh_path, cache_path)
+    assert collision_mesh_path != mesh_path
+    assert os.path.isfile(collision_mesh_path)
+    assert get_collision_mesh_file(mesh_path, cache_path) == collision_mesh_path
+    mesh = trimesh.load(collision_mesh_path, force='mesh', process=False)
+    assert len(mesh.vertices) == 8
+    assert len(mesh.faces) == 12
+
+    client = p.connect(p.DIRECT)
+    aabbs = []
+    for path in [mesh_path, collision_mesh_path]:
+        shape = p.createCollisionShape(
+            p.GEOM_MESH, fileName=path, flags=p.GEOM_FORCE_CONCAVE_TRIMESH)
+        body_id = p.createMultiBody(baseCollisionShapeIndex=shape)
+        aabbs.append(np.array(p.getAABB(body_id)))
+    p.disconnect(client)
+    assert np.allclose(aabbs[0], aabbs[1])
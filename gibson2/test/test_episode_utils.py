@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from gibson2.utils.episode_utils import save_episodes, EpisodeDataset
+
+
+def get_episodes(num_episodes):
+    return {
+        'floor': np.zeros(num_episodes),
+        'initial_pos': np.random.uniform(-5, 5, (num_episodes, 3)),
+        'initial_orn': np.random.uniform(0, np.pi, (num_episodes, 3)),
+        'target_pos': np.random.uniform(-5, 5, (num_episodes, 3)),
+        'geodesic_dist': np.arange(num_episodes),
+    }
+
+
+def test_episode_dataset(tmp_path):
+    episodes_file = str(tmp_path / 'episodes.npz')
+    save_episodes(episodes_file, 'Rs_int', get_episodes(10))
+
+    dataset = EpisodeDataset(episodes_file, seed=0)
+    assert dataset.scene_id == 'Rs_int' and len(dataset) == 10
+    # every episode is streamed once per pass
+    for _ in range(2):
+        ids = sorted(int(dataset.next_episode()['geodesic_dist']) for _ in range(10))
+        assert ids == list(range(10))
+
+    shards = [EpisodeDataset(episodes_file, shard_id=i, num_shards=3, shuffle=False)
+              for i in range(3)]
+    assert sum(len(shard) for shard in shards) == 10
+    assert int(shards[1].next_episode()['geodesic_dist']) == 1
+
+    with pytest.raises(ValueError):
+        EpisodeDataset(episodes_file, shard_id=3, num_shards=3)
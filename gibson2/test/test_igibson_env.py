@@ -75,3 +75,25 @@ def test_env_reset():
     assert env.task.reset_scene_called
     assert env.task.reset_agent_called
     assert env.task.get_task_obs_called
+
+
+def test_env_object_randomization_in_place():
+    download_assets()
+    download_demo_data()
+    config_filename = os.path.join(
+        gibson2.root_path, 'examples', 'configs', 'turtlebot_point_nav.yaml')
+    env = iGibsonEnv(config_file=config_filename, mode='headless')
+    try:
+        env.object_randomization_freq = 1
+        robot_id = env.robots[0].robot_ids[0]
+        walls = env.scene.objects_by_category['walls'][0]
+        env.reload_model_object_randomization()
+        # the robot and the identical objects stay loaded
+        assert env.robots[0].robot_ids[0] == robot_id
+        assert env.scene.objects_by_category['walls'][0] is walls
+        assert env.simulator.scene is env.scene
+        env.reset()
+        for _ in range(10):
+            env.step(env.action_space.sample())
+    finally:
+        env.close()
@@ -7,6 +7,8 @@ import os
 import gibson2
 import time
 import random
+import pybullet as p
+import numpy as np
 
 
 def test_import_igsdf():
@@ -29,6 +31,54 @@ def test_import_igsdf():
     s.disconnect()
 
 
+def test_import_igsdf_room_streaming():
+    scene = InteractiveIndoorScene(
+        'Rs_int', texture_randomization=False, object_randomization=False)
+    scene.enable_room_streaming(load_distance=0.0, unload_distance=1.0)
+    s = Simulator(mode='headless', image_width=512,
+                  image_height=512, device_idx=0)
+    s.import_ig_scene(scene)
+    num_bodies = p.getNumBodies()
+
+    # load the room of the robot and its neighbors, then move far away from all the rooms
+    xy = scene.get_random_point_by_room_type('living_room')[1][:2]
+    loaded, unloaded = s.stream_ig_scene(xy)
+    assert len(loaded) > 0 and len(unloaded) == 0
+    assert p.getNumBodies() == num_bodies + len(loaded)
+    for body_id in loaded:
+        assert scene.objects_by_id[body_id].loaded
+    loaded_again, unloaded = s.stream_ig_scene([100.0, 100.0])
+    assert len(loaded_again) == 0 and len(unloaded) == len(loaded)
+    assert p.getNumBodies() == num_bodies
+    for _ in range(10):
+        s.step()
+
+    s.disconnect()
+
+
+def test_import_igsdf_texture_randomization_friction():
+    scene = InteractiveIndoorScene(
+        'Rs_int', texture_randomization=True, object_randomization=False,
+        load_object_categories=['chair', 'bottom_cabinet'])
+    s = Simulator(mode='headless', image_width=512,
+                  image_height=512, device_idx=0)
+    s.import_ig_scene(scene)
+
+    for _ in range(3):
+        scene.randomize_texture()
+        for obj in scene.objects_by_name.values():
+            if obj.material_to_friction is None:
+                continue
+            for body_id, link_materials in zip(obj.body_ids, obj.link_materials):
+                for link_id, materials in link_materials:
+                    friction = np.mean([obj.material_to_friction.get(material.random_class, 0.5)
+                                        for material in materials])
+                    assert np.isclose(
+                        p.getDynamicsInfo(body_id, link_id)[1], friction)
+
+    s.disconnect()
+
+
 def main():
     test_import_igsdf()
 
@@ -0,0 +1,24 @@
+import os
+import numpy as np
+import trimesh
+from gibson2.utils import mass_properties_cache
+from gibson2.utils.mass_properties_cache import get_mass_properties
+
+
+def test_mass_properties_cache(tmp_path, monkeypatch):
+    mesh_path = str(tmp_path / 'box.obj')
+    trimesh.creation.box(extents=[1.0, 2.0, 3.0]).apply_translation(
+        [0.5, 0.0, 0.0]).export(mesh_path)
+    cache_path = str(tmp_path / 'cache')
+    properties = get_mass_properties(mesh_path, cache_path)
+
+    mesh = trimesh.load(file_obj=mesh_path, force='mesh')
+    mesh.density = 30.0
+    assert np.isclose(properties['volume'] * 30.0, mesh.mass)
+    assert np.allclose(np.array(properties['moment_inertia']) * 30.0, mesh.moment_inertia)
+    assert np.allclose(properties['center'], mesh.center_mass)
+
+    # warm runs do not load the mesh
+    monkeypatch.setattr(mass_properties_cache, 'compute_mass_properties', None)
+    assert get_mass_properties(mesh_path, cache_path) == properties
+    assert len(os.listdir(os.path.join(cache_path, 'mass_properties', 'v1'))) == 1
@@ -0,0 +1,57 @@
+import multiprocessing
+import os
+import numpy as np
+import gym
+import pytest
+from gibson2.envs.observation_buffer import ObservationBuffer
+
+OBSERVATION_SPACE = gym.spaces.Dict({
+    'rgb': gym.spaces.Box(low=0.0, high=1.0, shape=(4, 4, 3), dtype=np.float32),
+    'task_obs': gym.spaces.Box(low=-np.inf, high=np.inf, shape=(5,), dtype=np.float64),
+})
+
+
+def write_observation(path, slot, env_idx, value):
+    buffer = ObservationBuffer(OBSERVATION_SPACE, 3, num_slots=2, path=path)
+    buffer.write(slot, env_idx, {key: np.full(space.shape, value, dtype=space.dtype)
+                                 for key, space in OBSERVATION_SPACE.spaces.items()})
+    buffer.close()
+
+
+def test_observation_buffer():
+    buffer = ObservationBuffer(OBSERVATION_SPACE, 3, num_slots=2)
+    processes = [multiprocessing.Process(target=write_observation, args=(buffer.path, 1, env_idx, env_idx + 1))
+                 for env_idx in range(3)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+    observations = buffer.read(1)
+    assert observations['rgb'].shape == (3, 4, 4, 3)
+    assert observations['rgb'].dtype == np.float32
+    assert observations['task_obs'].shape == (3, 5)
+    for env_idx in range(3):
+        assert np.all(observations['rgb'][env_idx] == env_idx + 1)
+        assert np.all(observations['task_obs'][env_idx] == env_idx + 1)
+    assert np.all(buffer.read(0)['rgb'] == 0)
+
+    buffer.unlink()
+    assert not os.path.exists(buffer.path)
+    # the memory stays mapped after the file is removed
+    buffer.write(0, 2, {'rgb': np.ones((4, 4, 3)), 'task_obs': np.ones(5)})
+    assert np.all(buffer.read(0)['rgb'][2] == 1)
+    buffer.close()
+
+
+def test_observation_buffer_box():
+    buffer = ObservationBuffer(gym.spaces.Box(
+        low=0, high=255, shape=(2, 2), dtype=np.uint8), 2, num_slots=3)
+    buffer.write(2, 1, np.full((2, 2), 7))
+    assert buffer.read(2).shape == (2, 2, 2)
+    assert np.all(buffer.read(2)[1] == 7)
+    buffer.close()
+
+    with pytest.raises(ValueError):
+        ObservationBuffer(gym.spaces.Discrete(3), 2)
@@ -0,0 +1,146 @@
+import asyncio
+import time
+import numpy as np
+import gym
+from gibson2.envs.parallel_env import AsyncParallelNavEnv, ParallelNavEnv
+
+
+class CountingEnv(gym.Env):
+    """
+    Environment whose observation is the number of steps of the episode, with episodes of episode_length steps
+    and resets that take reset_time seconds
+    """
+
+    def __init__(self, episode_length, reset_time, automatic_reset=False):
+        self.observation_space = gym.spaces.Box(
+            low=0.0, high=np.inf, shape=(2,), dtype=np.float32)
+        self.action_space = gym.spaces.Box(
+            low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
+        self.episode_length = episode_length
+        self.reset_time = reset_time
+        self.automatic_reset = automatic_reset
+        self.num_resets = 0
+        self.num_steps = 0
+
+    def observation(self):
+        return np.array([self.num_resets, self.num_steps], dtype=np.float32)
+
+    def reset(self):
+        time.sleep(self.reset_time)
+        self.num_resets += 1
+        self.num_steps = 0
+        return self.observation()
+
+    def step(self, action):
+        self.num_steps += 1
+        done = self.num_steps >= self.episode_length
+        state = self.observation()
+        if done and self.automatic_reset:
+            state = self.reset()
+        return state, float(self.num_steps), done, {}
+
+
+class CountingEnvConstructor(object):
+    def __init__(self, episode_length, reset_time=0.0, automatic_reset=False):
+        self.episode_length = episode_length
+        self.reset_time = reset_time
+        self.automatic_reset = automatic_reset
+
+    def __call__(self):
+        return CountingEnv(self.episode_length, self.reset_time, self.automatic_reset)
+
+
+def test_step_async():
+    for shared_memory in [False, True]:
+        env = ParallelNavEnv([CountingEnvConstructor(10)] * 3,
+                             shared_memory=shared_memory)
+        env.reset()
+        env.step_async([[0.0]] * 2, env_ids=[0, 2])
+        results = env.step_wait()
+        if shared_memory:
+            obs, rewards, dones, _ = results
+            assert np.array_equal(obs, [[1, 1], [1, 1]])
+            assert np.array_equal(rewards, [1.0, 1.0])
+        else:
+            assert [result[1] for result in results] == [1.0, 1.0]
+        obs = env.step([[0.0]] * 3)[0]
+        if shared_memory:
+            assert np.array_equal(obs, [[1, 2], [1, 1], [1, 2]])
+        env.close()
+
+
+def test_wait_partial_batch():
+    env = ParallelNavEnv([CountingEnvConstructor(1, reset_time=0.5),
+                          CountingEnvConstructor(10, reset_time=0.0)],
+                         auto_reset=True, shared_memory=True)
+    env.reset_async()
+    env.wait(min_ready=2)
+
+    # the first environment ends its episode and resets in the background, the second one keeps stepping
+    env.step_async([[0.0]], env_ids=[0])
+    (env_id, (obs, _, done, _)), = env.wait()
+    assert env_id == 0 and done
+    assert np.array_equal(obs, [1, 1])
+    env.reset_async(env_ids=[0])
+    start = time.time()
+    for i in range(3):
+        env.step_async([[0.0]], env_ids=[1])
+        ready = env.wait(min_ready=1)
+        assert [env_id for env_id, _ in ready] == [1]
+    assert time.time() - start < 0.4
+    assert env.wait(timeout=0.0) == []
+
+    # the reset of the first environment was started by the step, and is not run again
+    (env_id, obs), = env.wait(timeout=1.0)
+    assert env_id == 0
+    assert np.array_equal(obs, [2, 0])
+    env.close()
+
+
+def test_auto_reset_replaces_automatic_reset():
+    env = ParallelNavEnv([CountingEnvConstructor(1, automatic_reset=True)] * 2,
+                         auto_reset=True)
+    env.reset()
+    obs, _, done, _ = env.step([[0.0]] * 2)[0]
+    # the step returns the last observation of the episode
+    assert done and np.array_equal(obs, [1, 1])
+    obs = env.reset()[0]
+    assert np.array_equal(obs, [2, 0])
+    env.close()
+
+
+def test_forkserver():
+    env = ParallelNavEnv([CountingEnvConstructor(10)] * 2,
+                         start_method='forkserver')
+    obs = env.reset()
+    assert np.array_equal(obs[0], [1, 0])
+    obs = env.step([[0.0]] * 2)[1][0]
+    assert np.array_equal(obs, [1, 1])
+    env.close()
+
+
+def test_async_parallel_env():
+    env = AsyncParallelNavEnv([CountingEnvConstructor(10, reset_time=0.2)] * 3)
+
+    async def run():
+        # the slow resets run concurrently, and other tasks keep running meanwhile
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        start = time.time()
+        results = await asyncio.gather(*[env.reset(env_ids=[env_id]) for env_id in range(3)], tick())
+        assert time.time() - start < 0.35
+        assert len(ticks) == 5
+        assert all(np.array_equal(obs[0], [1, 0]) for obs in results[:3])
+        obs, rewards, _, _ = await env.step([[0.0]] * 2, env_ids=[2, 0])
+        assert np.array_equal(obs, [[1, 1], [1, 1]])
+        assert np.array_equal(rewards, [1.0, 1.0])
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(run())
+    loop.close()
+    env.close()
@@ -0,0 +1,175 @@
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import numpy as np
+import gym
+import pytest
+from gibson2.envs.parallel_env import ParallelNavEnv
+from gibson2.envs.remote_env import EnvServer, RemoteParallelNavEnv, AsyncRemoteParallelNavEnv, recv_frame, send_frame
+
+
+class ImageEnv(gym.Env):
+    """
+    Environment whose observations are filled with the number of steps of the episode, with steps that take
+    step_time seconds
+    """
+
+    def __init__(self, step_time):
+        self.observation_space = gym.spaces.Dict({
+            'rgb': gym.spaces.Box(low=0.0, high=1.0, shape=(32, 32, 3), dtype=np.float32),
+            'task_obs': gym.spaces.Box(low=-np.inf, high=np.inf, shape=(4,), dtype=np.float64),
+        })
+        self.action_space = gym.spaces.Box(
+            low=-1.0, high=1.0, shape=(2,), dtype=np.float32)
+        self.step_time = step_time
+        self.num_steps = 0
+
+    def observation(self):
+        return {key: np.full(space.shape, self.num_steps, dtype=space.dtype)
+                for key, space in self.observation_space.spaces.items()}
+
+    def reset(self):
+        self.num_steps = 0
+        return self.observation()
+
+    def step(self, action):
+        time.sleep(self.step_time)
+        self.num_steps += 1
+        return self.observation(), float(action[0]), self.num_steps >= 3, {'num_steps': self.num_steps}
+
+
+class ImageEnvConstructor(object):
+    def __init__(self, step_time=0.0):
+        self.step_time = step_time
+
+    def __call__(self):
+        return ImageEnv(self.step_time)
+
+
+def start_server(address, num_envs, step_time=0.0):
+    env = ParallelNavEnv([ImageEnvConstructor(step_time)] * num_envs)
+    server = EnvServer(env, address)
+    thread = threading.Thread(target=server.serve, args=(1,), daemon=True)
+    thread.start()
+    return env, server, thread
+
+
+def test_frame():
+    a, b = socket.socketpair()
+    message = {'rgb': np.arange(12, dtype=np.float32).reshape(2, 2, 3),
+               'dones': np.array([True, False]), 'info': [{'success': True}]}
+    send_frame(a, message)
+    received = recv_frame(b)
+    assert np.array_equal(received['rgb'], message['rgb'])
+    assert received['rgb'].dtype == np.float32
+    assert np.array_equal(received['dones'], message['dones'])
+    assert received['info'] == message['info']
+    # the arrays use the received buffers
+    assert not received['rgb'].flags['OWNDATA']
+    # before pickle protocol 5, the arrays are in the pickled message
+    send_frame(a, message, protocol=4)
+    received = recv_frame(b)
+    assert np.array_equal(received['rgb'], message['rgb'])
+    assert received['info'] == message['info']
+    a.close()
+    b.close()
+
+
+@pytest.mark.parametrize('family', ['ipv4', 'ipv6', 'unix'])
+def test_remote_env(family):
+    if family == 'ipv4':
+        address = ('127.0.0.1', 0)
+    elif family == 'ipv6':
+        if not socket.has_ipv6:
+            pytest.skip('IPv6 is not supported')
+        address = ('::1', 0)
+    else:
+        address = os.path.join(tempfile.mkdtemp(), 'env.sock')
+    env, server, thread = start_server(address, 3)
+    client = RemoteParallelNavEnv(server.address)
+    assert client.batch_size == 3
+    assert client.observation_space == env.observation_space
+
+    obs = client.reset()
+    assert len(obs) == 3 and np.all(obs[0]['rgb'] == 0)
+    results = client.step([[0.5, 0.0]] * 3)
+    obs, reward, done, info = results[2]
+    assert obs['rgb'].shape == (32, 32, 3) and np.all(obs['rgb'] == 1)
+    assert reward == 0.5 and not done and info == {'num_steps': 1}
+
+    # partial batches
+    client.step_async([[1.0, 0.0]], env_ids=[1])
+    with pytest.raises(ValueError):
+        client.step_async([[0.0, 0.0]], env_ids=[1])
+    (env_id, (obs, reward, _, _)), = client.wait()
+    assert env_id == 1 and reward == 1.0 and np.all(obs['task_obs'] == 2)
+
+    # errors of the server are raised by the client
+    client.step_async([[0.0, 0.0]], env_ids=[5])
+    with pytest.raises(Exception):
+        client.wait()
+    assert len(client.step([[0.0, 0.0]] * 3)) == 3
+
+    client.close()
+    thread.join(5)
+    server.close()
+    env.close()
+
+
+def test_remote_env_pipelining():
+    env, server, thread = start_server(('127.0.0.1', 0), 2, step_time=0.1)
+    client = RemoteParallelNavEnv(server.address)
+    client.reset()
+    # the second request is started while the first one runs
+    start = time.time()
+    client.step_async([[0.0, 0.0]], env_ids=[0])
+    client.step_async([[0.0, 0.0]], env_ids=[1])
+    ready = client.wait(min_ready=2)
+    assert sorted(env_id for env_id, _ in ready) == [0, 1]
+    assert time.time() - start < 0.18
+    assert client.wait(timeout=0.0) == []
+    client.close()
+    thread.join(5)
+    server.close()
+    env.close()
+
+
+def test_async_remote_env():
+    env, server, thread = start_server(('127.0.0.1', 0), 3, step_time=0.1)
+
+    async def run():
+        client = AsyncRemoteParallelNavEnv(server.address)
+        obs = await client.reset()
+        assert len(obs) == 3
+        # the steps of the environments are pipelined, and other tasks keep running meanwhile
+        ticks = []
+
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.01)
+
+        start = time.time()
+        results = await asyncio.gather(*[client.step([[float(env_id), 0.0]], env_ids=[env_id])
+                                         for env_id in range(3)], tick())
+        assert time.time() - start < 0.25
+        assert len(ticks) == 5
+        assert [result[0][1] for result in results[:3]] == [0.0, 1.0, 2.0]
+        assert np.all(results[2][0][0]['rgb'] == 1)
+
+        # a request larger than the send buffer is sent while the event loop keeps running
+        ticks.clear()
+        results = await asyncio.gather(client.step([np.full(4000000, 0.5)], env_ids=[0]), tick())
+        assert results[0][0][1] == 0.5
+        assert len(ticks) == 5
+        client.close()
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(run())
+    loop.close()
+    thread.join(5)
+    server.close()
+    env.close()
@@ -104,3 +104,25 @@ def test_tensor_render_rendering():
     # print(np.mean(img_np2.astype(np.float32), axis = (0,1)))
     renderer.release()
 '''
+
+
+def test_render_mixed_resolution():
+    download_assets()
+    test_dir = os.path.join(gibson2.assets_path, 'test')
+
+    renderer = MeshRenderer(width=256, height=256)
+    renderer.load_object(os.path.join(
+        test_dir, 'mesh/bed1a77d92d64f5cbbaaae4feed64ec1_new.obj'))
+    renderer.add_instance(0)
+    renderer.set_camera([0, 0, 1.2], [0, 1, 1.2], [0, 1, 0])
+    renderer.set_fov(90)
+    rgb = renderer.render(('rgb'))[0]
+    pc = renderer.render(('3d'), resolution=(64, 64))[0]
+    assert rgb.shape == (256, 256, 4)
+    assert pc.shape == (64, 64, 4)
+    assert (np.sum(np.abs(pc[:, :, :3]), axis=(0, 1, 2)) > 0)
+
+    # the primary render target is restored after rendering at another resolution
+    rgb_again = renderer.render(('rgb'))[0]
+    assert np.allclose(rgb, rgb_again)
+    renderer.release()
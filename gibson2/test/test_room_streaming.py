@@ -0,0 +1,102 @@
+import numpy as np
+import pytest
+from gibson2.scenes.igibson_indoor_scene import InteractiveIndoorScene
+from gibson2.utils.room_streaming import RoomStreaming
+
+
+class RoomMapScene(object):
+    """
+    Room segmentation map of a 10m x 10m house: two rooms on top, separated by a wall, and a long room below
+    """
+    seg_map_to_world = InteractiveIndoorScene.seg_map_to_world
+    world_to_seg_map = InteractiveIndoorScene.world_to_seg_map
+    group_cells_by_id = InteractiveIndoorScene.group_cells_by_id
+    get_object_rooms = InteractiveIndoorScene.get_object_rooms
+    index_streamed_objects = InteractiveIndoorScene.index_streamed_objects
+    get_room_streaming_update = InteractiveIndoorScene.get_room_streaming_update
+
+    def __init__(self):
+        self.seg_map_size = 20
+        self.seg_map_resolution = 0.5
+        self.room_ins_map = np.zeros((20, 20), dtype=np.uint8)
+        self.room_ins_map[:10, :10] = 1
+        self.room_ins_map[:10, 11:] = 2
+        self.room_ins_map[11:, :] = 3
+        self.room_ins_cells = self.group_cells_by_id(self.room_ins_map)
+        self.room_ins_name_to_ins_id = {'room_1': 1, 'room_2': 2, 'room_3': 3}
+        self.objects_by_name = {}
+        self.streamed_rooms = set()
+
+    def room_center(self, ins_id):
+        cells = np.stack(np.divmod(
+            self.room_ins_cells[ins_id], self.seg_map_size), axis=1)
+        return np.mean(self.seg_map_to_world(cells), axis=0)
+
+
+def test_room_streaming():
+    scene = RoomMapScene()
+    streaming = RoomStreaming(scene, load_distance=0.5, unload_distance=2.0)
+    assert streaming.adjacency == {1: {2, 3}, 2: {1, 3}, 3: {1, 2}}
+
+    # the current room and its neighbors are loaded
+    rooms = streaming.get_rooms(scene.room_center(1), set(), {})
+    assert rooms == {1, 2, 3}
+
+    # without adjacency, only the rooms within load_distance are loaded
+    streaming.adjacency = {1: set(), 2: set(), 3: set()}
+    assert streaming.get_rooms(scene.room_center(1), set(), {}) == {1}
+    # loaded rooms are kept until they are farther than unload_distance
+    xy = scene.room_center(1) + np.array([0.0, 1.0])
+    assert streaming.get_rooms(xy, {1, 3}, {}) == {1, 3}
+    xy = scene.room_center(2)
+    assert streaming.get_rooms(xy, {1, 3}, {}) == {2}
+    # rooms around several positions
+    xy = np.stack([scene.room_center(1), scene.room_center(2)])
+    assert streaming.get_rooms(xy, set(), {}) == {1, 2}
+
+
+def test_room_streaming_budget():
+    scene = RoomMapScene()
+    streaming = RoomStreaming(
+        scene, load_distance=20.0, unload_distance=20.0, max_bodies=5)
+    room_num_bodies = {1: 4, 2: 3, 3: 1}
+    # the current room is always loaded, then the closest rooms that fit in the budget
+    assert streaming.get_rooms(scene.room_center(2), set(), room_num_bodies) == {2, 3}
+    assert streaming.get_rooms(scene.room_center(1), set(), room_num_bodies) == {1, 3}
+    streaming.max_bodies = 0
+    assert streaming.get_rooms(scene.room_center(1), set(), room_num_bodies) == {1}
+
+    with pytest.raises(ValueError):
+        RoomStreaming(scene, load_distance=2.0, unload_distance=1.0)
+
+
+class StreamedObject(object):
+    def __init__(self, name, category, in_rooms):
+        self.name = name
+        self.category = category
+        self.in_rooms = in_rooms
+        self.urdf_paths = [name]
+        self.loaded = False
+
+
+def test_room_streaming_update():
+    scene = RoomMapScene()
+    for obj in [StreamedObject('chair', 'chair', ['room_1']),
+                StreamedObject('table', 'table', ['room_1', 'room_2']),
+                StreamedObject('bed', 'bed', ['room_3']),
+                StreamedObject('wall', 'walls', ['room_1'])]:
+        scene.objects_by_name[obj.name] = obj
+    scene.room_streaming = RoomStreaming(scene, load_distance=0.5, unload_distance=2.0)
+    scene.room_streaming.adjacency = {1: set(), 2: set(), 3: set()}
+    scene.index_streamed_objects()
+    assert scene.room_num_bodies == {1: 2, 2: 1, 3: 1}
+
+    to_load, to_unload = scene.get_room_streaming_update(scene.room_center(1))
+    assert [obj.name for obj in to_load] == ['chair', 'table'] and to_unload == []
+    for obj in to_load:
+        obj.loaded = True
+    # nothing to do while the rooms do not change
+    assert scene.get_room_streaming_update(scene.room_center(1)) == ([], [])
+    # the table is also in the second room and stays loaded
+    to_load, to_unload = scene.get_room_streaming_update(scene.room_center(2))
+    assert to_load == [] and [obj.name for obj in to_unload] == ['chair']
@@ -0,0 +1,65 @@
+import threading
+import time
+import pytest
+from gibson2.scenes.scene_base import Scene
+from gibson2.utils.scene_prefetcher import ScenePrefetcher
+
+
+class SlowScene(Scene):
+    def __init__(self, scene_id, delay):
+        super(SlowScene, self).__init__()
+        self.scene_id = scene_id
+        self.delay = delay
+        self.prefetch_thread = None
+
+    def prefetch(self):
+        time.sleep(self.delay)
+        self.prefetch_thread = threading.current_thread()
+
+
+def test_scene_prefetcher():
+    created = []
+
+    def create_scene(scene_id):
+        created.append(scene_id)
+        return SlowScene(scene_id, 0.2)
+
+    prefetcher = ScenePrefetcher(create_scene, queue_depth=1)
+    prefetcher.prefetch('a')
+    # duplicate requests are ignored
+    prefetcher.prefetch('a')
+    time.sleep(0.4)
+    start = time.time()
+    scene = prefetcher.get('a')
+    assert time.time() - start < 0.1
+    assert scene.scene_id == 'a'
+    assert scene.prefetch_thread is not threading.current_thread()
+
+    # scenes that were not prefetched are created on demand
+    scene = prefetcher.get('b')
+    assert scene.scene_id == 'b'
+    assert scene.prefetch_thread is threading.current_thread()
+
+    stats = prefetcher.get_stats()
+    assert stats['num_hits'] == 1
+    assert stats['num_misses'] == 1
+    assert stats['hidden_time'] >= 0.15
+    assert 0.15 <= stats['exposed_time'] < 0.35
+    assert created == ['a', 'b']
+    prefetcher.close()
+
+
+def test_scene_prefetcher_queue_depth():
+    prefetcher = ScenePrefetcher(
+        lambda scene_id: SlowScene(scene_id, 0.05), queue_depth=2)
+    for scene_id in ['a', 'b', 'c']:
+        prefetcher.prefetch(scene_id)
+    # the oldest prefetch is dropped
+    assert list(prefetcher.pending.keys()) == ['b', 'c']
+    assert prefetcher.get('c').scene_id == 'c'
+    assert prefetcher.get('b').scene_id == 'b'
+    assert prefetcher.get_stats()['num_hits'] == 2
+    prefetcher.close()
+
+    with pytest.raises(ValueError):
+        ScenePrefetcher(lambda scene_id: None, queue_depth=0)
@@ -0,0 +1,92 @@
+import gibson2
+import pybullet as p
+from gibson2.scenes.igibson_indoor_scene import InteractiveIndoorScene
+
+# a fixed cabinet with a door, and a fixed box that blocks the door when it opens by more than ~30 degrees
+CABINET_URDF = """<robot name="cabinet">
+  <link name="world"/>
+  <link name="base_link">
+    <inertial><mass value="1"/><inertia ixx="1" ixy="0" ixz="0" iyy="1" iyz="0" izz="1"/></inertial>
+    <collision><geometry><box size="0.5 0.5 0.5"/></geometry></collision>
+  </link>
+  <link name="door">
+    <inertial><origin xyz="-0.25 0 0"/><mass value="1"/><inertia ixx="1" ixy="0" ixz="0" iyy="1" iyz="0" izz="1"/></inertial>
+    <collision><origin xyz="-0.25 0 0"/><geometry><box size="0.5 0.04 0.4"/></geometry></collision>
+  </link>
+  <joint name="world_joint" type="fixed">
+    <parent link="world"/><child link="base_link"/>
+  </joint>
+  <joint name="door_joint" type="revolute">
+    <origin xyz="0.25 -0.27 0"/><axis xyz="0 0 1"/><limit lower="0" upper="1.5" effort="1" velocity="1"/>
+    <parent link="base_link"/><child link="door"/>
+  </joint>
+</robot>"""
+
+BOX_URDF = """<robot name="box">
+  <link name="world"/>
+  <link name="base_link">
+    <inertial><mass value="1"/><inertia ixx="1" ixy="0" ixz="0" iyy="1" iyz="0" izz="1"/></inertial>
+    <collision><geometry><box size="0.2 0.2 0.5"/></geometry></collision>
+  </link>
+  <joint name="world_joint" type="fixed">
+    <parent link="world"/><child link="base_link"/>
+  </joint>
+</robot>"""
+
+
+class FakeObject(object):
+    def __init__(self, body_id):
+        self.body_ids = [body_id]
+
+
+def get_scene(tmp_path, box_position):
+    for name, urdf in [('cabinet.urdf', CABINET_URDF), ('box.urdf', BOX_URDF)]:
+        (tmp_path / name).write_text(urdf)
+    cabinet = p.loadURDF(str(tmp_path / 'cabinet.urdf'), basePosition=[0, 0, 0.5], useFixedBase=True)
+    box = p.loadURDF(str(tmp_path / 'box.urdf'), basePosition=box_position, useFixedBase=True)
+    scene = InteractiveIndoorScene.__new__(InteractiveIndoorScene)
+    scene.objects_by_name = {'cabinet': FakeObject(cabinet), 'box': FakeObject(box)}
+    scene.overlapped_bboxes = []
+    scene.link_collision_tolerance = 0.0
+    return scene, [cabinet, box]
+
+
+def test_scene_quality(tmp_path):
+    client = p.connect(p.DIRECT)
+    try:
+        # the door can open
+        scene, body_ids = get_scene(tmp_path, [3.0, 3.0, 0.5])
+        assert scene.check_scene_quality(body_ids, body_ids)
+        p.resetSimulation()
+
+        # the door hits the box
+        scene, body_ids = get_scene(tmp_path, [-0.1, -0.7, 0.5])
+        assert not scene.check_scene_quality(body_ids, body_ids)
+        assert scene.link_collision_set == set(['cabinet'])
+        # the joints are back to their initial positions
+        assert p.getJointState(body_ids[0], 1)[0] == 0.0
+    finally:
+        p.disconnect(client)
+
+
+class KeyObject(object):
+    def __init__(self, name):
+        self.name = name
+        self.category = 'bottom_cabinet'
+        self.model = name
+        self.scale = None
+
+
+def test_scene_quality_cache_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(gibson2, 'cache_path', str(tmp_path / 'cache'))
+    scene = InteractiveIndoorScene.__new__(InteractiveIndoorScene)
+    scene.scene_id = 'synthetic'
+    scene.scene_file = str(tmp_path / 'cabinet.urdf')
+    (tmp_path / 'cabinet.urdf').write_text(CABINET_URDF)
+    scene.link_collision_tolerance = 0.0
+    scene.quality_check_objects = [KeyObject('cabinet'), KeyObject('box')]
+    full_scene_file = scene.get_scene_quality_cache_file()
+    assert scene.get_scene_quality_cache_file() == full_scene_file
+    # a check of the objects that are not streamed is not reused for the full scene
+    scene.quality_check_objects = [KeyObject('cabinet')]
+    assert scene.get_scene_quality_cache_file() != full_scene_file
@@ -0,0 +1,277 @@
+import os
+import numpy as np
+import networkx as nx
+from PIL import Image
+import gibson2
+from gibson2.utils.trav_graph import TraversableGraph
+from gibson2.scenes.indoor_scene import IndoorScene
+
+
+def build_networkx_graph(trav_map):
+    g = nx.Graph()
+    map_size = trav_map.shape[0]
+    for i in range(map_size):
+        for j in range(map_size):
+            if trav_map[i, j] == 0:
+                continue
+            g.add_node((i, j))
+            for n in [(i - 1, j - 1), (i, j - 1), (i + 1, j - 1), (i - 1, j)]:
+                if 0 <= n[0] < map_size and 0 <= n[1] < map_size and trav_map[n] > 0:
+                    g.add_edge(n, (i, j), weight=np.linalg.norm(
+                        np.array(n) - np.array((i, j))))
+    largest_cc = max(nx.connected_components(g), key=len)
+    return g.subgraph(largest_cc).copy()
+
+
+def get_random_trav_map(map_size=50):
+    rng = np.random.RandomState(0)
+    return (rng.rand(map_size, map_size) > 0.3).astype(np.uint8) * 255
+
+
+def test_trav_graph_matches_networkx():
+    trav_map = get_random_trav_map()
+    g_nx = build_networkx_graph(trav_map)
+    g = TraversableGraph.from_trav_map(trav_map)
+    assert g.num_nodes == g_nx.number_of_nodes()
+    assert g.adjacency.nnz == 2 * g_nx.number_of_edges()
+    assert nx.is_isomorphic(g.to_networkx(), g_nx)
+
+    nodes = list(g_nx.nodes)
+    rng = np.random.RandomState(1)
+    for _ in range(10):
+        source = nodes[rng.randint(len(nodes))]
+        target = nodes[rng.randint(len(nodes))]
+        distances, predecessors = g.get_shortest_path_tree(g.get_node(target))
+        path = g.node_coords[g.get_path(g.get_node(source), predecessors)]
+        assert tuple(path[0]) == source and tuple(path[-1]) == target
+        expected = nx.shortest_path_length(g_nx, source, target, weight='weight')
+        assert np.isclose(distances[g.get_node(source)], expected)
+        assert np.isclose(np.sum(np.linalg.norm(np.diff(path, axis=0), axis=1)), expected)
+
+
+def get_indoor_scene(trav_map, trav_map_resolution=0.1):
+    scene = IndoorScene('synthetic', trav_map_resolution=trav_map_resolution)
+    scene.trav_map_size = trav_map.shape[0]
+    scene.floor_graph = [TraversableGraph.from_trav_map(trav_map)]
+    scene.floor_map = [scene.floor_graph[0].get_trav_map()]
+    scene.floor_free_cells = [scene.floor_graph[0].node_cells]
+    return scene
+
+
+def test_geodesic_distance_field():
+    scene = get_indoor_scene(get_random_trav_map())
+    scene.waypoint_interval = 1
+    rng = np.random.RandomState(2)
+    target = rng.uniform(-2.5, 2.5, 2)
+    for _ in range(10):
+        source = rng.uniform(-2.5, 2.5, 2)
+        path, geodesic_distance = scene.get_shortest_path(
+            0, source, target, entire_path=True)
+        assert np.isclose(scene.get_geodesic_distance(0, source, target),
+                          geodesic_distance)
+
+        # source at the center of a random node
+        g = scene.floor_graph[0]
+        source = scene.map_to_world(g.node_coords[rng.randint(g.num_nodes)] + 0.5)
+        path, _ = scene.get_shortest_path(
+            0, source, target, entire_path=True)
+        if path.shape[0] > 2:
+            assert np.allclose(scene.get_next_waypoint(0, source, target), path[1])
+    # all queries share the distance field of the same target
+    assert len(scene.distance_fields) == 1
+
+
+def test_batch_geodesic_distances():
+    scene = get_indoor_scene(get_random_trav_map())
+    rng = np.random.RandomState(3)
+    sources = rng.uniform(-3.0, 3.0, (20, 2))
+    targets = rng.uniform(-3.0, 3.0, (20, 2))
+    graph = scene.floor_graph[0]
+    num_nodes = graph.num_nodes
+    geodesic_distances = scene.get_geodesic_distances(0, sources, targets)
+    for source, target, geodesic_distance in zip(sources, targets, geodesic_distances):
+        assert np.isclose(scene.get_geodesic_distance(0, source, target),
+                          geodesic_distance)
+    # snapping off-graph points does not add nodes to the graph
+    assert graph.num_nodes == num_nodes
+    assert np.array_equal(
+        graph.get_closest_nodes(scene.world_to_map(sources)),
+        [graph.get_closest_node(scene.world_to_map(source)) for source in sources])
+
+
+def is_memory_mapped(array):
+    while array is not None:
+        if isinstance(array, np.memmap):
+            return True
+        array = getattr(array, 'base', None)
+    return False
+
+
+def test_trav_map_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(gibson2, 'cache_path', str(tmp_path / 'cache'))
+    maps_path = tmp_path / 'maps'
+    maps_path.mkdir()
+    trav_map = get_random_trav_map(map_size=500)
+    Image.fromarray(trav_map).save(str(maps_path / 'floor_trav_0.png'))
+    Image.fromarray(np.full_like(trav_map, 255)).save(str(maps_path / 'floor_0.png'))
+
+    scene = IndoorScene('synthetic', trav_map_resolution=0.05, trav_map_erosion=1)
+    scene.load_trav_map(str(maps_path))
+    cached_scene = IndoorScene('synthetic', trav_map_resolution=0.05, trav_map_erosion=1)
+    cached_scene.load_trav_map(str(maps_path))
+    assert cached_scene.trav_map_size == scene.trav_map_size == 100
+    assert np.array_equal(cached_scene.floor_map[0], scene.floor_map[0])
+    assert np.array_equal(cached_scene.floor_free_cells[0], scene.floor_free_cells[0])
+    assert np.array_equal(cached_scene.floor_graph[0].node_cells,
+                          scene.floor_graph[0].node_cells)
+
+    # both scenes use the read-only memory-mapped copy in the cache
+    for s in [scene, cached_scene]:
+        assert isinstance(s.floor_map[0], np.memmap)
+        assert isinstance(s.floor_free_cells[0], np.memmap)
+        for array in s.floor_graph[0].get_arrays().values():
+            assert is_memory_mapped(array)
+
+    # distance fields precomputed by one scene are shared with the other scene
+    target = np.array([0.5, 0.5])
+    source = np.array([-1.5, -1.5])
+    geodesic_distance = cached_scene.get_geodesic_distance(0, source, target)
+    scene.precompute_distance_fields(0, [target])
+    cached_scene.distance_fields.clear()
+    assert np.isclose(cached_scene.get_geodesic_distance(0, source, target),
+                      geodesic_distance)
+    _, distances, _ = cached_scene.get_distance_field(0, target)
+    assert is_memory_mapped(distances)
+
+    # a different erosion is a different cache entry
+    eroded_scene = IndoorScene('synthetic', trav_map_resolution=0.05, trav_map_erosion=2)
+    eroded_scene.load_trav_map(str(maps_path))
+    assert eroded_scene.trav_map_cache.key != scene.trav_map_cache.key
+    assert not np.array_equal(eroded_scene.floor_map[0], scene.floor_map[0])
+
+    # the distance fields of a graph rebuilt from changed maps are not reused
+    trav_map_file = str(maps_path / 'floor_trav_0.png')
+    Image.fromarray(np.rot90(trav_map).copy()).save(trav_map_file)
+    os.utime(trav_map_file, (0, os.path.getmtime(trav_map_file) + 10))
+    changed_scene = IndoorScene('synthetic', trav_map_resolution=0.05, trav_map_erosion=1)
+    changed_scene.load_trav_map(str(maps_path))
+    cache = changed_scene.trav_map_cache
+    assert not [name for name in os.listdir(cache.cache_dir) if '_field_' in name]
+    graph = changed_scene.floor_graph[0]
+    target_node = graph.get_closest_node(changed_scene.world_to_map(target))
+    assert cache.load_distance_field(0, target_node) is None
+    _, distances, _ = changed_scene.get_distance_field(0, target)
+    assert np.allclose(distances, graph.get_shortest_path_tree(target_node)[0])
+
+
+def test_sample_points():
+    scene = get_indoor_scene(get_random_trav_map())
+    floor, points = scene.sample_points(100, floor=0)
+    assert floor == 0 and points.shape == (100, 3)
+    # points are at the corner of free cells, sample at their center
+    cells = scene.world_to_map(points[:, :2] + scene.trav_map_resolution / 2.0)
+    assert np.all(scene.floor_map[0][cells[:, 0], cells[:, 1]] == 255)
+    _, point = scene.get_random_point(floor=0)
+    assert point.shape == (3,)
+
+
+def test_clearance():
+    scene = IndoorScene('synthetic', trav_map_resolution=0.1)
+    scene.trav_map_size = 50
+    trav_map = np.full((50, 50), 255, dtype=np.uint8)
+    trav_map[25, 25] = 0
+    scene.floor_clearance = [scene.compute_clearance(trav_map)]
+
+    obstacle = scene.map_to_world(np.array([25, 25]))
+    assert np.isclose(scene.get_clearance(0, obstacle), 0.0)
+    points = obstacle + np.array([[0.0, 0.3], [0.4, 0.0], [1.0, 1.0]])
+    assert np.allclose(scene.get_clearance(0, points), [0.3, 0.4, np.sqrt(2.0)], atol=1e-3)
+    assert np.array_equal(scene.is_free(0, points, 0.35), [False, True, True])
+    # outside of the map
+    assert not scene.is_free(0, np.array([100.0, 100.0]), 0.0)
+
+    trav_map_for_radius = scene.get_trav_map_for_radius(0, 0.25)
+    assert trav_map_for_radius[25, 28] == 255 and trav_map_for_radius[25, 27] == 0
+
+
+def test_update_shortest_path_tree():
+    g = TraversableGraph.from_trav_map(get_random_trav_map())
+    rng = np.random.RandomState(4)
+    target_node = rng.randint(g.num_nodes)
+    blocked = np.zeros(g.num_nodes, dtype=bool)
+    distances, predecessors = g.get_shortest_path_tree(target_node)
+    num_updates = 0
+    for _ in range(20):
+        # block or unblock a small square of cells
+        i, j = rng.randint(0, g.map_size - 3, 2)
+        rows, cols = np.mgrid[i:i + 3, j:j + 3]
+        nodes = g.cell_to_node[(rows * g.map_size + cols).ravel()]
+        nodes = nodes[(nodes >= 0) & (nodes != target_node)]
+        if rng.rand() < 0.5:
+            blocked_nodes, unblocked_nodes = nodes[~blocked[nodes]], nodes[:0]
+        else:
+            blocked_nodes, unblocked_nodes = nodes[:0], nodes[blocked[nodes]]
+        blocked[blocked_nodes] = True
+        blocked[unblocked_nodes] = False
+        adjacency = g.get_masked_adjacency(blocked)
+        expected, _ = g.get_shortest_path_tree(target_node, adjacency=adjacency)
+        updated = g.update_shortest_path_tree(
+            adjacency, distances, predecessors, target_node, blocked_nodes, unblocked_nodes)
+        if updated is None:
+            distances, predecessors = g.get_shortest_path_tree(target_node, adjacency=adjacency)
+        else:
+            num_updates += 1
+            distances, predecessors = updated
+        assert np.allclose(distances, expected)
+        # following the predecessors gives the shortest paths
+        reachable = np.flatnonzero(np.isfinite(expected) & ~blocked)
+        steps = np.linalg.norm(g.node_coords[reachable] -
+                               g.node_coords[np.maximum(predecessors[reachable], 0)], axis=1)
+        is_target = reachable == target_node
+        assert np.allclose((distances[np.maximum(predecessors[reachable], 0)] + steps)[~is_target],
+                           expected[reachable][~is_target])
+    assert num_updates > 0
+
+
+def test_dynamic_occupancy():
+    import pybullet as p
+    client = p.connect(p.DIRECT)
+    try:
+        scene = get_indoor_scene(np.full((50, 50), 255, dtype=np.uint8))
+        scene.trav_map_erosion = 2
+        # a wall across the map with a 1m gap
+        half_extents = [0.05, 2.0, 0.5]
+        wall = p.createMultiBody(
+            baseCollisionShapeIndex=p.createCollisionShape(p.GEOM_BOX, halfExtents=half_extents),
+            basePosition=[0.0, -0.5, 0.5])
+        source, target = np.array([-1.0, 1.75]), np.array([1.0, 1.75])
+        free_distance = scene.get_geodesic_distance(0, source, target)
+
+        scene.enable_dynamic_occupancy(0, [wall])
+        occupancy = scene.dynamic_occupancy.get_occupancy_map()
+        wall_cell = scene.world_to_map(np.array([0.0, 0.0]))
+        assert occupancy[wall_cell[0], wall_cell[1]]
+        assert scene.blocked_nodes[scene.floor_graph[0].get_node(wall_cell)]
+        assert np.isclose(scene.get_geodesic_distance(0, source, target), free_distance)
+        path, _ = scene.get_shortest_path(0, source, target, entire_path=True)
+        assert not np.any(scene.dynamic_occupancy.get_occupancy_map()[
+            tuple(scene.world_to_map(path[1:-1]).T)])
+
+        # moving the wall into the shortest path makes the robot go around it
+        p.resetBasePositionAndOrientation(wall, [0.0, 0.5, 0.5], [0, 0, 0, 1])
+        assert scene.update_dynamic_occupancy()
+        assert not scene.update_dynamic_occupancy()
+        assert scene.get_geodesic_distance(0, source, target) > free_distance + 1.0
+
+        # fall back to the static map when the wall splits the map in two
+        scene.dynamic_occupancy.body_ids.append(p.createMultiBody(
+            baseCollisionShapeIndex=p.createCollisionShape(
+                p.GEOM_BOX, halfExtents=[0.05, 3.0, 0.5]),
+            basePosition=[0.0, 0.0, 0.5]))
+        scene.update_dynamic_occupancy()
+        assert np.isclose(scene.get_geodesic_distance(0, source, target), free_distance)
+
+        scene.disable_dynamic_occupancy()
+        assert scene.get_blocked_nodes(0) is None
+    finally:
+        p.disconnect(client)
@@ -0,0 +1,48 @@
+import os
+import time
+import numpy as np
+import xml.etree.ElementTree as ET
+from gibson2.utils.urdf_cache import save_urdfs_cached, gc_urdf_cache, get_urdf_cache_dir
+
+URDF = """<robot name="table">
+  <link name="world"/>
+  <link name="table"/>
+  <link name="table_cup"/>
+  <joint name="table_joint" type="fixed">
+    <origin rpy="0 0 0" xyz="1.0 2.0 0.0"/>
+    <parent link="world"/>
+    <child link="table"/>
+  </joint>
+  <joint name="table_cup_joint" type="floating">
+    <origin rpy="0 0 0" xyz="0.0 0.0 0.5"/>
+    <parent link="table"/>
+    <child link="table_cup"/>
+  </joint>
+</robot>"""
+
+
+def test_urdf_cache(tmp_path):
+    cache_path = str(tmp_path)
+    urdfs = save_urdfs_cached(ET.ElementTree(ET.fromstring(URDF)), 'table', cache_path)
+    assert len(urdfs) == 2
+    assert sorted(is_fixed for _, _, is_fixed in urdfs.values()) == [False, True]
+    for urdf_file, _, _ in urdfs.values():
+        assert os.path.isfile(urdf_file)
+        ET.parse(urdf_file)
+
+    # an identical tree reuses the same files, a different tree gets a new entry
+    cached_urdfs = save_urdfs_cached(ET.ElementTree(ET.fromstring(URDF)), 'table', cache_path)
+    for key in urdfs:
+        assert cached_urdfs[key][0] == urdfs[key][0]
+        assert np.allclose(cached_urdfs[key][1], urdfs[key][1])
+    other_urdfs = save_urdfs_cached(
+        ET.ElementTree(ET.fromstring(URDF.replace('0.5', '0.6'))), 'table', cache_path)
+    assert other_urdfs[0][0] != urdfs[0][0]
+
+    assert gc_urdf_cache(max_age_days=1, cache_path=cache_path) == 0
+    old = time.time() - 2 * 24 * 3600
+    os.utime(os.path.join(os.path.dirname(urdfs[0][0]), 'manifest.json'), (old, old))
+    assert gc_urdf_cache(max_age_days=1, cache_path=cache_path) == 1
+    assert not os.path.exists(urdfs[0][0])
+    assert os.path.exists(other_urdfs[0][0])
+    assert os.path.isdir(get_urdf_cache_dir(cache_path))
@@ -18,9 +18,8 @@ def get_ig_category_ids():
     ig_categories_files = os.path.join(
         ig_dataset_path, 'metadata', 'categories.txt')
     name_to_id = {}
-    with open(ig_categories_files, 'r') as fp:
-        for i, l in enumerate(fp.readlines()):
-            name_to_id[l.rstrip()] = i
+    for i, l in enumerate(load_dataset_index(ig_categories_files)):
+        name_to_id[l.rstrip()] = i
     return defaultdict(lambda: 255, name_to_id)
 
 
@@ -66,6 +65,71 @@ def get_cubicasa_scene_path(scene_name):
     return os.path.join(cubicasa_dataset_path, scene_name)
 
 
+# directory listings of the object dataset, which does not change while a process runs
+_dir_listings = {}
+
+
+def _list_dir(path):
+    """
+    os.listdir with a per-process cache
+
+    :param path: directory path
+    :return: tuple of the directory entries
+    """
+    if path not in _dir_listings:
+        _dir_listings[path] = tuple(os.listdir(path))
+    return _dir_listings[path]
+
+
+def clear_dir_listings():
+    """
+    Clear the cached directory listings and dataset indexes, e.g. after new objects are added to the dataset
+    """
+    _dir_listings.clear()
+    _dataset_indexes.clear()
+
+
+# dataset-wide index files, read by every scene and object
+DATASET_INDEX_FILES = [
+    'metadata/categories.txt',
+    'metadata/room_categories.txt',
+    'objects/avg_category_specs.json',
+    'materials/materials.json',
+]
+_dataset_indexes = {}
+
+
+def load_dataset_index(path):
+    """
+    Read an index file of the dataset with a per-process cache. Json files are parsed and text files are
+    split into lines. The returned objects are shared by all the callers and must not be modified
+
+    :param path: index file path
+    :return: parsed json object, or tuple of the lines of a text file
+    """
+    if path not in _dataset_indexes:
+        with open(path, 'r') as f:
+            if path.endswith('.json'):
+                _dataset_indexes[path] = json.load(f)
+            else:
+                _dataset_indexes[path] = tuple(f.readlines())
+    return _dataset_indexes[path]
+
+
+def preload_dataset_indexes():
+    """
+    Read the dataset indexes and the listing of the object categories into the per-process caches, e.g. before
+    forking environment workers that share them copy-on-write
+    """
+    for index_file in DATASET_INDEX_FILES:
+        path = os.path.join(gibson2.ig_dataset_path, index_file)
+        if os.path.isfile(path):
+            load_dataset_index(path)
+    objects_path = os.path.join(gibson2.ig_dataset_path, 'objects')
+    if os.path.isdir(objects_path):
+        _list_dir(objects_path)
+
+
 def get_ig_category_path(category_name):
     """
     Get iGibson object category path
@@ -75,11 +139,21 @@ def get_ig_category_path(category_name):
     """
     ig_dataset_path = gibson2.ig_dataset_path
     ig_categories_path = ig_dataset_path + "/objects"
-    assert category_name in os.listdir(
+    assert category_name in _list_dir(
         ig_categories_path), "Category {} does not exist".format(category_name)
     return os.path.join(ig_categories_path, category_name)
 
 
+def get_ig_category_models(category_name):
+    """
+    Get iGibson object models of a category
+
+    :param category_name: object category
+    :return: tuple of the model names of the category
+    """
+    return _list_dir(get_ig_category_path(category_name))
+
+
 def get_ig_model_path(category_name, model_name):
     """
     Get iGibson object model path
@@ -88,10 +162,9 @@ def get_ig_model_path(category_name, model_name):
     :param model_name: object model
     :return: file path to the object model
     """
-    ig_category_path = get_ig_category_path(category_name)
-    assert model_name in os.listdir(
-        ig_category_path), "Model {} from category {} does not exist".format(model_name, category_name)
-    return os.path.join(ig_category_path, model_name)
+    assert model_name in get_ig_category_models(
+        category_name), "Model {} from category {} does not exist".format(model_name, category_name)
+    return os.path.join(get_ig_category_path(category_name), model_name)
 
 
 def get_all_object_models():
@@ -0,0 +1,107 @@
+from collections import OrderedDict
+import pybullet as p
+
+# collision classes used by the scenes, tasks can declare their own
+ROBOT = 'robot'
+SCENE_FIXED = 'scene_fixed'
+SCENE_DYNAMIC = 'scene_dynamic'
+MARKERS = 'markers'
+
+# bits 0 and 1 are the default groups of pybullet bodies (dynamic and static),
+# which every class keeps colliding with
+FIRST_GROUP_BIT = 2
+MAX_GROUP_BIT = 30
+
+
+class CollisionGroups(object):
+    """
+    Allocator of pybullet collision group / mask bits for named collision classes.
+    Two links collide if the group of each one is in the mask of the other one, so disabling the
+    collisions between two classes is a single mask update per link instead of one
+    setCollisionFilterPair call per pair of links. Links that are not assigned to any class keep
+    the default pybullet group and mask, and collide with every class.
+    """
+
+    def __init__(self):
+        self.group_bits = OrderedDict()
+        # bits of the classes that each class does not collide with
+        self.disabled_bits = {}
+        # (body_id, link_id) of each class
+        self.links = {}
+
+    def get_group(self, name):
+        """
+        Get the group bit of a collision class, allocated on first use
+
+        :param name: name of the collision class
+        :return: group bit
+        """
+        if name not in self.group_bits:
+            bit = FIRST_GROUP_BIT + len(self.group_bits)
+            if bit > MAX_GROUP_BIT:
+                raise ValueError(
+                    'cannot allocate more than {} collision classes'.format(
+                        MAX_GROUP_BIT - FIRST_GROUP_BIT + 1))
+            self.group_bits[name] = 1 << bit
+            self.disabled_bits[name] = 0
+            self.links[name] = []
+        return self.group_bits[name]
+
+    def get_mask(self, name):
+        """
+        :param name: name of the collision class
+        :return: collision mask of the class
+        """
+        self.get_group(name)
+        return ~self.disabled_bits[name]
+
+    def set_collision(self, name_a, name_b, enable):
+        """
+        Enable or disable the collisions between two collision classes (or within a class if they are equal)
+
+        :param name_a: name of the first collision class
+        :param name_b: name of the second collision class
+        :param enable: whether to enable the collisions
+        """
+        group_a, group_b = self.get_group(name_a), self.get_group(name_b)
+        if enable:
+            self.disabled_bits[name_a] &= ~group_b
+            self.disabled_bits[name_b] &= ~group_a
+        else:
+            self.disabled_bits[name_a] |= group_b
+            self.disabled_bits[name_b] |= group_a
+        for name in set([name_a, name_b]):
+            self.apply(name)
+
+    def add_body(self, name, body_id, link_ids=(-1,)):
+        """
+        Assign links of a body to a collision class
+
+        :param name: name of the collision class
+        :param body_id: pybullet body id
+        :param link_ids: link indices of the body, -1 for the base link
+        """
+        group, mask = self.get_group(name), self.get_mask(name)
+        for link_id in link_ids:
+            self.links[name].append((body_id, link_id))
+            p.setCollisionFilterGroupMask(body_id, link_id, group, mask)
+
+    def remove_body(self, body_id):
+        """
+        Forget a body, e.g. after it is removed from pybullet
+
+        :param body_id: pybullet body id
+        """
+        for name in self.links:
+            self.links[name] = [
+                link for link in self.links[name] if link[0] != body_id]
+
+    def apply(self, name):
+        """
+        Update the group and mask of all the links of a collision class
+
+        :param name: name of the collision class
+        """
+        group, mask = self.get_group(name), self.get_mask(name)
+        for body_id, link_id in self.links[name]:
+            p.setCollisionFilterGroupMask(body_id, link_id, group, mask)
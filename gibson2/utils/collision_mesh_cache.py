@@ -0,0 +1,55 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+import trimesh
+
+import gibson2
+from gibson2.utils.trav_map_cache import get_file_stamp, save_atomic
+
+# bump whenever the generation of the collision meshes changes
+COLLISION_MESH_CACHE_VERSION = 1
+
+
+def save_collision_mesh(mesh_path, f):
+    """
+    Write the compact collision mesh of a mesh file: welded vertex positions and triangles only,
+    without normals, texture coordinates, materials or groups
+
+    :param mesh_path: mesh file
+    :param f: file object to write the wavefront obj to
+    """
+    mesh = trimesh.load(file_obj=mesh_path, force='mesh', process=False)
+    # merge the vertices that are only split by texture or normal seams
+    mesh = trimesh.Trimesh(vertices=mesh.vertices, faces=mesh.faces, process=True)
+    np.savetxt(f, mesh.vertices, fmt='v %.9g %.9g %.9g')
+    np.savetxt(f, mesh.faces + 1, fmt='f %d %d %d')
+
+
+def get_collision_mesh_file(mesh_path, cache_path=None):
+    """
+    Get a compact copy of a mesh file for collision shapes (see save_collision_mesh), which pybullet parses
+    faster than the original mesh. Copies are cached across processes and runs, keyed by the path, size and
+    modification time of the mesh file rather than by its content, which would take long to hash for large scenes.
+
+    :param mesh_path: mesh file
+    :param cache_path: root folder of the cache, gibson2.cache_path by default
+    :return: compact mesh file, or the original mesh file if the copy cannot be saved
+    """
+    if cache_path is None:
+        cache_path = gibson2.cache_path
+    cache_file = os.path.join(
+        cache_path, 'collision_meshes', 'v{}'.format(COLLISION_MESH_CACHE_VERSION),
+        '{}.obj'.format(hashlib.md5(json.dumps(
+            [os.path.abspath(mesh_path)] + get_file_stamp(mesh_path)).encode('utf-8')).hexdigest()))
+    if os.path.isfile(cache_file):
+        return cache_file
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        save_atomic(cache_file, lambda f: save_collision_mesh(mesh_path, f))
+    except (IOError, OSError, ValueError) as e:
+        logging.warning(
+            'Cannot save collision mesh {}: {}'.format(cache_file, e))
+        return mesh_path
+    return cache_file
@@ -0,0 +1,103 @@
+import numpy as np
+import pybullet as p
+
+
+class DynamicOccupancy(object):
+    """
+    Occupancy overlay of movable bodies (e.g. interactive objects, doors, furniture) on top of the
+    static traversability map of a floor. The axis-aligned bounding box of every body is rasterized
+    into the map, and every cell counts the bodies that occupy it. On update, only the footprints of
+    the bodies that moved are rasterized again.
+    """
+
+    def __init__(self, scene, floor, body_ids, padding=1, max_height=2.0):
+        """
+        :param scene: IndoorScene with loaded traversability maps
+        :param floor: floor number
+        :param body_ids: pybullet body ids of the movable bodies
+        :param padding: number of cells the footprints are padded with, e.g. the robot footprint radius
+        :param max_height: bodies above this height from the floor are ignored
+        """
+        self.scene = scene
+        self.floor = floor
+        self.body_ids = list(body_ids)
+        self.padding = padding
+        self.max_height = max_height
+        self.counts = np.zeros(
+            (scene.trav_map_size, scene.trav_map_size), dtype=np.uint16)
+        self.footprints = {}
+
+    def get_footprint(self, body_id):
+        """
+        Get the footprint of a body in the traversability map
+
+        :param body_id: pybullet body id
+        :return: (row_min, row_max, col_min, col_max) of the cells occupied by the body (max excluded),
+            or None if the body does not occupy any cell
+        """
+        aabbs = [p.getAABB(body_id, link_id)
+                 for link_id in range(-1, p.getNumJoints(body_id))]
+        aabb_min = np.min([aabb[0] for aabb in aabbs], axis=0)
+        aabb_max = np.max([aabb[1] for aabb in aabbs], axis=0)
+        if aabb_min[2] > self.scene.get_floor_height(self.floor) + self.max_height:
+            return None
+
+        corners = self.scene.world_to_map(np.array([aabb_min[:2], aabb_max[:2]]))
+        row_min, col_min = np.min(corners, axis=0) - self.padding
+        row_max, col_max = np.max(corners, axis=0) + self.padding + 1
+        map_size = self.scene.trav_map_size
+        row_min, col_min = max(row_min, 0), max(col_min, 0)
+        row_max, col_max = min(row_max, map_size), min(col_max, map_size)
+        if row_min >= row_max or col_min >= col_max:
+            return None
+        return int(row_min), int(row_max), int(col_min), int(col_max)
+
+    def get_footprint_cells(self, footprint):
+        """
+        :param footprint: footprint from get_footprint
+        :return: flat indices of the cells of the footprint
+        """
+        if footprint is None:
+            return np.zeros(0, dtype=np.int64)
+        row_min, row_max, col_min, col_max = footprint
+        rows, cols = np.mgrid[row_min:row_max, col_min:col_max]
+        return (rows * self.scene.trav_map_size + cols).ravel()
+
+    def update(self):
+        """
+        Rasterize the footprints of the bodies that moved since the last update
+
+        :return: flat indices of the cells that became occupied, and of the cells that became free
+        """
+        moved = []
+        for body_id in self.body_ids:
+            footprint = self.get_footprint(body_id)
+            if footprint != self.footprints.get(body_id):
+                moved.append((body_id, footprint))
+        if len(moved) == 0:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        dirty_cells = np.unique(np.concatenate(
+            [self.get_footprint_cells(self.footprints.get(body_id)) for body_id, _ in moved] +
+            [self.get_footprint_cells(footprint) for _, footprint in moved]))
+        occupied_before = self.counts.flat[dirty_cells] > 0
+        for body_id, footprint in moved:
+            old_footprint = self.footprints.get(body_id)
+            if old_footprint is not None:
+                row_min, row_max, col_min, col_max = old_footprint
+                self.counts[row_min:row_max, col_min:col_max] -= 1
+            if footprint is not None:
+                row_min, row_max, col_min, col_max = footprint
+                self.counts[row_min:row_max, col_min:col_max] += 1
+            self.footprints[body_id] = footprint
+        occupied_after = self.counts.flat[dirty_cells] > 0
+
+        return dirty_cells[~occupied_before & occupied_after], \
+            dirty_cells[occupied_before & ~occupied_after]
+
+    def get_occupancy_map(self):
+        """
+        :return: map of the cells occupied by movable bodies
+        """
+        return self.counts > 0
@@ -0,0 +1,77 @@
+import logging
+import numpy as np
+
+# columns of an episode file and their dtypes
+EPISODE_COLUMNS = {
+    'floor': np.int16,
+    'initial_pos': np.float32,
+    'initial_orn': np.float32,
+    'target_pos': np.float32,
+    'geodesic_dist': np.float32,
+}
+
+
+def save_episodes(path, scene_id, episodes):
+    """
+    Save navigation episodes as a columnar .npz file, one array per column
+
+    :param path: path of the .npz file
+    :param scene_id: scene id of the episodes
+    :param episodes: dict from column name to array, with the same number of rows for every column
+    """
+    columns = {name: np.asarray(episodes[name], dtype=dtype)
+               for name, dtype in EPISODE_COLUMNS.items()}
+    num_episodes = set(column.shape[0] for column in columns.values())
+    if len(num_episodes) != 1:
+        raise ValueError('episode columns have different lengths')
+    np.savez(path, scene_id=np.array(scene_id), **columns)
+
+
+class EpisodeDataset(object):
+    """
+    Navigation episodes loaded from a file generated by gibson2.utils.generate_episodes.
+    Episodes are streamed in a shuffled order that is reshuffled after every pass, and can be
+    sharded so that every parallel worker gets a disjoint subset of the episodes.
+    """
+
+    def __init__(self, path, shard_id=0, num_shards=1, shuffle=True, seed=None):
+        """
+        :param path: path of the episode file
+        :param shard_id: index of the shard to load
+        :param num_shards: number of shards the episodes are split into
+        :param shuffle: whether to shuffle the episodes
+        :param seed: random seed of the shuffling
+        """
+        if not 0 <= shard_id < num_shards:
+            raise ValueError('invalid episode shard {} of {}'.format(
+                shard_id, num_shards))
+        with np.load(path) as data:
+            self.scene_id = str(data['scene_id'])
+            self.columns = {name: data[name][shard_id::num_shards]
+                            for name in EPISODE_COLUMNS}
+        self.num_episodes = self.columns['floor'].shape[0]
+        if self.num_episodes == 0:
+            raise ValueError('no episode in shard {} of {}: {}'.format(
+                shard_id, num_shards, path))
+        logging.info('Loaded {} episodes of scene {} from {}'.format(
+            self.num_episodes, self.scene_id, path))
+        self.shuffle = shuffle
+        self.rng = np.random.RandomState(seed)
+        self.order = np.arange(self.num_episodes)
+        self.idx = self.num_episodes
+
+    def __len__(self):
+        return self.num_episodes
+
+    def next_episode(self):
+        """
+        :return: dict from column name to the value of the next episode
+        """
+        if self.idx == self.num_episodes:
+            if self.shuffle:
+                self.rng.shuffle(self.order)
+            self.idx = 0
+        episode = {name: column[self.order[self.idx]]
+                   for name, column in self.columns.items()}
+        self.idx += 1
+        return episode
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+
+import os
+import time
+import random
+import logging
+import argparse
+import multiprocessing
+import numpy as np
+
+from gibson2.utils.utils import l2_distance
+from gibson2.utils.episode_utils import save_episodes
+
+"""
+script to pre-generate point-nav episodes of a scene, e.g.
+
+python -m gibson2.utils.generate_episodes --config turtlebot_point_nav.yaml --scene_id Rs_int \
+    --num_episodes 10000 --num_workers 8 --output Rs_int_episodes.npz
+
+and set `episodes_file: Rs_int_episodes.npz` in the config to stream them at reset
+"""
+
+
+def generate_episodes(config_file, scene_id, num_episodes, seed, max_failures=None):
+    """
+    Sample valid episodes with the sampling procedure of PointNavRandomTask
+
+    :param config_file: config file of a point-nav random task
+    :param scene_id: scene id
+    :param num_episodes: number of episodes to sample
+    :param seed: random seed
+    :param max_failures: number of failed samples after which sampling stops, with fewer episodes than
+        num_episodes. None for 10 times num_episodes
+    :return: dict from column name to list of values
+    """
+    from gibson2.envs.igibson_env import iGibsonEnv
+    from gibson2.tasks.point_nav_random_task import PointNavRandomTask
+
+    random.seed(seed)
+    np.random.seed(seed)
+    env = iGibsonEnv(config_file=config_file, scene_id=scene_id, mode='headless')
+    if not isinstance(env.task, PointNavRandomTask):
+        env.close()
+        raise ValueError(
+            'episodes can only be generated for point-nav random tasks')
+    task = env.task
+    task.episodes = None
+
+    episodes = {'floor': [], 'initial_pos': [], 'initial_orn': [],
+                'target_pos': [], 'geodesic_dist': []}
+    if max_failures is None:
+        max_failures = 10 * num_episodes
+    num_failures = 0
+    while len(episodes['floor']) < num_episodes:
+        task.reset_scene(env)
+        initial_pos, initial_orn, target_pos, reset_success = \
+            task.sample_valid_initial_pose_and_target_pos(env)
+        if env.scene.build_graph:
+            geodesic_dist = env.scene.get_geodesic_distance(
+                task.floor_num, initial_pos[:2], target_pos[:2])
+        else:
+            geodesic_dist = l2_distance(initial_pos, target_pos)
+        # the task only warns when no target is found in the distance range, the episode file must not
+        # have such episodes
+        if not reset_success or not task.target_dist_min < geodesic_dist < task.target_dist_max:
+            num_failures += 1
+            if num_failures >= max_failures:
+                logging.warning('Stopped after {} failed samples: only {} of {} episodes of scene {} '
+                                'were generated'.format(num_failures, len(episodes['floor']),
+                                                        num_episodes, scene_id))
+                break
+            continue
+        episodes['floor'].append(task.floor_num)
+        episodes['initial_pos'].append(initial_pos)
+        episodes['initial_orn'].append(initial_orn)
+        episodes['target_pos'].append(target_pos)
+        episodes['geodesic_dist'].append(geodesic_dist)
+
+    if num_failures > 0:
+        logging.warning('{} invalid episodes were discarded'.format(num_failures))
+    env.close()
+    return episodes
+
+
+def _generate_episodes_worker(args):
+    return generate_episodes(*args)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Generate point-nav episodes')
+    parser.add_argument('--config', required=True,
+                        help='config file of a point-nav random task')
+    parser.add_argument('--scene_id', default=None,
+                        help='override the scene_id in the config file')
+    parser.add_argument('--num_episodes', type=int, default=1000,
+                        help='number of episodes to generate')
+    parser.add_argument('--num_workers', type=int, default=1,
+                        help='number of parallel processes')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--max_failures', type=int, default=None,
+                        help='number of failed samples after which a worker stops, '
+                             '10 times its number of episodes by default')
+    parser.add_argument('--output', required=True,
+                        help='output episode file (.npz)')
+    args = parser.parse_args()
+
+    if args.scene_id is None:
+        from gibson2.utils.utils import parse_config
+        args.scene_id = parse_config(args.config)['scene_id']
+
+    num_workers = min(args.num_workers, args.num_episodes)
+    num_episodes = [args.num_episodes // num_workers +
+                    int(i < args.num_episodes % num_workers)
+                    for i in range(num_workers)]
+    jobs = [(args.config, args.scene_id, n, args.seed + i, args.max_failures)
+            for i, n in enumerate(num_episodes)]
+
+    start = time.time()
+    if num_workers == 1:
+        results = [_generate_episodes_worker(jobs[0])]
+    else:
+        # every worker has its own simulator
+        pool = multiprocessing.get_context('spawn').Pool(num_workers)
+        results = pool.map(_generate_episodes_worker, jobs)
+        pool.close()
+        pool.join()
+
+    results = [result for result in results if len(result['floor']) > 0]
+    if len(results) == 0:
+        raise ValueError(
+            'No valid episode could be sampled in scene {}'.format(args.scene_id))
+    episodes = {name: np.concatenate([np.asarray(result[name]) for result in results])
+                for name in results[0]}
+    save_episodes(args.output, args.scene_id, episodes)
+    print('{} episodes of scene {} saved to {} in {:.1f}s'.format(
+        len(episodes['floor']), args.scene_id, os.path.abspath(args.output),
+        time.time() - start))
+
+
+if __name__ == "__main__":
+    main()
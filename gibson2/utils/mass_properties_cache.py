@@ -0,0 +1,89 @@
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+import trimesh
+
+import gibson2
+from gibson2.utils.trav_map_cache import save_atomic
+
+# bump whenever the computation of the mass properties changes
+MASS_PROPERTIES_CACHE_VERSION = 1
+
+# recompute the cached mass properties and report the differences, e.g. after updating trimesh
+VERIFY_MASS_PROPERTIES = os.environ.get('GIBSON_VERIFY_MASS_PROPERTIES', '0') == '1'
+
+
+def get_file_hash(path):
+    """
+    :param path: file path
+    :return: hash of the content of the file
+    """
+    with open(path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def compute_mass_properties(mesh_path):
+    """
+    Compute the mass properties of a collision mesh at unit density
+
+    :param mesh_path: collision mesh file
+    :return: dict with volume, is_watertight, center_mass (or centroid if the mesh is not watertight)
+        and moment_inertia at unit density, all in the mesh frame
+    """
+    mesh = trimesh.load(file_obj=mesh_path, force='mesh')
+    mesh.density = 1.0
+    is_watertight = bool(mesh.is_watertight)
+    center = mesh.center_mass if is_watertight else mesh.centroid
+    return {
+        'volume': float(mesh.volume),
+        'is_watertight': is_watertight,
+        'center': np.asarray(center, dtype=float).tolist(),
+        'moment_inertia': np.asarray(mesh.moment_inertia, dtype=float).tolist(),
+    }
+
+
+def get_mass_properties(mesh_path, cache_path=None):
+    """
+    Get the mass properties of a collision mesh at unit density (see compute_mass_properties).
+    Mass and moment of inertia scale linearly with the density. Results are cached by the content
+    of the mesh file, so that every instance of a model shares them across processes and runs.
+
+    :param mesh_path: collision mesh file
+    :param cache_path: root folder of the cache, gibson2.cache_path by default
+    :return: dict of mass properties
+    """
+    if cache_path is None:
+        cache_path = gibson2.cache_path
+    cache_file = os.path.join(
+        cache_path, 'mass_properties', 'v{}'.format(MASS_PROPERTIES_CACHE_VERSION),
+        '{}.json'.format(get_file_hash(mesh_path)))
+
+    properties = None
+    if os.path.isfile(cache_file):
+        try:
+            with open(cache_file, 'r') as f:
+                properties = json.load(f)
+        except (IOError, OSError, ValueError) as e:
+            logging.warning(
+                'Cannot load mass properties {}: {}'.format(cache_file, e))
+
+    if properties is not None and VERIFY_MASS_PROPERTIES:
+        computed = compute_mass_properties(mesh_path)
+        for key in computed:
+            if not np.allclose(computed[key], properties[key]):
+                logging.warning('Cached mass property {} of {} differs: {} != {}'.format(
+                    key, mesh_path, properties[key], computed[key]))
+        properties = computed
+
+    if properties is None:
+        properties = compute_mass_properties(mesh_path)
+        try:
+            os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+            save_atomic(cache_file,
+                        lambda f: f.write(json.dumps(properties).encode('utf-8')))
+        except (IOError, OSError) as e:
+            logging.warning(
+                'Cannot save mass properties {}: {}'.format(cache_file, e))
+    return properties
@@ -0,0 +1,113 @@
+import numpy as np
+
+
+class RoomStreaming(object):
+    """
+    Selection of the rooms of an interactive scene that are loaded into pybullet and the renderer, based on
+    the position of the robot. The room the robot is in, the rooms adjacent to it and the rooms closer than
+    load_distance are loaded. Loaded rooms are kept until they are farther than unload_distance. If the rooms
+    have more bodies than max_bodies, the farthest rooms are left out, except the room the robot is in.
+    Rooms can also be selected around several positions at once.
+    """
+
+    def __init__(self, scene, load_distance=3.0, unload_distance=5.0, max_bodies=None, adjacency_distance=0.3):
+        """
+        :param scene: InteractiveIndoorScene with a room instance segmentation map
+        :param load_distance: rooms closer than this distance (in meters) to the robot are loaded
+        :param unload_distance: loaded rooms farther than this distance (in meters) from the robot are unloaded
+        :param max_bodies: maximum number of bodies of the loaded rooms, None for no budget
+        :param adjacency_distance: rooms closer than this distance (in meters) to each other, e.g. across a
+            wall or a door, are adjacent
+        """
+        if unload_distance < load_distance:
+            raise ValueError('unload_distance {} is smaller than load_distance {}'.format(
+                unload_distance, load_distance))
+        self.scene = scene
+        self.load_distance = load_distance
+        self.unload_distance = unload_distance
+        self.max_bodies = max_bodies
+
+        self.room_ids = np.array(sorted(
+            ins_id for ins_id in scene.room_ins_cells if ins_id != 0), dtype=np.int64)
+        # world bounding box of each room, as center and half extents
+        half_cell = scene.seg_map_resolution / 2.0
+        box_min = np.zeros((len(self.room_ids), 2))
+        box_max = np.zeros((len(self.room_ids), 2))
+        for i, ins_id in enumerate(self.room_ids):
+            cells = np.stack(np.divmod(
+                scene.room_ins_cells[ins_id], scene.seg_map_size), axis=1)
+            xy = scene.seg_map_to_world(cells)
+            box_min[i] = np.min(xy, axis=0) - half_cell
+            box_max[i] = np.max(xy, axis=0) + half_cell
+        self.box_center = (box_min + box_max) / 2.0
+        self.box_half_extents = (box_max - box_min) / 2.0
+        self.adjacency = self.get_room_adjacency(
+            scene.room_ins_map,
+            max(int(np.ceil(adjacency_distance / scene.seg_map_resolution)), 1))
+
+    def get_room_adjacency(self, room_ins_map, max_gap):
+        """
+        Find the pairs of rooms separated by at most max_gap cells along a row or a column of the map
+
+        :param room_ins_map: room instance segmentation map
+        :param max_gap: maximum number of cells between adjacent rooms
+        :return: dict from room instance id to the set of adjacent room instance ids
+        """
+        adjacency = {int(ins_id): set() for ins_id in self.room_ids}
+        for shift in range(1, max_gap + 2):
+            for a, b in [(room_ins_map[:-shift, :], room_ins_map[shift:, :]),
+                         (room_ins_map[:, :-shift], room_ins_map[:, shift:])]:
+                pairs = (a != b) & (a != 0) & (b != 0)
+                for ins_a, ins_b in set(zip(a[pairs].tolist(), b[pairs].tolist())):
+                    adjacency[ins_a].add(ins_b)
+                    adjacency[ins_b].add(ins_a)
+        return adjacency
+
+    def get_room_distances(self, xy):
+        """
+        :param xy: 2D location in world reference frame
+        :return: distance from xy to the bounding box of each room, in the order of room_ids
+        """
+        outside = np.maximum(
+            np.abs(np.asarray(xy)[None, :2] - self.box_center) - self.box_half_extents, 0.0)
+        return np.linalg.norm(outside, axis=1)
+
+    def get_rooms(self, xy, loaded_rooms, room_num_bodies):
+        """
+        Select the rooms to load
+
+        :param xy: 2D location of the robot in world reference frame, or array of 2D locations to load the rooms
+            around all of them, e.g. the initial and target positions of an episode
+        :param loaded_rooms: set of currently loaded room instance ids
+        :param room_num_bodies: dict from room instance id to its number of bodies
+        :return: set of room instance ids that should be loaded
+        """
+        points = np.asarray(xy, dtype=np.float64)
+        points = points.reshape(-1, points.shape[-1])[:, :2]
+        distances = dict(zip(self.room_ids.tolist(), np.min(
+            [self.get_room_distances(point) for point in points], axis=0).tolist()))
+        current = set()
+        for cells in self.scene.world_to_seg_map(points):
+            if np.all((cells >= 0) & (cells < self.scene.seg_map_size)):
+                current.add(int(self.scene.room_ins_map[cells[0], cells[1]]))
+        current.discard(0)
+
+        rooms = set(ins_id for ins_id, distance in distances.items()
+                    if distance <= self.load_distance)
+        rooms |= set(ins_id for ins_id in loaded_rooms
+                     if distances.get(ins_id, np.inf) <= self.unload_distance)
+        rooms |= current
+        for ins_id in current:
+            rooms |= self.adjacency[ins_id]
+        if self.max_bodies is None:
+            return rooms
+
+        selected = set()
+        num_bodies = 0
+        for ins_id in sorted(rooms, key=lambda ins_id: (ins_id not in current, distances[ins_id])):
+            room_bodies = room_num_bodies.get(ins_id, 0)
+            if ins_id not in current and num_bodies + room_bodies > self.max_bodies:
+                continue
+            selected.add(ins_id)
+            num_bodies += room_bodies
+        return selected
@@ -0,0 +1,142 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+def parse_visual_meshes(mesh_files):
+    """
+    Parse wavefront obj files for the renderer ahead of MeshRenderer.load_object, and read the texture files
+    they reference so that the renderer finds them in the page cache
+
+    :param mesh_files: obj files
+    :return: dict from normalized obj file path to tinyobjloader ObjReader
+    """
+    from gibson2.render.mesh_renderer import tinyobjloader
+
+    readers = {}
+    for mesh_file in mesh_files:
+        mesh_file = os.path.normpath(mesh_file)
+        if mesh_file in readers or not os.path.isfile(mesh_file):
+            continue
+        reader = tinyobjloader.ObjReader()
+        if not reader.ParseFromFile(mesh_file):
+            # let load_object report the error
+            continue
+        readers[mesh_file] = reader
+        mesh_dir = os.path.dirname(mesh_file)
+        for material in reader.GetMaterials():
+            for texture_name in [material.diffuse_texname, material.metallic_texname,
+                                 material.roughness_texname, material.bump_texname]:
+                texture_file = os.path.join(mesh_dir, texture_name)
+                if texture_name != '' and os.path.isfile(texture_file):
+                    with open(texture_file, 'rb') as f:
+                        f.read()
+    return readers
+
+
+class ScenePrefetcher(object):
+    """
+    Create and prefetch (see Scene.prefetch) the next scenes in a background thread, while the current scene is
+    being simulated, so that switching scenes only loads them into pybullet and the renderer.
+    Keeps track of the load time hidden in the background and of the load time exposed to the caller.
+    """
+
+    def __init__(self, create_scene_fn, queue_depth=1):
+        """
+        :param create_scene_fn: function that creates (but does not load) the scene of a scene id. It is called
+            from the background thread and must not use pybullet or the renderer
+        :param queue_depth: maximum number of scenes prefetched ahead, the oldest ones are dropped
+        """
+        if queue_depth < 1:
+            raise ValueError(
+                'queue_depth must be positive: {}'.format(queue_depth))
+        self.create_scene_fn = create_scene_fn
+        self.queue_depth = queue_depth
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.pending = OrderedDict()
+        self.stats = {
+            'num_hits': 0,
+            'num_misses': 0,
+            'hidden_time': 0.0,
+            'exposed_time': 0.0,
+        }
+
+    def create_scene(self, scene_id):
+        """
+        Create and prefetch a scene
+
+        :param scene_id: scene id
+        :return: scene and time it took, in seconds
+        """
+        start = time.time()
+        scene = self.create_scene_fn(scene_id)
+        scene.prefetch()
+        return scene, time.time() - start
+
+    def prefetch(self, scene_id):
+        """
+        Start creating and prefetching a scene in the background
+
+        :param scene_id: scene id
+        """
+        if scene_id in self.pending:
+            return
+        while len(self.pending) >= self.queue_depth:
+            dropped_id, future = self.pending.popitem(last=False)
+            future.cancel()
+            logging.warning(
+                'Dropping prefetched scene {}, queue depth {} exceeded'.format(dropped_id, self.queue_depth))
+        self.pending[scene_id] = self.executor.submit(
+            self.create_scene, scene_id)
+
+    def get(self, scene_id):
+        """
+        Get a scene, waiting for its prefetch if it is pending or creating it now otherwise
+
+        :param scene_id: scene id
+        :return: scene, ready to be loaded
+        """
+        start = time.time()
+        future = self.pending.pop(scene_id, None)
+        scene = None
+        if future is not None:
+            try:
+                scene, prefetch_time = future.result()
+                waited = time.time() - start
+                self.stats['num_hits'] += 1
+                self.stats['hidden_time'] += max(prefetch_time - waited, 0.0)
+            except Exception as e:
+                logging.warning(
+                    'Prefetching scene {} failed: {}'.format(scene_id, e))
+        if scene is None:
+            self.stats['num_misses'] += 1
+            scene, _ = self.create_scene(scene_id)
+        self.stats['exposed_time'] += time.time() - start
+        return scene
+
+    def add_exposed_time(self, exposed_time):
+        """
+        Account for load time spent outside of get, e.g. loading the scene into pybullet and the renderer
+
+        :param exposed_time: time in seconds
+        """
+        self.stats['exposed_time'] += exposed_time
+
+    def get_stats(self):
+        """
+        :return: dict with the number of prefetched scenes that were used (num_hits) and that had to be created on
+            demand (num_misses), the load time hidden in the background (hidden_time) and exposed to the caller
+            (exposed_time), in seconds
+        """
+        return dict(self.stats)
+
+    def close(self):
+        """
+        Drop the pending prefetches and stop the background thread
+        """
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+        self.executor.shutdown(wait=True)
@@ -1,5 +1,6 @@
 import gibson2
 import os
+from gibson2.utils.assets_utils import load_dataset_index
 from gibson2.utils.constants import SemanticClass
 
 def get_class_name_to_class_id(starting_class_id=SemanticClass.SCENE_OBJS):
@@ -12,8 +13,7 @@ def get_class_name_to_class_id(starting_class_id=SemanticClass.SCENE_OBJS):
                                 'metadata/categories.txt')
     class_name_to_class_id = dict()
     if os.path.isfile(category_txt):
-        with open(category_txt) as f:
-            for line in f.readlines():
-                class_name_to_class_id[line.strip()] = starting_class_id
-                starting_class_id += 1
+        for line in load_dataset_index(category_txt):
+            class_name_to_class_id[line.strip()] = starting_class_id
+            starting_class_id += 1
     return class_name_to_class_id
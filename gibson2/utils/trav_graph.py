@@ -0,0 +1,333 @@
+import numpy as np
+import networkx as nx
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components, dijkstra
+from scipy.spatial import cKDTree
+
+# Neighbor offsets of an 8-connected grid. Only half of the offsets are listed
+# because every edge is added in both directions.
+NEIGHBOR_OFFSETS = [(0, 1), (1, -1), (1, 0), (1, 1)]
+
+
+class TraversableGraph(object):
+    """
+    Traversability graph of one floor.
+    Nodes are the free cells of the traversability map, 8-connected, and edges are weighted by
+    their L2 distance in map pixels. The graph is stored as a CSR adjacency matrix, built with
+    array operations instead of adding nodes and edges one by one.
+    """
+
+    # arrays of get_arrays / from_arrays
+    ARRAYS = ['node_cells', 'node_coords', 'cell_to_node', 'indptr', 'indices', 'weights']
+
+    def __init__(self, map_size, node_cells, indptr, indices):
+        """
+        :param map_size: size of the (square) traversability map
+        :param node_cells: flat index (row * map_size + col) of the cell of each node, sorted
+        :param indptr: CSR index pointer of the adjacency matrix
+        :param indices: CSR column indices of the adjacency matrix
+        """
+        self.map_size = int(map_size)
+        self.node_cells = np.asarray(node_cells, dtype=np.int64)
+        self.node_coords = np.stack(
+            np.divmod(self.node_cells, self.map_size), axis=1)
+
+        indptr = np.asarray(indptr, dtype=np.int64)
+        indices = np.asarray(indices, dtype=np.int32)
+        # edge weights are fully determined by the cells they connect
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(indptr))
+        weights = np.linalg.norm(
+            self.node_coords[rows] - self.node_coords[indices], axis=1)
+        self.adjacency = csr_matrix(
+            (weights, indices, indptr), shape=(self.num_nodes, self.num_nodes))
+
+        self.cell_to_node = -np.ones(self.map_size * self.map_size, dtype=np.int32)
+        self.cell_to_node[self.node_cells] = np.arange(self.num_nodes)
+        self._kd_tree = None
+
+    @property
+    def num_nodes(self):
+        return self.node_cells.shape[0]
+
+    @property
+    def kd_tree(self):
+        """
+        Spatial index for snapping off-graph cells to their closest node, built on first use
+        """
+        if self._kd_tree is None:
+            self._kd_tree = cKDTree(self.node_coords)
+        return self._kd_tree
+
+    def get_arrays(self):
+        """
+        :return: dict of all the arrays of the graph, see from_arrays
+        """
+        return {
+            'node_cells': self.node_cells,
+            'node_coords': self.node_coords,
+            'cell_to_node': self.cell_to_node,
+            'indptr': self.adjacency.indptr,
+            'indices': self.adjacency.indices,
+            'weights': self.adjacency.data,
+        }
+
+    @classmethod
+    def from_arrays(cls, map_size, arrays):
+        """
+        Create a graph from the arrays of get_arrays without copying them,
+        e.g. from read-only memory-mapped arrays that are shared by several processes
+
+        :param map_size: size of the (square) traversability map
+        :param arrays: dict of all the arrays of the graph
+        :return: TraversableGraph
+        """
+        g = cls.__new__(cls)
+        g.map_size = int(map_size)
+        g.node_cells = arrays['node_cells']
+        g.node_coords = arrays['node_coords']
+        g.cell_to_node = arrays['cell_to_node']
+        g.adjacency = csr_matrix(
+            (arrays['weights'], arrays['indices'], arrays['indptr']),
+            shape=(g.num_nodes, g.num_nodes), copy=False)
+        g._kd_tree = None
+        return g
+
+    @classmethod
+    def from_trav_map(cls, trav_map, largest_component_only=True):
+        """
+        Build the traversability graph of a traversability map
+
+        :param trav_map: square traversability map, where non-zero cells are free
+        :param largest_component_only: only keep the largest connected component
+        :return: TraversableGraph
+        """
+        map_size = trav_map.shape[0]
+        free = trav_map > 0
+        node_cells = np.flatnonzero(free)
+        cell_to_node = -np.ones(map_size * map_size, dtype=np.int64)
+        cell_to_node[node_cells] = np.arange(node_cells.shape[0])
+
+        src, dst = [], []
+        for di, dj in NEIGHBOR_OFFSETS:
+            i0, i1 = max(0, -di), map_size - max(0, di)
+            j0, j1 = max(0, -dj), map_size - max(0, dj)
+            mask = free[i0:i1, j0:j1] & free[i0 + di:i1 + di, j0 + dj:j1 + dj]
+            ii, jj = np.nonzero(mask)
+            ii += i0
+            jj += j0
+            src.append(cell_to_node[ii * map_size + jj])
+            dst.append(cell_to_node[(ii + di) * map_size + jj + dj])
+        src = np.concatenate(src)
+        dst = np.concatenate(dst)
+
+        num_nodes = node_cells.shape[0]
+        adjacency = coo_matrix(
+            (np.ones(2 * src.shape[0], dtype=np.int8),
+             (np.concatenate([src, dst]), np.concatenate([dst, src]))),
+            shape=(num_nodes, num_nodes)).tocsr()
+
+        if largest_component_only and num_nodes > 0:
+            _, labels = connected_components(adjacency, directed=False)
+            largest_cc = np.argmax(np.bincount(labels))
+            keep = np.flatnonzero(labels == largest_cc)
+            adjacency = adjacency[keep][:, keep]
+            node_cells = node_cells[keep]
+
+        adjacency.sort_indices()
+        return cls(map_size, node_cells, adjacency.indptr, adjacency.indices)
+
+    def to_networkx(self):
+        """
+        Convert to a networkx graph with (row, col) nodes, kept for backwards compatibility
+
+        :return: networkx graph
+        """
+        g = nx.Graph()
+        g.add_nodes_from(map(tuple, self.node_coords.tolist()))
+        coo = self.adjacency.tocoo()
+        upper = coo.row < coo.col
+        for u, v, w in zip(coo.row[upper], coo.col[upper], coo.data[upper]):
+            g.add_edge(tuple(self.node_coords[u]), tuple(self.node_coords[v]), weight=w)
+        return g
+
+    def get_trav_map(self):
+        """
+        :return: traversability map that only contains the nodes of this graph
+        """
+        trav_map = np.zeros(self.map_size * self.map_size, dtype=np.uint8)
+        trav_map[self.node_cells] = 255
+        return trav_map.reshape(self.map_size, self.map_size)
+
+    def has_node(self, cell):
+        """
+        :param cell: (row, col) cell in the traversability map
+        :return: whether the cell is a node of the graph
+        """
+        return self.get_node(cell) != -1
+
+    def get_node(self, cell):
+        """
+        :param cell: (row, col) cell in the traversability map
+        :return: node index of the cell, or -1 if the cell is not a node of the graph
+        """
+        i, j = int(cell[0]), int(cell[1])
+        if not (0 <= i < self.map_size and 0 <= j < self.map_size):
+            return -1
+        return int(self.cell_to_node[i * self.map_size + j])
+
+    def get_closest_node(self, cell, blocked=None):
+        """
+        :param cell: (row, col) cell in the traversability map
+        :param blocked: boolean mask of the nodes that cannot be used, or None
+        :return: index of the node closest to the cell
+        """
+        node = self.get_node(cell)
+        if node == -1:
+            _, node = self.kd_tree.query(cell)
+        if blocked is None or not blocked[node] or np.all(blocked):
+            return int(node)
+        k = 8
+        while True:
+            k = min(2 * k, self.num_nodes)
+            _, nodes = self.kd_tree.query(cell, k=k)
+            unblocked = nodes[~blocked[nodes]]
+            if unblocked.shape[0] > 0:
+                return int(unblocked[0])
+
+    def get_closest_nodes(self, cells, blocked=None):
+        """
+        :param cells: Nx2 array of (row, col) cells in the traversability map
+        :param blocked: boolean mask of the nodes that cannot be used, or None
+        :return: index of the node closest to each cell
+        """
+        cells = np.asarray(cells, dtype=np.int64).reshape(-1, 2)
+        in_map = np.all((cells >= 0) & (cells < self.map_size), axis=1)
+        nodes = -np.ones(cells.shape[0], dtype=np.int64)
+        nodes[in_map] = self.cell_to_node[
+            cells[in_map, 0] * self.map_size + cells[in_map, 1]]
+        off_graph = nodes == -1
+        if np.any(off_graph):
+            _, nodes[off_graph] = self.kd_tree.query(cells[off_graph])
+        if blocked is not None:
+            for i in np.flatnonzero(blocked[nodes]):
+                nodes[i] = self.get_closest_node(cells[i], blocked=blocked)
+        return nodes
+
+    def get_masked_adjacency(self, blocked):
+        """
+        :param blocked: boolean mask of the nodes that cannot be used
+        :return: adjacency matrix without the edges of the blocked nodes
+        """
+        rows = np.repeat(np.arange(self.num_nodes), np.diff(self.adjacency.indptr))
+        keep = ~blocked[rows] & ~blocked[self.adjacency.indices]
+        indptr = np.zeros(self.num_nodes + 1, dtype=np.int32)
+        indptr[1:] = np.cumsum(np.bincount(rows[keep], minlength=self.num_nodes))
+        return csr_matrix(
+            (self.adjacency.data[keep], self.adjacency.indices[keep], indptr),
+            shape=self.adjacency.shape)
+
+    def get_shortest_path_tree(self, target_node, adjacency=None):
+        """
+        Run Dijkstra from a target node over the whole graph
+
+        :param target_node: node index of the target
+        :param adjacency: adjacency matrix to use instead of the one of the graph, e.g. from get_masked_adjacency
+        :return: distance (in map pixels) from every node to the target,
+            and the next node on the shortest path to the target of every node
+        """
+        if adjacency is None:
+            adjacency = self.adjacency
+        distances, predecessors = dijkstra(
+            adjacency, directed=False, indices=target_node, return_predecessors=True)
+        return distances, predecessors
+
+    def update_shortest_path_tree(self, adjacency, distances, predecessors, target_node,
+                                  blocked_nodes, unblocked_nodes):
+        """
+        Update a shortest path tree after some nodes were blocked or unblocked, without running
+        Dijkstra over the whole graph. Blocking nodes does not change the tree unless one of them is
+        on the shortest path of another node. Unblocked nodes get their distances from their
+        neighbors, and do not change the tree unless they create a shortcut for another node.
+
+        :param adjacency: adjacency matrix after the update, from get_masked_adjacency
+        :param distances: distance from every node to the target, before the update
+        :param predecessors: next node on the shortest path to the target of every node, before the update
+        :param target_node: node index of the target
+        :param blocked_nodes: nodes that became blocked
+        :param unblocked_nodes: nodes that became unblocked
+        :return: None if the tree has to be computed again, otherwise the updated distances and predecessors
+        """
+        if target_node in blocked_nodes or target_node in unblocked_nodes:
+            return None
+        if blocked_nodes.shape[0] > 0:
+            on_path = np.zeros(self.num_nodes, dtype=bool)
+            on_path[predecessors[predecessors >= 0]] = True
+            if np.any(on_path[blocked_nodes]):
+                return None
+        distances = np.array(distances)
+        predecessors = np.array(predecessors)
+        distances[blocked_nodes] = np.inf
+        predecessors[blocked_nodes] = -9999
+        if unblocked_nodes.shape[0] == 0:
+            return distances, predecessors
+
+        num_unblocked = unblocked_nodes.shape[0]
+        is_unblocked = np.zeros(self.num_nodes, dtype=bool)
+        is_unblocked[unblocked_nodes] = True
+        local_index = -np.ones(self.num_nodes, dtype=np.int64)
+        local_index[unblocked_nodes] = np.arange(num_unblocked)
+        edges = adjacency[unblocked_nodes].tocoo()
+        inside = is_unblocked[edges.col]
+
+        # best path of every unblocked node through one of its neighbors outside of the region
+        boundary_rows = edges.row[~inside]
+        boundary_cols = edges.col[~inside]
+        boundary_dist = distances[boundary_cols] + edges.data[~inside]
+        order = np.lexsort((boundary_dist, boundary_rows))
+        boundary_rows, first = np.unique(boundary_rows[order], return_index=True)
+        entry_dist = np.full(num_unblocked, np.inf)
+        entry_node = -np.ones(num_unblocked, dtype=np.int64)
+        entry_dist[boundary_rows] = boundary_dist[order][first]
+        entry_node[boundary_rows] = boundary_cols[order][first]
+
+        # propagate inside of the region from a virtual source connected to every entry
+        reachable = np.isfinite(entry_dist)
+        rows = np.concatenate([np.zeros(np.sum(reachable), dtype=np.int64),
+                               edges.row[inside] + 1])
+        cols = np.concatenate([np.flatnonzero(reachable) + 1,
+                               local_index[edges.col[inside]] + 1])
+        # a tiny offset keeps zero-length entries as explicit edges
+        weights = np.concatenate([entry_dist[reachable] + 1e-9, edges.data[inside]])
+        local = coo_matrix((weights, (rows, cols)),
+                           shape=(num_unblocked + 1, num_unblocked + 1)).tocsr()
+        local_dist, local_pred = dijkstra(
+            local, directed=True, indices=0, return_predecessors=True)
+        local_dist = local_dist[1:] - 1e-9
+        local_pred = local_pred[1:]
+
+        # the region must not create a shortcut for its neighbors
+        exits = ~inside
+        exit_dist = local_dist[edges.row[exits]] + edges.data[exits]
+        if np.any(exit_dist < distances[edges.col[exits]] - 1e-6):
+            return None
+
+        distances[unblocked_nodes] = local_dist
+        next_nodes = np.where(local_pred > 0,
+                              unblocked_nodes[np.maximum(local_pred - 1, 0)],
+                              entry_node)
+        predecessors[unblocked_nodes] = np.where(
+            np.isfinite(local_dist), next_nodes, -9999)
+        return distances, predecessors
+
+    def get_path(self, source_node, predecessors):
+        """
+        Follow a shortest path tree from a source node to its root
+
+        :param source_node: node index of the source
+        :param predecessors: next node on the shortest path of every node, from get_shortest_path_tree
+        :return: node indices of the path, from the source to the root
+        """
+        path = [source_node]
+        while predecessors[path[-1]] >= 0:
+            path.append(predecessors[path[-1]])
+        return np.array(path, dtype=np.int64)
@@ -0,0 +1,239 @@
+import gibson2
+import hashlib
+import json
+import logging
+import os
+import numpy as np
+from gibson2.utils.trav_graph import TraversableGraph
+
+# bump whenever the processing of traversability maps changes
+TRAV_MAP_CACHE_VERSION = 3
+
+
+def get_file_stamp(path):
+    """
+    :param path: file path
+    :return: size and modification time of the file, used to detect stale cache entries
+    """
+    stat = os.stat(path)
+    return [stat.st_size, int(stat.st_mtime)]
+
+
+def save_atomic(path, save_fn):
+    """
+    Write a file through a temporary file so that concurrent readers never see partial files
+
+    :param path: file path
+    :param save_fn: function that writes the content to a file object
+    """
+    tmp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with open(tmp_path, 'wb') as f:
+        save_fn(f)
+    os.replace(tmp_path, path)
+
+
+class TravMapCache(object):
+    """
+    Cache of processed (resized, eroded and thresholded) traversability maps.
+    Every floor is cached as a uint8 map, the flat indices of its free cells, its clearance map,
+    the arrays of its traversability graph and a metadata file. Arrays are saved as .npy files and loaded read-only
+    with mmap, so all the processes that load the same scene (e.g. the workers of ParallelNavEnv)
+    share a single copy. Distance fields precomputed with save_distance_field are shared the same way.
+    Entries are keyed by the scene, floor, map resolution, erosion, type and whether the map is
+    restricted to its largest connected component, and invalidated when the source maps change.
+    """
+
+    def __init__(self,
+                 maps_path,
+                 scene_id,
+                 trav_map_resolution,
+                 trav_map_erosion,
+                 trav_map_type,
+                 build_graph,
+                 cache_path=None):
+        """
+        :param maps_path: String with the path to the folder containing the traversability maps
+        :param scene_id: Scene id
+        :param trav_map_resolution: traversability map resolution
+        :param trav_map_erosion: erosion radius of traversability areas
+        :param trav_map_type: type of traversability map, with_obj | no_obj
+        :param build_graph: whether the maps are restricted to the largest connected component
+        :param cache_path: root folder of the cache, gibson2.cache_path by default
+        """
+        if cache_path is None:
+            cache_path = gibson2.cache_path
+        # different datasets can have scenes with the same id
+        maps_path_hash = hashlib.md5(
+            os.path.abspath(maps_path).encode('utf-8')).hexdigest()[:8]
+        self.cache_dir = os.path.join(
+            cache_path, 'trav_maps', 'v{}'.format(TRAV_MAP_CACHE_VERSION),
+            '{}_{}'.format(scene_id, maps_path_hash))
+        self.key = '{}_res{}_ero{}{}'.format(
+            trav_map_type, trav_map_resolution, trav_map_erosion,
+            '_graph' if build_graph else '')
+        self.build_graph = build_graph
+        # floor -> stamp of the source maps of the loaded entry, which distance fields are keyed by
+        self.field_stamps = {}
+
+    def get_path(self, floor, suffix):
+        """
+        :param floor: floor number
+        :param suffix: file suffix
+        :return: path of a cached file of a floor
+        """
+        return os.path.join(self.cache_dir, 'floor_{}_{}_{}'.format(floor, self.key, suffix))
+
+    def get_field_path(self, floor, target_node, name):
+        """
+        :param floor: floor number
+        :param target_node: node index of the target
+        :param name: distances or predecessors
+        :return: path of a cached distance field of a floor, keyed by the source maps the graph was built
+            from so that fields of an older graph are never used, or None if the floor was not loaded
+            from the cache
+        """
+        if floor not in self.field_stamps:
+            return None
+        return self.get_path(floor, 'field_{}_{}_{}.npy'.format(
+            self.field_stamps[floor], target_node, name))
+
+    def set_field_stamp(self, floor, sources):
+        """
+        :param floor: floor number
+        :param sources: file stamps of the source maps of the floor
+        """
+        self.field_stamps[floor] = hashlib.md5(
+            json.dumps(sources).encode('utf-8')).hexdigest()[:8]
+
+    def remove_distance_fields(self, floor):
+        """
+        Remove the distance fields of a floor, computed on a graph that is rebuilt
+
+        :param floor: floor number
+        """
+        prefix = os.path.basename(self.get_path(floor, 'field_'))
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.startswith(prefix):
+                try:
+                    os.remove(os.path.join(self.cache_dir, name))
+                except OSError:
+                    # removed by another process
+                    pass
+
+    def load(self, floor, source_files):
+        """
+        Load the cached maps of a floor
+
+        :param floor: floor number
+        :param source_files: traversability and obstacle map files the floor is processed from
+        :return: None if the floor is not cached or stale, otherwise
+            traversability map, flat indices of its free cells, clearance map,
+            traversability graph (or None) and metadata (original and processed map sizes)
+        """
+        meta_file = self.get_path(floor, 'meta.json')
+        if not os.path.isfile(meta_file):
+            return None
+        try:
+            with open(meta_file, 'r') as f:
+                metadata = json.load(f)
+            if metadata['sources'] != [get_file_stamp(path) for path in source_files]:
+                logging.info('Traversability map cache is stale: {}'.format(meta_file))
+                return None
+            trav_map = np.load(self.get_path(floor, 'map.npy'), mmap_mode='r')
+            free_cells = np.load(self.get_path(floor, 'free.npy'), mmap_mode='r')
+            clearance = np.load(self.get_path(floor, 'clearance.npy'), mmap_mode='r')
+            graph = None
+            if self.build_graph:
+                graph = TraversableGraph.from_arrays(metadata['map_size'], {
+                    name: np.load(self.get_path(floor, 'graph_{}.npy'.format(name)), mmap_mode='r')
+                    for name in TraversableGraph.ARRAYS})
+        except Exception as e:
+            logging.warning(
+                'Cannot load traversability map cache {}: {}'.format(meta_file, e))
+            return None
+        self.set_field_stamp(floor, metadata['sources'])
+        return trav_map, free_cells, clearance, graph, metadata
+
+    def save(self, floor, source_files, trav_map, clearance, graph, original_size):
+        """
+        Save the processed maps of a floor. Failures are logged and otherwise ignored.
+
+        :param floor: floor number
+        :param source_files: traversability and obstacle map files the floor is processed from
+        :param trav_map: processed traversability map
+        :param clearance: clearance map
+        :param graph: traversability graph, or None
+        :param original_size: size of the source maps
+        """
+        metadata = {
+            'version': TRAV_MAP_CACHE_VERSION,
+            'sources': [get_file_stamp(path) for path in source_files],
+            'original_size': original_size,
+            'map_size': trav_map.shape[0],
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # the node ids of the distance fields of the previous graph are meaningless for the new one
+            self.remove_distance_fields(floor)
+            save_atomic(self.get_path(floor, 'map.npy'),
+                        lambda f: np.save(f, trav_map))
+            save_atomic(self.get_path(floor, 'free.npy'),
+                        lambda f: np.save(f, np.flatnonzero(trav_map == 255)))
+            save_atomic(self.get_path(floor, 'clearance.npy'),
+                        lambda f: np.save(f, clearance))
+            if graph is not None:
+                for name, array in graph.get_arrays().items():
+                    save_atomic(self.get_path(floor, 'graph_{}.npy'.format(name)),
+                                lambda f: np.save(f, array))
+            # the metadata file is written last and marks the entry as complete
+            save_atomic(self.get_path(floor, 'meta.json'),
+                        lambda f: f.write(json.dumps(metadata).encode('utf-8')))
+        except (IOError, OSError) as e:
+            logging.warning(
+                'Cannot save traversability map cache {}: {}'.format(self.cache_dir, e))
+
+    def load_distance_field(self, floor, target_node):
+        """
+        Load a shared distance field
+
+        :param floor: floor number
+        :param target_node: node index of the target
+        :return: None if the distance field is not cached, otherwise the distance to the target
+            node and the next node on the shortest path to the target node of every node
+        """
+        distances_file = self.get_field_path(floor, target_node, 'distances')
+        if distances_file is None or not os.path.isfile(distances_file):
+            return None
+        try:
+            distances = np.load(distances_file, mmap_mode='r')
+            predecessors = np.load(
+                self.get_field_path(floor, target_node, 'predecessors'), mmap_mode='r')
+        except Exception as e:
+            logging.warning(
+                'Cannot load distance field {}: {}'.format(distances_file, e))
+            return None
+        return distances, predecessors
+
+    def save_distance_field(self, floor, target_node, distances, predecessors):
+        """
+        Save a distance field so that it can be shared by all the processes that load the scene
+
+        :param floor: floor number
+        :param target_node: node index of the target
+        :param distances: distance to the target node of every node
+        :param predecessors: next node on the shortest path to the target node of every node
+        """
+        if floor not in self.field_stamps:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            save_atomic(self.get_field_path(floor, target_node, 'predecessors'),
+                        lambda f: np.save(f, predecessors.astype(np.int32)))
+            # the distances file is written last and marks the field as complete
+            save_atomic(self.get_field_path(floor, target_node, 'distances'),
+                        lambda f: np.save(f, distances))
+        except (IOError, OSError) as e:
+            logging.warning(
+                'Cannot save distance field {}: {}'.format(self.cache_dir, e))
@@ -0,0 +1,161 @@
+#!/usr/bin/env python
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import xml.etree.ElementTree as ET
+
+import gibson2
+from gibson2.utils.urdf_utils import save_urdfs_without_floating_joints
+
+"""
+Content-addressed cache of the URDFs generated for the objects of interactive scenes.
+The URDFs generated from the same (scaled, renamed and attached) object tree are saved once under
+cache_path/urdfs and reused by every scene construction and every process. Unused entries can be
+removed with
+
+python -m gibson2.utils.urdf_cache --max_age_days 30
+"""
+
+# bump whenever the generation of the URDFs changes
+URDF_CACHE_VERSION = 1
+MANIFEST_FILE = 'manifest.json'
+
+
+def get_urdf_cache_dir(cache_path=None):
+    """
+    :param cache_path: root folder of the cache, gibson2.cache_path by default
+    :return: folder of the URDF cache
+    """
+    if cache_path is None:
+        cache_path = gibson2.cache_path
+    return os.path.join(cache_path, 'urdfs', 'v{}'.format(URDF_CACHE_VERSION))
+
+
+def get_urdf_tree_hash(tree):
+    """
+    :param tree: URDF element tree
+    :return: hash of the content of the URDF
+    """
+    return hashlib.sha1(ET.tostring(tree.getroot())).hexdigest()
+
+
+def load_manifest(entry_dir):
+    """
+    Load the split URDFs of a cache entry
+
+    :param entry_dir: folder of the cache entry
+    :return: None if the entry does not exist, otherwise the same dict as save_urdfs_without_floating_joints
+    """
+    manifest_file = os.path.join(entry_dir, MANIFEST_FILE)
+    if not os.path.isfile(manifest_file):
+        return None
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        # track the last use for garbage collection
+        os.utime(manifest_file, None)
+    except (IOError, OSError, ValueError) as e:
+        logging.warning('Cannot load URDF cache entry {}: {}'.format(entry_dir, e))
+        return None
+    return {int(key): (os.path.join(entry_dir, urdf_file), np.array(transformation), is_fixed)
+            for key, (urdf_file, transformation, is_fixed) in manifest.items()}
+
+
+def save_urdfs_cached(tree, name, cache_path=None):
+    """
+    Split a URDF into multiple URDFs without floating joints (see save_urdfs_without_floating_joints),
+    or reuse the URDFs of an identical tree saved before
+
+    :param tree: URDF element tree
+    :param name: prefix of the URDF file names
+    :param cache_path: root folder of the cache, gibson2.cache_path by default
+    :return: dict from split index to (URDF file, transformation, is_fixed)
+    """
+    cache_dir = get_urdf_cache_dir(cache_path)
+    tree_hash = get_urdf_tree_hash(tree)
+    entry_dir = os.path.join(cache_dir, tree_hash[:2], tree_hash)
+    urdfs = load_manifest(entry_dir)
+    if urdfs is not None:
+        return urdfs
+
+    # write the entry into a temporary folder and move it in place once it is complete,
+    # so that concurrent processes never see partial entries
+    os.makedirs(os.path.dirname(entry_dir), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(entry_dir),
+                               prefix='.{}.'.format(tree_hash))
+    try:
+        urdfs = save_urdfs_without_floating_joints(
+            tree, os.path.join(tmp_dir, name))
+        manifest = {key: (os.path.basename(urdf_file), transformation.tolist(), is_fixed)
+                    for key, (urdf_file, transformation, is_fixed) in urdfs.items()}
+        with open(os.path.join(tmp_dir, MANIFEST_FILE), 'w') as f:
+            json.dump(manifest, f)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # another process saved the same entry first
+            if not os.path.isfile(os.path.join(entry_dir, MANIFEST_FILE)):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    return load_manifest(entry_dir)
+
+
+def gc_urdf_cache(max_age_days=30, cache_path=None):
+    """
+    Remove the cache entries that have not been used recently, and the entries of older cache versions
+
+    :param max_age_days: entries not used for this number of days are removed
+    :param cache_path: root folder of the cache, gibson2.cache_path by default
+    :return: number of removed entries
+    """
+    cache_dir = get_urdf_cache_dir(cache_path)
+    root_dir = os.path.dirname(cache_dir)
+    if not os.path.isdir(root_dir):
+        return 0
+    num_removed = 0
+    for version_dir in os.listdir(root_dir):
+        if os.path.join(root_dir, version_dir) != cache_dir:
+            shutil.rmtree(os.path.join(root_dir, version_dir), ignore_errors=True)
+    if not os.path.isdir(cache_dir):
+        return 0
+
+    min_time = time.time() - max_age_days * 24 * 3600
+    for prefix in os.listdir(cache_dir):
+        prefix_dir = os.path.join(cache_dir, prefix)
+        for entry in os.listdir(prefix_dir):
+            entry_dir = os.path.join(prefix_dir, entry)
+            manifest_file = os.path.join(entry_dir, MANIFEST_FILE)
+            if entry.startswith('.'):
+                # leftover of an interrupted save
+                last_use = os.path.getmtime(entry_dir)
+            elif os.path.isfile(manifest_file):
+                last_use = os.path.getmtime(manifest_file)
+            else:
+                last_use = 0
+            if last_use < min_time:
+                shutil.rmtree(entry_dir, ignore_errors=True)
+                num_removed += 1
+    return num_removed
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Remove unused URDFs from the URDF cache')
+    parser.add_argument('--max_age_days', type=float, default=30,
+                        help='remove the URDFs not used for this number of days')
+    args = parser.parse_args()
+    num_removed = gc_urdf_cache(args.max_age_days)
+    print('{} URDF cache entries removed from {}'.format(
+        num_removed, get_urdf_cache_dir()))
+
+
+if __name__ == "__main__":
+    main()